@@ -0,0 +1,50 @@
+# Purpose: Alembic environment for the raw-SQL migrations in alembic/versions
+# How: Builds an engine from DATABASE_URL (same variable as the API pool) and runs
+#      every migration in one transaction guarded by the schema advisory lock, so
+#      workers started with DB_AUTO_MIGRATE=true never migrate concurrently
+
+import os
+from logging.config import fileConfig
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool, text
+
+load_dotenv()
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# Same lock name the API has always used to serialize schema changes
+SCHEMA_LOCK_NAME = "taskflow:schema"
+
+
+def database_url():
+    url = os.getenv("DATABASE_URL", "")
+    # SQLAlchemy only accepts the postgresql:// scheme (hosts often hand out postgres://)
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout (`alembic upgrade head --sql`) instead of executing it."""
+    context.configure(url=database_url(), literal_binds=True, transaction_per_migration=False)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(database_url(), poolclass=pool.NullPool, connect_args={"sslmode": "prefer"})
+    with engine.connect() as connection:
+        context.configure(connection=connection, transaction_per_migration=False)
+        with context.begin_transaction():
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": SCHEMA_LOCK_NAME})
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,62 @@
+"""Initial schema: users, tasks, otps and the basic task indexes
+
+Everything uses IF NOT EXISTS so databases bootstrapped by the old startup DDL
+(or database.sql) upgrade cleanly and simply gain the missing indexes.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            hashed_password VARCHAR(255) NOT NULL,
+            full_name VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            priority VARCHAR(50) DEFAULT 'medium',
+            status VARCHAR(50) DEFAULT 'in_progress',
+            due_date DATE,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS otps (
+            id SERIAL PRIMARY KEY,
+            email VARCHAR(255) NOT NULL,
+            code VARCHAR(10) NOT NULL,
+            purpose VARCHAR(20) NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            used BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks (user_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS otps")
+    op.execute("DROP TABLE IF EXISTS tasks")
+    op.execute("DROP TABLE IF EXISTS users")
@@ -0,0 +1,47 @@
+"""Keyset pagination indexes, full-text search and profile_version
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bumped on profile changes; drives /api/auth/me ETags
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 0")
+
+    # Composite indexes backing keyset pagination and filters on GET /api/tasks
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks (user_id, created_at DESC, id DESC)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_status_created ON tasks (user_id, status, created_at DESC, id DESC)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_created ON tasks (user_id, priority, created_at DESC, id DESC)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_due_date ON tasks (user_id, due_date)")
+
+    # Full-text search: generated tsvector column + GIN, trigram index for typo tolerance
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm ON tasks USING GIN (title gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_tasks_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_tasks_search_vector")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP INDEX IF EXISTS idx_tasks_user_due_date")
+    op.execute("DROP INDEX IF EXISTS idx_tasks_user_priority_created")
+    op.execute("DROP INDEX IF EXISTS idx_tasks_user_status_created")
+    op.execute("DROP INDEX IF EXISTS idx_tasks_user_created")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS profile_version")
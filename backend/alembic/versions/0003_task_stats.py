@@ -0,0 +1,113 @@
+"""Per-user task counters (task_stats) maintained by a trigger on tasks
+
+Counters are seeded from existing tasks, so upgrading a populated database
+needs no separate `python task_stats.py rebuild`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+TASK_STATS_SQL = """
+CREATE TABLE IF NOT EXISTS task_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    in_progress INTEGER NOT NULL DEFAULT 0,
+    high_priority INTEGER NOT NULL DEFAULT 0,
+    medium_priority INTEGER NOT NULL DEFAULT 0,
+    low_priority INTEGER NOT NULL DEFAULT 0,
+    -- sum of (updated_at - created_at) over completed tasks, for the average
+    completion_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    -- bumped on every task write; never reset (ETags for GET /api/tasks)
+    version BIGINT NOT NULL DEFAULT 0
+);
+ALTER TABLE task_stats ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION apply_task_stats_delta(r tasks, sign INTEGER) RETURNS void AS $$
+BEGIN
+    IF r.user_id IS NULL THEN
+        RETURN;
+    END IF;
+    IF sign > 0 THEN
+        INSERT INTO task_stats (user_id) VALUES (r.user_id) ON CONFLICT (user_id) DO NOTHING;
+    END IF;
+    -- Decrements only touch an existing row (it may already be gone when a user is deleted)
+    UPDATE task_stats SET
+        version = version + 1,
+        total = total + sign,
+        completed = completed + CASE WHEN r.status = 'completed' THEN sign ELSE 0 END,
+        in_progress = in_progress + CASE WHEN r.status = 'in_progress' THEN sign ELSE 0 END,
+        high_priority = high_priority + CASE WHEN r.priority = 'high' THEN sign ELSE 0 END,
+        medium_priority = medium_priority + CASE WHEN r.priority = 'medium' THEN sign ELSE 0 END,
+        low_priority = low_priority + CASE WHEN r.priority = 'low' THEN sign ELSE 0 END,
+        completion_seconds_sum = completion_seconds_sum + CASE
+            WHEN r.status = 'completed'
+            THEN sign * COALESCE(EXTRACT(EPOCH FROM (r.updated_at - r.created_at)), 0)
+            ELSE 0 END
+    WHERE user_id = r.user_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION task_stats_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_task_stats_delta(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_task_stats_delta(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only client-visible columns: bookkeeping updates (e.g. reminded_at) skip the trigger
+DROP TRIGGER IF EXISTS trg_task_stats ON tasks;
+CREATE TRIGGER trg_task_stats
+    AFTER INSERT OR DELETE
+       OR UPDATE OF title, description, priority, status, due_date, created_at, updated_at, user_id
+    ON tasks
+    FOR EACH ROW EXECUTE FUNCTION task_stats_trigger();
+
+-- Overdue depends on the clock, so it is counted live through this partial index
+CREATE INDEX IF NOT EXISTS idx_tasks_user_open_due ON tasks (user_id, due_date)
+    WHERE status <> 'completed';
+"""
+
+
+def upgrade():
+    op.execute(TASK_STATS_SQL)
+    # Seed users that have tasks but no counter row yet (existing rows are kept)
+    op.execute("""
+        INSERT INTO task_stats (user_id, total, completed, in_progress, high_priority,
+                                medium_priority, low_priority, completion_seconds_sum)
+        SELECT user_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'completed'),
+               COUNT(*) FILTER (WHERE status = 'in_progress'),
+               COUNT(*) FILTER (WHERE priority = 'high'),
+               COUNT(*) FILTER (WHERE priority = 'medium'),
+               COUNT(*) FILTER (WHERE priority = 'low'),
+               COALESCE(SUM(EXTRACT(EPOCH FROM (updated_at - created_at)))
+                        FILTER (WHERE status = 'completed'), 0)
+        FROM tasks
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO NOTHING
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_tasks_user_open_due")
+    op.execute("DROP TRIGGER IF EXISTS trg_task_stats ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_stats_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS apply_task_stats_delta(tasks, INTEGER)")
+    op.execute("DROP TABLE IF EXISTS task_stats")
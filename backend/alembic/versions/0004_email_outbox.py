@@ -0,0 +1,36 @@
+"""Durable email outbox drained by the delivery worker
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id BIGSERIAL PRIMARY KEY,
+            to_email VARCHAR(255) NOT NULL,
+            subject TEXT NOT NULL,
+            html_content TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, sent, dead
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (next_attempt_at)
+            WHERE status = 'pending';
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS email_outbox")
@@ -0,0 +1,44 @@
+"""Notification coalescing buffer, daily stats and per-user delivery mode
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE users ADD COLUMN IF NOT EXISTS notification_mode VARCHAR(20) NOT NULL DEFAULT 'immediate';
+
+        CREATE TABLE IF NOT EXISTS notification_events (
+            id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            kind VARCHAR(30) NOT NULL,  -- task_created, task_completed, task_deleted, task_reminder, bulk, login
+            payload JSONB NOT NULL DEFAULT '{}',
+            deliver_after TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_notification_events_due ON notification_events (deliver_after);
+        CREATE INDEX IF NOT EXISTS idx_notification_events_user ON notification_events (user_id, deliver_after);
+
+        -- One row per day, written only by the flusher (no hot row on the request path)
+        CREATE TABLE IF NOT EXISTS notification_stats (
+            day DATE PRIMARY KEY,
+            events INTEGER NOT NULL DEFAULT 0,
+            emails INTEGER NOT NULL DEFAULT 0,
+            suppressed INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS notification_stats")
+    op.execute("DROP TABLE IF EXISTS notification_events")
+    op.execute("ALTER TABLE users DROP COLUMN IF EXISTS notification_mode")
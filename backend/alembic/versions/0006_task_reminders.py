@@ -0,0 +1,26 @@
+"""Due-date reminder bookkeeping (tasks.reminded_at) and the sweep index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS reminded_at TIMESTAMP;
+        CREATE INDEX IF NOT EXISTS idx_tasks_reminder_due ON tasks (due_date)
+            WHERE reminded_at IS NULL AND status <> 'completed' AND due_date IS NOT NULL;
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_tasks_reminder_due")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS reminded_at")
@@ -0,0 +1,38 @@
+"""Refresh-token sessions backing short-lived access tokens and logout
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS auth_sessions (
+            id BIGSERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            refresh_token_hash BYTEA NOT NULL,  -- SHA-256 of the current refresh token
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            revoked_at TIMESTAMP
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_auth_sessions_refresh ON auth_sessions (refresh_token_hash);
+        CREATE INDEX IF NOT EXISTS idx_auth_sessions_user_active ON auth_sessions (user_id)
+            WHERE revoked_at IS NULL;
+        -- Revocation window reloaded by every worker (sessions.RevocationListener)
+        CREATE INDEX IF NOT EXISTS idx_auth_sessions_revoked ON auth_sessions (revoked_at)
+            WHERE revoked_at IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_auth_sessions_expires ON auth_sessions (expires_at);
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS auth_sessions")
@@ -0,0 +1,79 @@
+"""Update task_stats once per INSERT statement instead of once per inserted row
+
+Bulk loads (COPY in /api/tasks/import, multi-row INSERTs in /api/tasks/bulk)
+used to run the row trigger for every task, each one upserting the same
+task_stats row. Inserts now go through a statement-level trigger that reads
+the transition table and applies one aggregated delta per user; UPDATE and
+DELETE keep the row trigger from 0003.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION task_stats_insert_trigger() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO task_stats AS s (user_id, version, total, completed, in_progress, high_priority,
+                                         medium_priority, low_priority, completion_seconds_sum)
+            SELECT user_id,
+                   COUNT(*),
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 'completed'),
+                   COUNT(*) FILTER (WHERE status = 'in_progress'),
+                   COUNT(*) FILTER (WHERE priority = 'high'),
+                   COUNT(*) FILTER (WHERE priority = 'medium'),
+                   COUNT(*) FILTER (WHERE priority = 'low'),
+                   COALESCE(SUM(EXTRACT(EPOCH FROM (updated_at - created_at)))
+                            FILTER (WHERE status = 'completed'), 0)
+            FROM new_tasks
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET
+                version = s.version + EXCLUDED.version,
+                total = s.total + EXCLUDED.total,
+                completed = s.completed + EXCLUDED.completed,
+                in_progress = s.in_progress + EXCLUDED.in_progress,
+                high_priority = s.high_priority + EXCLUDED.high_priority,
+                medium_priority = s.medium_priority + EXCLUDED.medium_priority,
+                low_priority = s.low_priority + EXCLUDED.low_priority,
+                completion_seconds_sum = s.completion_seconds_sum + EXCLUDED.completion_seconds_sum;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_task_stats ON tasks;
+        CREATE TRIGGER trg_task_stats
+            AFTER DELETE
+               OR UPDATE OF title, description, priority, status, due_date, created_at, updated_at, user_id
+            ON tasks
+            FOR EACH ROW EXECUTE FUNCTION task_stats_trigger();
+
+        DROP TRIGGER IF EXISTS trg_task_stats_insert ON tasks;
+        CREATE TRIGGER trg_task_stats_insert
+            AFTER INSERT ON tasks
+            REFERENCING NEW TABLE AS new_tasks
+            FOR EACH STATEMENT EXECUTE FUNCTION task_stats_insert_trigger();
+    """)
+
+
+def downgrade():
+    op.execute("""
+        DROP TRIGGER IF EXISTS trg_task_stats_insert ON tasks;
+        DROP FUNCTION IF EXISTS task_stats_insert_trigger();
+        DROP TRIGGER IF EXISTS trg_task_stats ON tasks;
+        CREATE TRIGGER trg_task_stats
+            AFTER INSERT OR DELETE
+               OR UPDATE OF title, description, priority, status, due_date, created_at, updated_at, user_id
+            ON tasks
+            FOR EACH ROW EXECUTE FUNCTION task_stats_trigger();
+    """)
@@ -0,0 +1,86 @@
+"""Change cursor on tasks and a tombstone log for deletions (GET /api/tasks/changes)
+
+tasks.change_xid records the transaction that last made a client-visible change
+(set on INSERT by default, on UPDATE by trigger; bookkeeping such as reminded_at
+does not count). Deletes leave a row in task_tombstones, written per statement
+from the transition table. Both are indexed by (user_id, change_xid) so a sync
+reads only what changed. task_sync_horizon remembers the newest tombstone purged
+by compaction; older cursors must do a full resync.
+
+Uses xid8 / pg_current_xact_id(), so PostgreSQL 13 or newer is required.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+        CREATE INDEX IF NOT EXISTS idx_tasks_user_change ON tasks (user_id, change_xid);
+
+        CREATE OR REPLACE FUNCTION task_change_xid_trigger() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_task_change_xid ON tasks;
+        CREATE TRIGGER trg_task_change_xid
+            BEFORE UPDATE OF title, description, priority, status, due_date, created_at, updated_at, user_id
+            ON tasks
+            FOR EACH ROW EXECUTE FUNCTION task_change_xid_trigger();
+
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            task_id INTEGER PRIMARY KEY,
+            -- no FK: tombstones outlive the task, and the user for cascaded deletes
+            user_id INTEGER NOT NULL,
+            change_xid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+            deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_tombstones_user_change ON task_tombstones (user_id, change_xid);
+        CREATE INDEX IF NOT EXISTS idx_task_tombstones_deleted_at ON task_tombstones (deleted_at);
+
+        CREATE OR REPLACE FUNCTION task_tombstone_trigger() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO task_tombstones (task_id, user_id)
+            SELECT id, user_id FROM old_tasks WHERE user_id IS NOT NULL
+            ON CONFLICT (task_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_task_tombstones ON tasks;
+        CREATE TRIGGER trg_task_tombstones
+            AFTER DELETE ON tasks
+            REFERENCING OLD TABLE AS old_tasks
+            FOR EACH STATEMENT EXECUTE FUNCTION task_tombstone_trigger();
+
+        CREATE TABLE IF NOT EXISTS task_sync_horizon (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            purged_xid xid8 NOT NULL DEFAULT '0'
+        );
+        INSERT INTO task_sync_horizon (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+    """)
+
+
+def downgrade():
+    op.execute("""
+        DROP TABLE IF EXISTS task_sync_horizon;
+        DROP TRIGGER IF EXISTS trg_task_tombstones ON tasks;
+        DROP FUNCTION IF EXISTS task_tombstone_trigger();
+        DROP TABLE IF EXISTS task_tombstones;
+        DROP TRIGGER IF EXISTS trg_task_change_xid ON tasks;
+        DROP FUNCTION IF EXISTS task_change_xid_trigger();
+        DROP INDEX IF EXISTS idx_tasks_user_change;
+        ALTER TABLE tasks DROP COLUMN IF EXISTS change_xid;
+    """)
@@ -6,14 +6,16 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
+import hashlib
 import os
 import secrets
-
-# Load .env config so SECRET_KEY/ALGORITHM/EXPIRY are available
-load_dotenv()
+import time
+from cache import TTLCache
+from sessions import create_session, is_session_revoked, rotate_session
 
 # Read secret key from env; auto-generate for local dev if missing
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -21,9 +23,10 @@ if not SECRET_KEY or SECRET_KEY == "your-secret-key-here-change-in-production":
     SECRET_KEY = secrets.token_hex(32)  # random 64-hex chars for JWT signing
     print(f"[AUTO] Generated JWT SECRET_KEY")
 
-# JWT algorithm and token lifetime (default 30 days) derived from env
+# JWT algorithm and access-token lifetime (default 15 minutes; clients renew
+# through refresh tokens, see sessions.py) derived from env
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 43200))
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 
 # Password hashing context (bcrypt) and OAuth2 bearer token extractor
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -37,6 +40,64 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# Password hashing worker pool
+# Purpose: keep bcrypt (tens to hundreds of ms per call) off the event loop
+# How: "thread" (default; bcrypt releases the GIL) or "process" executor;
+#      at most PASSWORD_HASH_MAX_PENDING jobs are queued, extra callers get 503
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread").lower()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+_hash_executor = None
+_hash_pending = 0
+
+def _get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="pwhash"
+            )
+    return _hash_executor
+
+async def _run_hash_job(fn, *args):
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+# Purpose: awaitable variants used by async route handlers
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_hash_job(get_password_hash, password)
+
+# Purpose: optional startup warm-up (main.STARTUP_WARMUP)
+# How: loads passlib's bcrypt backend and starts the worker pool, which would
+#      otherwise happen on the first login after a cold start
+def warm_up_password_hashing():
+    pwd_context.handler("bcrypt").get_backend()
+    _get_hash_executor().submit(os.getpid).result()
+
+# Purpose: stop hashing workers on app shutdown
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 # Purpose: build a signed JWT with an expiry carrying provided claims
 # How: encodes with SECRET_KEY and ALGORITHM; used by login/register flows
 def create_access_token(data: dict):
@@ -46,20 +107,121 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _token_pair(user_id, session_id, refresh_token):
+    return {
+        "access_token": create_access_token(data={"user_id": user_id, "sid": session_id}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+# Purpose: start a session for a freshly authenticated user (caller commits)
+# How: access token carries the session id so logout can revoke it
+def issue_tokens(cur, user_id):
+    session_id, refresh_token = create_session(cur, user_id)
+    return _token_pair(user_id, session_id, refresh_token)
+
+# Purpose: POST /api/auth/refresh; rotates the refresh token (caller commits)
+# How: returns None for unknown, reused, expired or revoked refresh tokens
+def refresh_tokens(cur, refresh_token):
+    rotated = rotate_session(cur, refresh_token)
+    if rotated is None:
+        return None
+    return _token_pair(*rotated)
+
+# Decoded-token cache
+# Purpose: skip HMAC verification + claim parsing for tokens presented recently
+# How: keyed by the token's SHA-256 digest (raw tokens are never kept); an entry
+#      expires at the token's own `exp`, capped at JWT_CACHE_TTL. Only successfully
+#      verified tokens are cached
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))
+JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL", 300))
+
+_token_cache = TTLCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+def token_cache_stats():
+    return _token_cache.stats()
+
 # Purpose: FastAPI dependency to authenticate requests via Bearer token
 # Why: Ensures protected routes only proceed with valid JWT
-# How: Decodes JWT and exposes minimal user identity to route handlers
+# How: Decodes JWT (or reuses a cached decode), rejects revoked sessions with an
+#      in-memory lookup, and exposes minimal user identity + session id
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("user_id")
-        if user_id is None:
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = _token_cache.get(digest)
+    if claims is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
             raise credentials_exception
-        return {"id": user_id}
-    except JWTError:
+        # Tokens without a session id predate revocation support and cannot be revoked;
+        # single-purpose tokens (stream tickets) are never access tokens
+        if payload.get("user_id") is None or payload.get("sid") is None or "purpose" in payload:
+            raise credentials_exception
+        claims = (payload["user_id"], payload["sid"])
+        expires_in = payload["exp"] - time.time() if "exp" in payload else None
+        _token_cache.set(digest, claims, ttl=expires_in)
+
+    user_id, session_id = claims
+    if is_session_revoked(session_id):
         raise credentials_exception
+    return {"id": user_id, "sid": session_id}
+
+# Stream tickets
+# Purpose: let EventSource (which cannot send headers) open /api/tasks/events
+#          without putting the access token in URLs and access logs
+# How: POST /api/tasks/events/ticket trades a Bearer token for a JWT that lives
+#      STREAM_TICKET_SECONDS, is only valid for the event stream ("purpose"
+#      claim, rejected by get_current_user) and is accepted once per worker
+STREAM_TICKET_SECONDS = int(os.getenv("STREAM_TICKET_SECONDS", 30))
+STREAM_TICKET_PURPOSE = "task_events"
+
+_used_stream_tickets = TTLCache(JWT_CACHE_SIZE, STREAM_TICKET_SECONDS)
+
+def create_stream_ticket(user_id, session_id):
+    expire = datetime.utcnow() + timedelta(seconds=STREAM_TICKET_SECONDS)
+    return jwt.encode(
+        {
+            "user_id": user_id,
+            "sid": session_id,
+            "purpose": STREAM_TICKET_PURPOSE,
+            "jti": secrets.token_urlsafe(12),
+            "exp": expire,
+        },
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+def _redeem_stream_ticket(ticket):
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("purpose") != STREAM_TICKET_PURPOSE or payload.get("jti") is None:
+        return None
+    if _used_stream_tickets.get(payload["jti"]) is not None:
+        return None
+    _used_stream_tickets.set(payload["jti"], True)
+    if is_session_revoked(payload["sid"]):
+        return None
+    return {"id": payload["user_id"], "sid": payload["sid"]}
+
+# Purpose: authenticate event streams with a Bearer header (non-browser clients)
+#          or a one-time ?ticket= from create_stream_ticket (EventSource)
+async def get_stream_user(request: Request, ticket: str = None):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return await get_current_user(token)
+    user = _redeem_stream_ticket(ticket) if ticket else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -0,0 +1,422 @@
+"""
+End-to-end API load test
+
+Purpose:
+- Drive the whole API (auth, pool, handlers, outbox email delivery) with a
+  realistic mix of login / list tasks / create / toggle status / delete and
+  report throughput plus p50/p95/p99 per endpoint as JSON
+- Fail (exit 1) when an endpoint's p95 regressed against a saved baseline, so
+  slowdowns in main.py hot paths are caught before deployment
+
+Why:
+- The other scripts in benchmarks/ each isolate one path; nothing exercised the
+  endpoints together against a real database the way the frontend does
+
+How:
+- Target: by default starts uvicorn on a free port (like cold_start.py);
+  --in-process drives main.app through httpx.ASGITransport instead (client and
+  server then share one event loop); --base-url uses a server you started
+- Email: a local HTTP sink stands in for SendGrid. The spawned/in-process API
+  gets SENDGRID_API_HOST pointing at it, so the real SDK and outbox worker run
+  without sending mail (start your own --base-url server with the printed env)
+- Registers --users fresh accounts, then --concurrency virtual users loop over
+  the weighted --mix for --duration seconds after --warmup (not recorded).
+  toggle/delete act on tasks the same virtual user created
+- Prints one JSON document; --output appends it as a JSON line; --baseline
+  compares p95 per endpoint with a previous result (last line of the file)
+- Deletes the benchmark accounts afterwards (DATABASE_URL) unless --keep-data
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated local database):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/api_load.py --duration 30 --concurrency 32 --users 16 \\
+        --mix login=1,list=10,create=3,toggle=3,delete=2 \\
+        --output api_load.jsonl [--baseline api_load.jsonl --max-regression 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ("login", "list", "create", "toggle", "delete")
+BENCH_PASSWORD = "bench-password-123"
+# Reserved for examples (RFC 2606) and accepted by EmailStr, unlike .local/.test
+BENCH_EMAIL_DOMAIN = "example.com"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples, errors, elapsed):
+    return {
+        "count": len(samples),
+        "errors": dict(sorted(errors.items())),
+        "per_sec": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class SendGridSink:
+    """Accepts SendGrid v3 API calls on localhost and answers 202 like the real service."""
+
+    def __init__(self, latency):
+        self.received = 0
+        lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if latency:
+                    time.sleep(latency)
+                with lock:
+                    sink.received += 1
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class Stats:
+    def __init__(self):
+        self.recording = False
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.errors = {name: {} for name in ENDPOINTS}
+
+    def record(self, name, elapsed, status_code, ok):
+        if not self.recording:
+            return
+        if ok:
+            self.samples[name].append(elapsed)
+        else:
+            key = str(status_code)
+            self.errors[name][key] = self.errors[name].get(key, 0) + 1
+
+
+class VirtualUser:
+    def __init__(self, client, account, stats, rng):
+        self.client = client
+        self.account = account
+        self.stats = stats
+        self.rng = rng
+        self.headers = {}
+        self.task_ids = []
+
+    async def call(self, name, method, url, ok_status=200, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(name, time.perf_counter() - start, type(e).__name__, False)
+            return None
+        elapsed = time.perf_counter() - start
+        ok = response.status_code == ok_status
+        self.stats.record(name, elapsed, response.status_code, ok)
+        if response.status_code == 401 and name != "login":
+            await self.login()
+        return response if ok else None
+
+    async def login(self):
+        self.headers = {}
+        response = await self.call(
+            "login", "POST", "/api/auth/login",
+            json={"email": self.account, "password": BENCH_PASSWORD},
+        )
+        if response is not None:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def step(self, name):
+        if name in ("toggle", "delete") and not self.task_ids:
+            name = "create"
+        if name == "login":
+            await self.login()
+        elif name == "list":
+            await self.call("list", "GET", "/api/tasks", params={"limit": 50})
+        elif name == "create":
+            response = await self.call("create", "POST", "/api/tasks", json={
+                "title": f"Load test task {self.rng.randrange(1_000_000)}",
+                "description": "Created by benchmarks/api_load.py",
+                "priority": self.rng.choice(["low", "medium", "high"]),
+                "due_date": None,
+            })
+            if response is not None:
+                self.task_ids.append(response.json()["id"])
+        elif name == "toggle":
+            task_id = self.rng.choice(self.task_ids)
+            await self.call("toggle", "PUT", f"/api/tasks/{task_id}", json={
+                "status": self.rng.choice(["completed", "in_progress"]),
+            })
+        elif name == "delete":
+            task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+            await self.call("delete", "DELETE", f"/api/tasks/{task_id}")
+
+    async def run(self, mix, deadline, think_time):
+        names, weights = list(mix), list(mix.values())
+        await self.login()
+        while time.perf_counter() < deadline:
+            await self.step(self.rng.choices(names, weights)[0])
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+async def register_accounts(client, run_id, count):
+    accounts = [f"bench-{run_id}-{i}@{BENCH_EMAIL_DOMAIN}" for i in range(count)]
+    semaphore = asyncio.Semaphore(8)
+
+    async def register(email):
+        async with semaphore:
+            response = await client.post("/api/auth/register", json={
+                "email": email, "password": BENCH_PASSWORD, "full_name": "Load Test",
+            })
+            response.raise_for_status()
+
+    await asyncio.gather(*(register(email) for email in accounts))
+    return accounts
+
+
+async def drive(client, args, run_id):
+    accounts = await register_accounts(client, run_id, args.users)
+    stats = Stats()
+    rng = random.Random(args.seed)
+    users = [
+        VirtualUser(client, accounts[i % len(accounts)], stats, random.Random(rng.random()))
+        for i in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    deadline = started + args.warmup + args.duration
+
+    async def start_recording():
+        await asyncio.sleep(args.warmup)
+        stats.recording = True
+        return time.perf_counter()
+
+    results = await asyncio.gather(
+        start_recording(),
+        *(user.run(args.mix, deadline, args.think_time) for user in users),
+    )
+    elapsed = time.perf_counter() - results[0]
+
+    endpoints = {
+        name: summarize(stats.samples[name], stats.errors[name], elapsed)
+        for name in ENDPOINTS if name in args.mix
+    }
+    all_samples = [sample for name in endpoints for sample in stats.samples[name]]
+    all_errors = {}
+    for name in endpoints:
+        for code, count in stats.errors[name].items():
+            all_errors[code] = all_errors.get(code, 0) + count
+    return {"endpoints": endpoints, "total": summarize(all_samples, all_errors, elapsed)}
+
+
+async def run_against_url(base_url, args, run_id):
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await drive(client, args, run_id)
+
+
+async def run_in_process(args, run_id):
+    sys.path.insert(0, BACKEND_DIR)
+    import main  # noqa: E402  (env for the sink is set before this import)
+
+    await main.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api_load", timeout=60) as client:
+            return await drive(client, args, run_id)
+    finally:
+        await main.shutdown_event()
+
+
+def start_server(env, timeout):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    deadline = time.perf_counter() + timeout
+    with httpx.Client(base_url=base_url, timeout=5) as client:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited during startup:\n{server.stderr.read()[-2000:]}")
+            if time.perf_counter() > deadline:
+                server.terminate()
+                raise RuntimeError(f"server not ready after {timeout}s")
+            try:
+                if client.get("/api/health").status_code == 200:
+                    return server, base_url
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def delete_accounts(run_id):
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+    try:
+        with conn.cursor() as cur:
+            # tasks, sessions and notification events go with the users (ON DELETE CASCADE)
+            cur.execute("DELETE FROM users WHERE email LIKE %s", (f"bench-{run_id}-%@{BENCH_EMAIL_DOMAIN}",))
+            deleted = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return deleted
+
+
+def load_baseline(path):
+    with open(path) as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def regressions(result, baseline, tolerance):
+    found = []
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or not previous["p95_ms"] or not current["count"]:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append({"endpoint": name, "baseline_p95_ms": previous["p95_ms"], "p95_ms": current["p95_ms"]})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="benchmark an already running server")
+    target.add_argument("--in-process", action="store_true", help="drive main.app through ASGITransport")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unrecorded seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--users", type=int, default=16, help="accounts shared by the virtual users")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("login=1,list=10,create=3,toggle=3,delete=2"))
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between a user's requests (s)")
+    parser.add_argument("--sink-latency", type=float, default=0.0, help="simulated SendGrid latency (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=60, help="server startup timeout (s)")
+    parser.add_argument("--output", help="append the result as one JSON line")
+    parser.add_argument("--baseline", help="result file to compare p95s against (last line is used)")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 growth (0.25 = +25%%)")
+    parser.add_argument("--keep-data", action="store_true", help="do not delete the benchmark accounts")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    mode = "url" if args.base_url else "in-process" if args.in_process else "uvicorn"
+    with SendGridSink(args.sink_latency) as sink:
+        sink_env = {"SENDGRID_API_HOST": sink.url, "SENDGRID_API_KEY": "SG.load-test", "SMTP_FROM_EMAIL": f"bench@{BENCH_EMAIL_DOMAIN}"}
+        try:
+            if args.base_url:
+                print(f"ℹ️ Emails reach the sink only if the server runs with {sink_env}", file=sys.stderr)
+                result = asyncio.run(run_against_url(args.base_url, args, run_id))
+            elif args.in_process:
+                os.environ.update(sink_env)
+                result = asyncio.run(run_in_process(args, run_id))
+            else:
+                server, base_url = start_server(dict(os.environ, **sink_env), args.timeout)
+                try:
+                    result = asyncio.run(run_against_url(base_url, args, run_id))
+                finally:
+                    stop_server(server)
+        finally:
+            if not args.keep_data:
+                delete_accounts(run_id)
+        emails = sink.received
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "mode": mode,
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "mix": args.mix,
+        **result,
+        "emails_delivered": emails,
+    }
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        result["regressions"] = regressions(result, baseline, args.max_regression) if baseline else []
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
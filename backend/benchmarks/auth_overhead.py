@@ -0,0 +1,82 @@
+"""
+Auth dependency micro-benchmark
+
+Purpose:
+- Measure the per-request cost of get_current_user (auth.py) with and without
+  the decoded-token cache
+
+Why:
+- Every authenticated request used to pay a full jwt.decode (HMAC + claim
+  parsing) for the same long-lived token; this shows what the cache saves
+
+How:
+- In-process, no server or database: signs --tokens tokens with
+  create_access_token, then calls the dependency --iterations times round-robin
+- "uncached" clears the cache before every call, "cached" lets it work
+- Prints one JSON object (per-call mean/p50/p99 in microseconds + cache stats)
+
+Usage (from backend/):
+    python benchmarks/auth_overhead.py --iterations 20000 --tokens 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(tokens, iterations, cached):
+    auth._token_cache.clear()
+    auth._token_cache.hits = auth._token_cache.misses = 0
+    samples = []
+    for i in range(iterations):
+        token = tokens[i % len(tokens)]
+        if not cached:
+            auth._token_cache.clear()
+        start = time.perf_counter()
+        await auth.get_current_user(token)
+        samples.append(time.perf_counter() - start)
+    return {
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "p50_us": round(percentile(samples, 50) * 1e6, 2),
+        "p99_us": round(percentile(samples, 99) * 1e6, 2),
+        "calls_per_sec": round(iterations / sum(samples)),
+    }
+
+
+async def run(args):
+    tokens = [auth.create_access_token({"user_id": user_id, "sid": user_id}) for user_id in range(1, args.tokens + 1)]
+    uncached = await measure(tokens, args.iterations, cached=False)
+    cached = await measure(tokens, args.iterations, cached=True)
+    return {
+        "iterations": args.iterations,
+        "tokens": args.tokens,
+        "uncached": uncached,
+        "cached": cached,
+        "speedup": round(uncached["mean_us"] / cached["mean_us"], 1) if cached["mean_us"] else None,
+        "cache": auth.token_cache_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost of the auth dependency")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens cycled through")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Cold start benchmark
+
+Purpose:
+- Track how long a fresh API process takes to import, to answer its first
+  request, and how slow the first real (authenticated) requests are
+
+Why:
+- On a scale-to-zero host every cold start is paid by a user's first request;
+  keeping a history of these numbers catches import-time regressions early
+
+How:
+- Import time: a fresh interpreter imports `main` (no DB access happens at import)
+- Boot: starts uvicorn on a free port and polls /api/health until it answers;
+  the server's own import/startup split comes from the health payload
+- Optionally logs in and reads /api/tasks once each (first-request latency)
+- Appends one JSON line per run to --output so results can be compared over time
+- --importtime prints the slowest modules from `python -X importtime`
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated database):
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/cold_start.py --runs 5 --output cold_start.jsonl \\
+        --email demo@taskflow.com --password demo123 [--warmup] [--importtime]
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_import():
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=BACKEND_DIR, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def slowest_imports(limit):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown as two spaces per level; keep the modules main imports directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def measure_boot(args, env):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    run = {}
+    try:
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            deadline = started + args.timeout
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited during startup:\n{server.stderr.read()[-2000:]}")
+                if time.perf_counter() > deadline:
+                    raise RuntimeError(f"server not ready after {args.timeout}s")
+                try:
+                    response = client.get("/api/health")
+                    if response.status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+            run["ready_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            run["server"] = response.json().get("startup", {})
+
+            if args.email:
+                start = time.perf_counter()
+                response = client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+                response.raise_for_status()
+                run["first_login_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                start = time.perf_counter()
+                client.get("/api/tasks", headers=headers, params={"limit": 50}).raise_for_status()
+                run["first_tasks_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import time and cold-start latency")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--email", help="account used for the first-request measurements")
+    parser.add_argument("--password")
+    parser.add_argument("--warmup", action="store_true", help="boot with STARTUP_WARMUP=true")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="append one JSON line per run to this file")
+    parser.add_argument("--importtime", type=int, nargs="?", const=15, default=0,
+                        help="show the N slowest modules imported by main (default 15)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, STARTUP_WARMUP="true" if args.warmup else "false")
+    revision = git_revision()
+    runs = []
+    for _ in range(args.runs):
+        run = {"import_ms": round(measure_import() * 1000, 1)}
+        run.update(measure_boot(args, env))
+        run.update({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": revision,
+            "python": platform.python_version(),
+            "warmup": args.warmup,
+        })
+        runs.append(run)
+        print(json.dumps(run))
+        if args.output:
+            with open(args.output, "a") as f:
+                f.write(json.dumps(run) + "\n")
+
+    keys = ["import_ms", "ready_ms", "first_login_ms", "first_tasks_ms"]
+    summary = {
+        key: round(statistics.median(run[key] for run in runs), 1)
+        for key in keys if all(key in run for run in runs)
+    }
+    print(json.dumps({"median": summary, "runs": len(runs)}, indent=2))
+
+    if args.importtime:
+        print("\nSlowest imports made by main (cumulative):")
+        for cumulative, name in slowest_imports(args.importtime):
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
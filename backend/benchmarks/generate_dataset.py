@@ -0,0 +1,273 @@
+"""
+Synthetic dataset generator
+
+Purpose:
+- Bulk-load realistic users, tasks and OTP rows into the users / tasks / otps
+  tables so query behaviour can be measured at production-like sizes
+  (e.g. 1M users / 10M tasks); used by query_scaling.py
+
+Why:
+- Nobody could say how get_tasks, update_task or the OTP lookups behave at
+  scale; a handful of hand-made rows hides missing indexes and bad plans
+
+How:
+- Everything is streamed through COPY FROM STDIN in --batch-size row batches
+  (one commit each), so memory stays flat and the statement-level triggers
+  (task_stats, migration 0008) see one transition table per batch
+- Tasks per user follow a Pareto distribution (--skew; lower = heavier tail),
+  so a few users own thousands of tasks and most own a handful
+- Titles/descriptions come from a small vocabulary (full-text search has real
+  words to match), ~40% of tasks are completed, ~20% have no due date
+- All synthetic users share one bcrypt hash of --password and have emails
+  "<prefix>-<run>-<n>@taskflow.local"; --reset deletes every "<prefix>-*" user
+  (tasks cascade) and OTP first
+- Ends with ANALYZE and prints one JSON summary (rows and rows/sec per table)
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated database):
+    python benchmarks/generate_dataset.py --users 1000000 --tasks 10000000 \\
+        --otps 200000 --skew 1.2 --reset
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from array import array
+from datetime import datetime, timedelta
+
+import psycopg2
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMAIL_DOMAIN = "taskflow.local"
+
+VERBS = ["Prepare", "Review", "Update", "Draft", "Fix", "Plan", "Call", "Email", "Refactor", "Test",
+         "Schedule", "Deploy", "Write", "Clean", "Organize", "Research", "Design", "Book", "Pay", "Submit"]
+NOUNS = ["quarterly report", "invoice", "presentation", "budget", "roadmap", "dentist appointment",
+         "login page", "database migration", "grocery list", "team meeting", "blog post", "tax return",
+         "onboarding docs", "release notes", "client proposal", "garden", "flight", "newsletter",
+         "performance review", "API documentation"]
+DETAILS = ["before the deadline", "with the design team", "and share feedback", "for next sprint",
+           "including the appendix", "after lunch", "with updated numbers", "and archive the old one"]
+
+
+class CopyStream(io.TextIOBase):
+    """File-like view over an iterator of COPY text lines (what copy_expert reads)."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        parts, length = [self._buffer], len(self._buffer)
+        for line in self._lines:
+            parts.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_value(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def copy_batches(conn, table, columns, lines, batch_size):
+    """COPY `lines` into table in batches of batch_size, committing each; returns rows."""
+    total = 0
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    while True:
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            return total
+        with conn.cursor() as cur:
+            cur.copy_expert(sql, CopyStream(iter(batch)), size=1 << 16)
+        conn.commit()
+        total += len(batch)
+        print(f"  {table}: {total} rows", file=sys.stderr)
+
+
+def email_for(prefix, run, index):
+    return f"{prefix}-{run}-{index}@{EMAIL_DOMAIN}"
+
+
+def user_lines(rng, prefix, run, count, password_hash, now):
+    for index in range(count):
+        created = now - timedelta(days=365 + rng.random() * 365)
+        yield "\t".join((
+            email_for(prefix, run, index),
+            password_hash,
+            f"Synthetic User {index}",
+            created.isoformat(sep=" "),
+        )) + "\n"
+
+
+def tasks_per_user(rng, users, tasks, skew):
+    """Pareto-distributed task counts summing to `tasks`."""
+    weights = array("d", (rng.paretovariate(skew) for _ in range(users)))
+    scale = tasks / sum(weights)
+    counts = array("l", (int(weight * scale) for weight in weights))
+    for _ in range(tasks - sum(counts)):
+        counts[rng.randrange(users)] += 1
+    return counts
+
+
+def task_lines(rng, user_ids, counts, now):
+    for user_id, count in zip(user_ids, counts):
+        for _ in range(count):
+            created = now - timedelta(seconds=rng.random() * 365 * 86400)
+            completed = rng.random() < 0.4
+            updated = min(now, created + timedelta(seconds=rng.random() * 30 * 86400)) if completed else created
+            due = None if rng.random() < 0.2 else (created + timedelta(days=rng.randint(-10, 60))).date()
+            title = f"{rng.choice(VERBS)} {rng.choice(NOUNS)}"
+            description = f"{title} {rng.choice(DETAILS)}" if rng.random() < 0.6 else None
+            roll = rng.random()
+            priority = "high" if roll < 0.2 else "medium" if roll < 0.7 else "low"
+            yield "\t".join((
+                copy_value(title),
+                copy_value(description),
+                priority,
+                "completed" if completed else "in_progress",
+                copy_value(due),
+                created.isoformat(sep=" "),
+                updated.isoformat(sep=" "),
+                str(user_id),
+            )) + "\n"
+
+
+def otp_lines(rng, prefix, run, users, count, now):
+    for _ in range(count):
+        created = now - timedelta(seconds=rng.random() * 30 * 86400)
+        signup = rng.random() < 0.3
+        # Signup OTPs belong to addresses that never became users
+        email = f"{prefix}-{run}-signup-{rng.randrange(count)}@{EMAIL_DOMAIN}" if signup \
+            else email_for(prefix, run, rng.randrange(users))
+        yield "\t".join((
+            email,
+            f"{rng.randint(100000, 999999)}",
+            "signup" if signup else "login",
+            (created + timedelta(minutes=10)).isoformat(sep=" "),
+            "t" if rng.random() < 0.7 else "f",
+            created.isoformat(sep=" "),
+        )) + "\n"
+
+
+def fetch_user_ids(conn, prefix, run):
+    ids = array("l")
+    with conn.cursor(name="synthetic_users") as cur:
+        cur.itersize = 100000
+        cur.execute("SELECT id FROM users WHERE email LIKE %s ORDER BY id", (f"{prefix}-{run}-%",))
+        for (user_id,) in cur:
+            ids.append(user_id)
+    conn.commit()
+    return ids
+
+
+def reset(conn, prefix):
+    """Delete earlier synthetic data (tasks, sessions, stats cascade with the users)."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM otps WHERE email LIKE %s", (f"{prefix}-%",))
+        otps = cur.rowcount
+        cur.execute("DELETE FROM users WHERE email LIKE %s", (f"{prefix}-%",))
+        users = cur.rowcount
+    conn.commit()
+    return {"users": users, "otps": otps}
+
+
+def generate(conn, users, tasks, otps, skew=1.2, seed=7, prefix="synth", password="synthetic123",
+             batch_size=100000):
+    """Load one synthetic dataset; returns a summary dict."""
+    from passlib.context import CryptContext
+
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6]
+    now = datetime.now().replace(microsecond=0)
+    password_hash = CryptContext(schemes=["bcrypt"]).hash(password)
+    summary = {"run": run, "prefix": prefix, "seed": seed, "skew": skew}
+
+    started = time.perf_counter()
+    copy_batches(conn, "users", ("email", "hashed_password", "full_name", "created_at"),
+                 user_lines(rng, prefix, run, users, password_hash, now), batch_size)
+    summary["users"] = {"rows": users, "seconds": round(time.perf_counter() - started, 2)}
+
+    started = time.perf_counter()
+    user_ids = fetch_user_ids(conn, prefix, run)
+    counts = tasks_per_user(rng, len(user_ids), tasks, skew) if user_ids else array("l")
+    copy_batches(conn, "tasks",
+                 ("title", "description", "priority", "status", "due_date", "created_at", "updated_at", "user_id"),
+                 task_lines(rng, user_ids, counts, now), batch_size)
+    summary["tasks"] = {
+        "rows": sum(counts),
+        "seconds": round(time.perf_counter() - started, 2),
+        "max_per_user": max(counts) if counts else 0,
+        "median_per_user": sorted(counts)[len(counts) // 2] if counts else 0,
+    }
+
+    started = time.perf_counter()
+    copy_batches(conn, "otps", ("email", "code", "purpose", "expires_at", "used", "created_at"),
+                 otp_lines(rng, prefix, run, users, otps, now), batch_size)
+    summary["otps"] = {"rows": otps, "seconds": round(time.perf_counter() - started, 2)}
+
+    started = time.perf_counter()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE users, tasks, otps, task_stats")
+    finally:
+        conn.autocommit = False
+    summary["analyze_seconds"] = round(time.perf_counter() - started, 2)
+
+    for table in ("users", "tasks", "otps"):
+        seconds = summary[table]["seconds"]
+        summary[table]["rows_per_sec"] = round(summary[table]["rows"] / seconds) if seconds else None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--otps", type=int, default=None, help="default: one per 5 users")
+    parser.add_argument("--skew", type=float, default=1.2, help="Pareto alpha for tasks per user")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--prefix", default="synth", help="email prefix marking synthetic rows")
+    parser.add_argument("--password", default="synthetic123", help="password of every synthetic user")
+    parser.add_argument("--batch-size", type=int, default=100000, help="rows per COPY/commit")
+    parser.add_argument("--reset", action="store_true", help="delete earlier synthetic data first")
+    args = parser.parse_args()
+
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+    try:
+        result = {}
+        if args.reset:
+            result["reset"] = reset(conn, args.prefix)
+        result.update(generate(
+            conn, args.users, args.tasks, args.users // 5 if args.otps is None else args.otps,
+            skew=args.skew, seed=args.seed, prefix=args.prefix, password=args.password,
+            batch_size=args.batch_size,
+        ))
+    finally:
+        conn.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Login storm benchmark
+
+Purpose:
+- Measure auth requests/sec while many clients hammer a bcrypt-bound endpoint
+- Measure the tail latency of unrelated GET /api/tasks reads during the storm
+
+Why:
+- bcrypt used to run on the event loop and stall every other request, and
+  hashing while holding a pooled DB connection starves unrelated reads; this
+  shows whether the hashing worker pool (auth.py) keeps reads responsive
+
+How:
+- Runs against a live API (start uvicorn first) with an existing account
+- First samples /api/tasks alone (baseline), then again while the storm runs
+- --scenario picks the endpoint:
+    login      POST /api/auth/login (bcrypt verify)
+    register   POST /api/auth/register with fresh "<prefix>-<run>-<n>" emails (bcrypt hash;
+               creates accounts, so use a disposable database)
+    otp-login  POST /api/auth/request-login-otp (bcrypt verify, then OTP insert)
+  register and otp-login queue emails: point SENDGRID_API_HOST at a stub
+  (benchmarks/api_load.py runs one) or leave SendGrid credentials unset
+
+Usage:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/login_storm.py --base-url http://localhost:8000 \\
+        --email demo@taskflow.com --password demo123 --duration 20 --concurrency 32 \\
+        --scenario register
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    return {
+        "count": len(samples),
+        "per_sec": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def storm_requests(args):
+    """(path, body) factory for the chosen scenario."""
+    if args.scenario == "register":
+        run, counter = uuid.uuid4().hex[:6], itertools.count()
+        return lambda: ("/api/auth/register", {
+            "email": f"{args.register_prefix}-{run}-{next(counter)}@example.com",
+            "password": args.password,
+            "full_name": "Storm User",
+        })
+    path = "/api/auth/request-login-otp" if args.scenario == "otp-login" else "/api/auth/login"
+    return lambda: (path, {"email": args.email, "password": args.password})
+
+
+async def storm_worker(client, next_request, deadline, samples, errors):
+    while time.perf_counter() < deadline:
+        path, body = next_request()
+        start = time.perf_counter()
+        response = await client.post(path, json=body)
+        if response.status_code == 200:
+            samples.append(time.perf_counter() - start)
+        else:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+
+async def reader(client, token, deadline, samples, interval):
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/tasks", headers=headers)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        response = await client.post(
+            "/api/auth/login", json={"email": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        # Phase 1: reads with no competing load
+        baseline = []
+        start = time.perf_counter()
+        await reader(client, token, start + args.baseline_duration, baseline, args.read_interval)
+        baseline_elapsed = time.perf_counter() - start
+
+        # Phase 2: reads while the auth storm is running
+        storm, reads, errors = [], [], {}
+        next_request = storm_requests(args)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            reader(client, token, deadline, reads, args.read_interval),
+            *[storm_worker(client, next_request, deadline, storm, errors) for _ in range(args.concurrency)],
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "storm": summarize(storm, elapsed),
+        "storm_errors": errors,
+        "tasks_read_baseline": summarize(baseline, baseline_elapsed),
+        "tasks_read_during_storm": summarize(reads, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True, help="also the password of registered accounts")
+    parser.add_argument("--scenario", choices=["login", "register", "otp-login"], default="login")
+    parser.add_argument("--register-prefix", default="storm", help="email prefix for --scenario register")
+    parser.add_argument("--duration", type=float, default=20.0, help="storm length in seconds")
+    parser.add_argument("--baseline-duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="parallel storm clients")
+    parser.add_argument("--read-interval", type=float, default=0.05, help="pause between task reads")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
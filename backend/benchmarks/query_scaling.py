@@ -0,0 +1,335 @@
+"""
+Query scaling benchmark
+
+Purpose:
+- Record latency and the EXPLAIN (ANALYZE, BUFFERS) plan of every SQL statement
+  the API handlers run (main.py plus the task_stats/identity helpers they call),
+  at one or more dataset sizes
+
+Why:
+- Plans change with data size: a statement that is an index scan at 10k tasks
+  can turn into a seq scan or a huge sort at 10M; this makes that visible per
+  statement and per commit
+
+How:
+- --sizes USERSxTASKS[xOTPS] ... loads each size with generate_dataset.py
+  (after deleting earlier synthetic rows) and benchmarks it; without --sizes
+  the data already in the database is measured
+- Parameters come from real rows: a "heavy" user (most tasks) and a "median"
+  user, one of their tasks, a keyset cursor 50 rows in, and an existing OTP
+- Each statement runs --repeat times (median/p95 client-side latency), then
+  once under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). Writes run inside a
+  transaction that is rolled back, so the dataset never changes
+- Prints one JSON document per size; --output appends them as JSON lines.
+  Statements the API keeps in module-level constants (search, user insert, OTP
+  claim, notification/outbox/session inserts, pg_notify) are imported as-is;
+  the rest of STATEMENTS mirrors main.py: update it when a handler's SQL changes
+
+Usage (from backend/, with DATABASE_URL pointing at a migrated, disposable database):
+    python benchmarks/query_scaling.py --sizes 10000x100000 100000x1000000 1000000x10000000 \\
+        --repeat 20 --output query_scaling.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import Json
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import generate_dataset  # noqa: E402
+from email_outbox import ENQUEUE_EMAIL_SQL  # noqa: E402
+from main import (  # noqa: E402
+    CLAIM_SIGNUP_OTP_SQL,
+    INSERT_USER_SQL,
+    MARK_OTP_USED_SQL,
+    SEARCH_SQL,
+    TASK_COLUMNS,
+    search_params,
+)
+from notifications import RECORD_NOTIFICATION_SQL, window_params  # noqa: E402
+from sessions import CREATE_SESSION_SQL, REFRESH_TOKEN_EXPIRE_DAYS  # noqa: E402
+from task_events import NOTIFY_SQL, TASK_EVENTS_CHANNEL  # noqa: E402
+# (name, handler in main.py, sql, params(ctx), writes)
+STATEMENTS = [
+    ("users.by_email", "register / request_signup_otp / verify_signup_otp",
+     "SELECT id FROM users WHERE email = %s", lambda c: (c["email"],), False),
+    ("users.insert", "register / verify_signup_otp",
+     INSERT_USER_SQL, lambda c: (f"scaling-{time.perf_counter_ns()}@example.com", "x", "Scaling"), True),
+    ("users.login_lookup", "login / request_login_otp",
+     "SELECT * FROM users WHERE email = %s", lambda c: (c["email"],), False),
+    ("users.identity", "identity.get_user_identity (/me, /profile)",
+     "SELECT id, email, full_name, profile_version FROM users WHERE id = %s", lambda c: (c["user_id"],), False),
+    ("users.email_taken", "update_profile",
+     "SELECT id FROM users WHERE email = %s AND id != %s", lambda c: (c["email"], c["user_id"]), False),
+    ("users.update_profile", "update_profile",
+     "UPDATE users SET full_name = %s, profile_version = profile_version + 1 WHERE id = %s "
+     "RETURNING id, email, full_name", lambda c: ("Renamed", c["user_id"]), True),
+    ("users.notification_mode", "get_notification_preferences",
+     "SELECT notification_mode FROM users WHERE id = %s", lambda c: (c["user_id"],), False),
+    ("users.set_notification_mode", "update_notification_preferences",
+     "UPDATE users SET notification_mode = %s WHERE id = %s RETURNING notification_mode",
+     lambda c: ("digest", c["user_id"]), True),
+    ("otps.insert", "request_signup_otp / request_login_otp",
+     "INSERT INTO otps (email, code, purpose, expires_at) VALUES (%s, %s, %s, %s) RETURNING id, expires_at",
+     lambda c: (c["email"], "123456", "login", datetime.now() + timedelta(minutes=10)), True),
+    ("otps.verify_signup", "verify_signup_otp",
+     "SELECT id, email, code, purpose, expires_at, used FROM otps WHERE id = %s AND email = %s AND purpose = 'signup'",
+     lambda c: (c["otp_id"], c["otp_email"]), False),
+    ("otps.verify_login", "verify_login_otp",
+     "SELECT id, email, code, purpose, expires_at, used FROM otps WHERE id = %s AND purpose = 'login'",
+     lambda c: (c["otp_id"],), False),
+    ("otps.claim_signup", "verify_signup_otp",
+     CLAIM_SIGNUP_OTP_SQL, lambda c: (c["otp_id"], datetime.now()), True),
+    ("otps.mark_used", "verify_login_otp",
+     MARK_OTP_USED_SQL, lambda c: (c["otp_id"],), True),
+    ("otps.resend_lookup", "resend_otp",
+     "SELECT id, email, purpose, expires_at, used FROM otps WHERE id = %s", lambda c: (c["otp_id"],), False),
+    ("otps.resend_update", "resend_otp",
+     "UPDATE otps SET code = %s, expires_at = %s WHERE id = %s",
+     lambda c: ("654321", datetime.now() + timedelta(minutes=10), c["otp_id"]), True),
+    ("tasks.version", "get_tasks (task_stats.fetch_task_version)",
+     "SELECT version FROM task_stats WHERE user_id = %s", lambda c: (c["user_id"],), False),
+    ("tasks.list_all", "get_tasks (all=true)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s ORDER BY created_at DESC, id DESC",
+     lambda c: (c["user_id"],), False),
+    ("tasks.list_page", "get_tasks (default page, limit=50)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s ORDER BY created_at DESC, id DESC LIMIT %s",
+     lambda c: (c["user_id"], 51), False),
+    ("tasks.list_next_page", "get_tasks (limit=50, cursor)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND (created_at, id) < (%s, %s) "
+     "ORDER BY created_at DESC, id DESC LIMIT %s",
+     lambda c: (c["user_id"], c["cursor_created_at"], c["cursor_id"], 51), False),
+    ("tasks.list_status_page", "get_tasks (status=in_progress, limit=50)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND status = %s ORDER BY created_at DESC, id DESC LIMIT %s",
+     lambda c: (c["user_id"], "in_progress", 51), False),
+    ("tasks.list_due_range", "get_tasks (due_from/due_to)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND due_date >= %s AND due_date <= %s "
+     "ORDER BY created_at DESC, id DESC",
+     lambda c: (c["user_id"], date.today(), date.today() + timedelta(days=7)), False),
+    ("tasks.search", "search_tasks",
+     SEARCH_SQL, lambda c: search_params("report", c["user_id"], 21, 0), False),
+    ("tasks.stats_counters", "get_task_stats (task_stats.fetch_task_stats)",
+     "SELECT * FROM task_stats WHERE user_id = %s", lambda c: (c["user_id"],), False),
+    ("tasks.stats_overdue", "get_task_stats (task_stats.fetch_task_stats)",
+     "SELECT COUNT(*) AS overdue FROM tasks WHERE user_id = %s AND status <> 'completed' AND due_date < CURRENT_DATE",
+     lambda c: (c["user_id"],), False),
+    ("tasks.insert", "create_task",
+     f"INSERT INTO tasks (title, description, priority, status, due_date, user_id) VALUES (%s, %s, %s, %s, %s, %s) "
+     f"RETURNING {TASK_COLUMNS}",
+     lambda c: ("Scaling task", None, "medium", "in_progress", None, c["user_id"]), True),
+    ("tasks.update_lookup", "update_task",
+     "SELECT status, title FROM tasks WHERE id = %s AND user_id = %s", lambda c: (c["task_id"], c["user_id"]), False),
+    # What the frontend's status toggle sends: every field, the due date unchanged
+    ("tasks.update", "update_task",
+     "UPDATE tasks SET title = %s, description = %s, priority = %s, status = %s, due_date = %s, "
+     "reminded_at = CASE WHEN due_date IS DISTINCT FROM %s::date THEN NULL ELSE reminded_at END, "
+     f"updated_at = CURRENT_TIMESTAMP WHERE id = %s AND user_id = %s RETURNING {TASK_COLUMNS}",
+     lambda c: ("Scaling task", None, "medium", "completed", None, None, c["task_id"], c["user_id"]), True),
+    ("tasks.delete_lookup", "delete_task",
+     "SELECT title FROM tasks WHERE id = %s AND user_id = %s", lambda c: (c["task_id"], c["user_id"]), False),
+    ("tasks.delete", "delete_task",
+     "DELETE FROM tasks WHERE id = %s AND user_id = %s", lambda c: (c["task_id"], c["user_id"]), True),
+    ("tasks.bulk_lock", "bulk_tasks",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND id = ANY(%s) FOR UPDATE",
+     lambda c: (c["user_id"], c["task_ids"]), True),
+    ("tasks.export", "export_tasks",
+     "SELECT id, title, description, priority, status, due_date, created_at, updated_at "
+     "FROM tasks WHERE user_id = %s ORDER BY created_at DESC, id DESC",
+     lambda c: (c["user_id"],), False),
+    ("tasks.changes", "get_task_changes (task_sync.fetch_changes)",
+     f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND change_xid >= %s::xid8 "
+     "ORDER BY change_xid, id LIMIT %s",
+     lambda c: (c["user_id"], c["since"], 1001), False),
+    # Run inside every create/update/delete/login/register transaction
+    ("notifications.record", "task mutations / login (notifications.record_notification)",
+     RECORD_NOTIFICATION_SQL,
+     lambda c: {"user_id": c["user_id"], "kind": "task_created", "payload": Json({"title": "Scaling task"}),
+                **window_params()}, True),
+    ("outbox.insert", "register / OTP requests (email_outbox.enqueue_email)",
+     ENQUEUE_EMAIL_SQL, lambda c: (c["email"], "Subject", "<p>Body</p>", timedelta(0)), True),
+    ("sessions.create", "register / login / verify_*_otp (sessions.create_session)",
+     CREATE_SESSION_SQL, lambda c: (c["user_id"], b"\x00" * 32, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)), True),
+    ("tasks.notify", "task mutations (task_events.notify_task_change)",
+     NOTIFY_SQL, lambda c: (TASK_EVENTS_CHANNEL, f'{c["user_id"]}:{{"op": "resync"}}'), True),
+]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_size(text):
+    parts = [int(part) for part in text.lower().split("x")]
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError("size must be USERSxTASKS or USERSxTASKSxOTPS")
+    users, tasks = parts[:2]
+    return users, tasks, parts[2] if len(parts) == 3 else users // 5
+
+
+def table_counts(cur):
+    cur.execute("""
+        SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM tasks), (SELECT COUNT(*) FROM otps)
+    """)
+    users, tasks, otps = cur.fetchone()
+    return {"users": users, "tasks": tasks, "otps": otps}
+
+
+def user_context(cur, user_id):
+    cur.execute("SELECT email FROM users WHERE id = %s", (user_id,))
+    context = {"user_id": user_id, "email": cur.fetchone()[0]}
+    cur.execute(
+        "SELECT id, created_at FROM tasks WHERE user_id = %s ORDER BY created_at DESC, id DESC LIMIT 50",
+        (user_id,),
+    )
+    rows = cur.fetchall()
+    context["task_ids"] = [row[0] for row in rows]
+    context["task_id"] = rows[len(rows) // 2][0]
+    context["cursor_id"], context["cursor_created_at"] = rows[-1]
+    return context
+
+
+def build_contexts(cur):
+    """Parameters for a heavy and a median user, sharing one OTP and sync cursor."""
+    cur.execute("SELECT user_id FROM task_stats WHERE total > 0 ORDER BY total DESC LIMIT 1")
+    heavy = cur.fetchone()
+    if heavy is None:
+        raise SystemExit("No tasks found; load data first (generate_dataset.py or --sizes)")
+    cur.execute("""
+        SELECT user_id, total FROM task_stats WHERE total > 0 ORDER BY total
+        LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM task_stats WHERE total > 0)
+    """)
+    median = cur.fetchone()
+    cur.execute("SELECT id, email FROM otps ORDER BY id DESC LIMIT 1")
+    otp = cur.fetchone() or (0, "")
+    cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")
+    since = cur.fetchone()[0]
+
+    contexts = {}
+    for profile, user_id in (("heavy", heavy[0]), ("median", median[0])):
+        context = user_context(cur, user_id)
+        cur.execute("SELECT total FROM task_stats WHERE user_id = %s", (user_id,))
+        context["tasks"] = cur.fetchone()[0]
+        context.update({"otp_id": otp[0], "otp_email": otp[1], "since": since})
+        contexts[profile] = context
+    return contexts
+
+
+def plan_summary(node, nodes):
+    label = node["Node Type"]
+    if "Relation Name" in node:
+        label += f" on {node['Relation Name']}"
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    nodes.append(f"{label} (rows={node.get('Actual Rows')}, loops={node.get('Actual Loops')})")
+    for child in node.get("Plans", []):
+        plan_summary(child, nodes)
+    return nodes
+
+
+def measure(conn, sql, params, repeat):
+    samples = []
+    with conn.cursor() as cur:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cur.execute(sql, params)
+            if cur.description is not None:
+                cur.fetchall()
+            samples.append(time.perf_counter() - start)
+            conn.rollback()
+        cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+        explained = cur.fetchone()[0][0]
+        conn.rollback()
+    plan = explained["Plan"]
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "planning_ms": explained.get("Planning Time"),
+        "execution_ms": explained.get("Execution Time"),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks"),
+        "shared_read_blocks": plan.get("Shared Read Blocks"),
+        "seq_scan": any(line.startswith("Seq Scan") for line in plan_summary(plan, [])),
+        "plan": plan_summary(plan, []),
+    }
+
+
+def benchmark(conn, repeat):
+    with conn.cursor() as cur:
+        counts = table_counts(cur)
+        contexts = build_contexts(cur)
+    conn.rollback()
+
+    statements = []
+    for name, handler, sql, params, writes in STATEMENTS:
+        entry = {"name": name, "handler": handler, "writes": writes, "profiles": {}}
+        for profile, context in contexts.items():
+            try:
+                entry["profiles"][profile] = measure(conn, sql, params(context), repeat)
+            except psycopg2.Error as e:
+                conn.rollback()
+                entry["profiles"][profile] = {"error": str(e).strip()}
+        statements.append(entry)
+    return {
+        "dataset": counts,
+        "users": {profile: {"user_id": c["user_id"], "tasks": c["tasks"]} for profile, c in contexts.items()},
+        "statements": statements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_size, nargs="+",
+                        help="USERSxTASKS[xOTPS] datasets to generate and measure in turn")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skew", type=float, default=1.2)
+    parser.add_argument("--prefix", default="synth")
+    parser.add_argument("--output", help="append one JSON line per size to this file")
+    args = parser.parse_args()
+
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+    try:
+        for size in args.sizes or [None]:
+            result = {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": git_revision(),
+                "python": platform.python_version(),
+            }
+            if size is not None:
+                users, tasks, otps = size
+                generate_dataset.reset(conn, args.prefix)
+                result["generated"] = generate_dataset.generate(
+                    conn, users, tasks, otps, skew=args.skew, prefix=args.prefix,
+                )
+            result.update(benchmark(conn, args.repeat))
+            print(json.dumps(result, indent=2, default=str))
+            if args.output:
+                with open(args.output, "a") as f:
+                    f.write(json.dumps(result, default=str) + "\n")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Task list serialization benchmark
+
+Purpose:
+- Compare the two ways GET /api/tasks can turn rows into a JSON body:
+  FastAPI's generic path (dict copies -> jsonable_encoder -> json.dumps) and
+  the orjson fast path now used by the endpoint (ORJSONResponse on the rows)
+
+Why:
+- The generic encoder walks every field of every row in Python; for large task
+  lists serialization dominated the request time
+
+How:
+- In-process, no server or database: builds N synthetic rows shaped like the
+  SELECT in get_tasks (datetime/date values included), then renders each body
+  --repeat times per size and reports the median time, bytes and speedup
+- Also checks both paths produce the same JSON document after parsing
+
+Usage (from backend/):
+    python benchmarks/task_serialization.py --sizes 100 1000 10000 --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+
+def make_rows(count):
+    now = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    rows = []
+    for task_id in range(count, 0, -1):
+        created = now - timedelta(minutes=task_id)
+        rows.append({
+            "id": task_id,
+            "title": f"Task {task_id}: prepare the quarterly report",
+            "description": "Collect numbers, draft the summary and send it for review." if task_id % 3 else None,
+            "priority": random.choice(["low", "medium", "high"]),
+            "status": random.choice(["in_progress", "completed"]),
+            "due_date": date(2026, 1, 1) + timedelta(days=task_id % 30) if task_id % 4 else None,
+            "created_at": created,
+            "updated_at": created + timedelta(seconds=30),
+            "user_id": 1,
+        })
+    return rows
+
+
+def generic_body(rows):
+    # What `return [dict(task) for task in tasks]` with response_model=List[dict] did
+    return JSONResponse(jsonable_encoder([dict(row) for row in rows])).body
+
+
+def orjson_body(rows):
+    return ORJSONResponse(rows).body
+
+
+def timed(fn, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(rows)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare task list JSON serialization paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(7)
+    results = []
+    for size in args.sizes:
+        rows = make_rows(size)
+        generic_s, generic = timed(generic_body, rows, args.repeat)
+        fast_s, fast = timed(orjson_body, rows, args.repeat)
+        if json.loads(generic) != json.loads(fast):
+            raise SystemExit(f"Serialized bodies differ for {size} rows")
+        results.append({
+            "rows": size,
+            "generic_ms": round(generic_s * 1000, 3),
+            "orjson_ms": round(fast_s * 1000, 3),
+            "speedup": round(generic_s / fast_s, 1) if fast_s else None,
+            "generic_bytes": len(generic),
+            "orjson_bytes": len(fast),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Purpose: Durable email outbox drained by a dedicated delivery worker
+# Why: Sending from request handlers blocked the event loop on SendGrid and lost
+#      queued emails on restart; an outbox row commits atomically with the change
+#      that caused it and survives crashes
+# How: Routes call enqueue_email(cur, ...) inside their own transaction. Each API
+#      process runs one OutboxWorker that claims due rows with FOR UPDATE SKIP LOCKED
+#      (safe with many workers), sends them on a bounded thread pool through the
+#      reused SendGrid client, retries with exponential backoff and dead-letters
+#      rows after EMAIL_MAX_ATTEMPTS
+
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from psycopg2.extras import execute_values
+from database import pooled_connection
+from email_service import deliver_email, EmailDeliveryError
+
+
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", 4))  # concurrent SendGrid calls
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
+EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", 1.0))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 6))
+EMAIL_RETRY_BASE_DELAY = float(os.getenv("EMAIL_RETRY_BASE_DELAY", 30))
+EMAIL_RETRY_MAX_DELAY = float(os.getenv("EMAIL_RETRY_MAX_DELAY", 3600))
+# A claimed row is invisible to other workers for this long (crash recovery)
+EMAIL_CLAIM_LEASE = float(os.getenv("EMAIL_CLAIM_LEASE", 300))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", 7))
+
+
+ENQUEUE_EMAIL_SQL = """
+    INSERT INTO email_outbox (to_email, subject, html_content, next_attempt_at)
+    VALUES (%s, %s, %s, CURRENT_TIMESTAMP + %s)
+"""
+
+
+def enqueue_email(cur, to_email: str, subject: str, html_content: str, delay: Optional[timedelta] = None):
+    """Queue an email in the caller's transaction; it is sent only if that transaction commits."""
+    cur.execute(
+        ENQUEUE_EMAIL_SQL,
+        (to_email, subject, html_content, delay or timedelta(0)),
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped."""
+    delay = min(EMAIL_RETRY_MAX_DELAY, EMAIL_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    """Polls email_outbox and delivers due rows with bounded concurrency."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix="email")
+        self._task = None
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self):
+        """Skip the rest of the poll interval (call after committing new rows)."""
+        self._wake.set()
+
+    async def _run(self):
+        last_purge = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                batch = await run_in_threadpool(self._claim_batch)
+                if batch:
+                    outcomes = await asyncio.gather(*(self._deliver(row) for row in batch))
+                    await run_in_threadpool(self._record_outcomes, outcomes)
+                if time.monotonic() - last_purge > 3600:
+                    last_purge = time.monotonic()
+                    await run_in_threadpool(self._purge_sent)
+            except Exception as e:
+                batch = None
+                print(f"❌ Email outbox worker error: {e}")
+            # A full batch means more rows are probably due; go again immediately
+            if batch and len(batch) >= EMAIL_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=EMAIL_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _claim_batch(self):
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                UPDATE email_outbox
+                SET attempts = attempts + 1,
+                    next_attempt_at = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                WHERE id IN (
+                    SELECT id FROM email_outbox
+                    WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+                    ORDER BY next_attempt_at
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, to_email, subject, html_content, attempts
+                """,
+                (EMAIL_CLAIM_LEASE, EMAIL_BATCH_SIZE),
+            )
+            rows = cur.fetchall()
+            conn.commit()
+            cur.close()
+        return rows
+
+    async def _deliver(self, row):
+        outbox_id, to_email, subject, html_content, attempts = row
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, deliver_email, to_email, subject, html_content)
+            return outbox_id, "sent", 0.0, None
+        except EmailDeliveryError as e:
+            error, retryable = str(e), e.retryable
+        except Exception as e:
+            error, retryable = str(e), True
+        print(f"❌ Email failed to {to_email} (attempt {attempts}): {error}")
+        if not retryable or attempts >= EMAIL_MAX_ATTEMPTS:
+            return outbox_id, "dead", 0.0, error
+        return outbox_id, "pending", retry_delay(attempts), error
+
+    def _record_outcomes(self, outcomes):
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                """
+                UPDATE email_outbox AS o SET
+                    status = v.status,
+                    last_error = v.error,
+                    sent_at = CASE WHEN v.status = 'sent' THEN CURRENT_TIMESTAMP ELSE o.sent_at END,
+                    next_attempt_at = CASE WHEN v.status = 'pending'
+                        THEN CURRENT_TIMESTAMP + make_interval(secs => v.delay)
+                        ELSE o.next_attempt_at END
+                FROM (VALUES %s) AS v(id, status, delay, error)
+                WHERE o.id = v.id
+                """,
+                outcomes,
+                template="(%s::bigint, %s::varchar, %s::float8, %s::text)",
+            )
+            conn.commit()
+            cur.close()
+
+    def _purge_sent(self):
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "DELETE FROM email_outbox WHERE status = 'sent' AND sent_at < CURRENT_TIMESTAMP - make_interval(days => %s)",
+                (EMAIL_OUTBOX_RETENTION_DAYS,),
+            )
+            conn.commit()
+            cur.close()
@@ -1,52 +1,86 @@
-# Purpose: Centralized transactional email sending (SendGrid)
+# Purpose: Centralized transactional email templates and SendGrid delivery
 # Why: Provides consistent user notifications across auth and task events
-# How: Exposed helper functions are called from FastAPI routes in main.py
+# How: render_*_email() helpers return (subject, html); routes in main.py queue
+#      them through email_outbox.enqueue_email() and the outbox worker calls
+#      deliver_email() with a single reused SendGrid client; each call is counted
+#      and timed for /metrics
 
+import html
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import threading
+import time
+from metrics import EMAIL_LATENCY, EMAIL_SENDS
 
-# Load API credentials from env (.env during local dev)
-from dotenv import load_dotenv
-load_dotenv()
-
-# Required credentials: API key and from address
+# Required credentials (main.py loads .env during local dev): API key and from address
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 SMTP_FROM_EMAIL = os.getenv("SMTP_FROM_EMAIL")
+# Override the SendGrid API base URL (e.g. the stub sink in benchmarks/api_load.py)
+SENDGRID_API_HOST = os.getenv("SENDGRID_API_HOST")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class EmailDeliveryError(Exception):
+    """Delivery failed; `retryable` tells the outbox whether to try again."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
 
-# Send a single HTML email via SendGrid Web API
-async def send_email(to_email: str, subject: str, html_content: str):
+def _get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Imported on first send: the SDK is slow to import and only the
+                # outbox worker ever needs it, so it stays off the cold-start path
+                from sendgrid import SendGridAPIClient
+                if SENDGRID_API_HOST:
+                    _client = SendGridAPIClient(SENDGRID_API_KEY, host=SENDGRID_API_HOST)
+                else:
+                    _client = SendGridAPIClient(SENDGRID_API_KEY)
+    return _client
+
+
+# Send a single HTML email via SendGrid Web API (blocking; run it in a worker thread)
+def deliver_email(to_email: str, subject: str, html_content: str):
     """Send email to ANY user email address using SendGrid Web API"""
     if not all([SENDGRID_API_KEY, SMTP_FROM_EMAIL]):
-        print("❌ SendGrid credentials missing!")
-        return False
+        EMAIL_SENDS.labels("error").inc()
+        raise EmailDeliveryError("SendGrid credentials missing", retryable=False)
+    from sendgrid.helpers.mail import Mail
 
+    message = Mail(
+        from_email=SMTP_FROM_EMAIL,
+        to_emails=to_email,
+        subject=subject,
+        html_content=html_content
+    )
+    started = time.perf_counter()
     try:
-        message = Mail(
-            from_email=SMTP_FROM_EMAIL,
-            to_emails=to_email,
-            subject=subject,
-            html_content=html_content
-        )
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-
-        if response.status_code in [200, 202]:
-            print(f"✅ Email sent to {to_email}: {subject}")
-            return True
-        else:
-            print(f"❌ Email failed to {to_email}: {response.status_code}")
-            return False
-
+        response = _get_client().send(message)
     except Exception as e:
-        print(f"❌ Email failed to {to_email}: {str(e)}")
-        return False
+        EMAIL_LATENCY.observe(time.perf_counter() - started)
+        # python-http-client raises HTTPError subclasses carrying the status code
+        status_code = getattr(e, "status_code", None)
+        retryable = status_code is None or status_code == 429 or status_code >= 500
+        EMAIL_SENDS.labels("retryable_error" if retryable else "error").inc()
+        raise EmailDeliveryError(f"{status_code or ''} {e}".strip(), retryable=retryable)
+    EMAIL_LATENCY.observe(time.perf_counter() - started)
 
+    if response.status_code not in [200, 202]:
+        EMAIL_SENDS.labels("retryable_error").inc()
+        raise EmailDeliveryError(f"Unexpected status {response.status_code}")
+    EMAIL_SENDS.labels("sent").inc()
+    print(f"✅ Email sent to {to_email}: {subject}")
 
-# 🔥 Notification functions
+
+# 🔥 Notification templates
 # Purpose: event-specific templates for tasks/auth flows
-# How: each builds HTML and delegates to send_email()
-async def send_task_created_email(user_email: str, task_title: str, task_description: str = "", due_date: str = ""):
+# How: each builds HTML and returns (subject, html_content) for the outbox
+def render_task_created_email(task_title: str, task_description: str = "", due_date: str = ""):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -67,10 +101,10 @@ async def send_task_created_email(user_email: str, task_title: str, task_descrip
         </div>
     </body></html>
     """
-    return await send_email(user_email, f"✅ New Task: {task_title}", html_content)
+    return f"✅ New Task: {task_title}", html_content
 
 
-async def send_task_completed_email(user_email: str, task_title: str):
+def render_task_completed_email(task_title: str):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -90,10 +124,10 @@ async def send_task_completed_email(user_email: str, task_title: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, f"🎉 Task Completed: {task_title}", html_content)
+    return f"🎉 Task Completed: {task_title}", html_content
 
 
-async def send_task_deleted_email(user_email: str, task_title: str):
+def render_task_deleted_email(task_title: str):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -113,10 +147,10 @@ async def send_task_deleted_email(user_email: str, task_title: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, f"🗑️ Task Deleted: {task_title}", html_content)
+    return f"🗑️ Task Deleted: {task_title}", html_content
 
 
-async def send_task_reminder_email(user_email: str, task_title: str, task_description: str = ""):
+def render_task_reminder_email(task_title: str, task_description: str = ""):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -137,13 +171,75 @@ async def send_task_reminder_email(user_email: str, task_title: str, task_descri
         </div>
     </body></html>
     """
-    return await send_email(user_email, f"⏰ Reminder: {task_title}", html_content)
+    return f"⏰ Reminder: {task_title}", html_content
+
+
+def render_bulk_summary_email(created: int = 0, completed: int = 0, deleted: int = 0, updated: int = 0):
+    rows = "".join(
+        f'<li style="color: #64748B; margin: 6px 0;"><strong>{count}</strong> {label}</li>'
+        for count, label in [
+            (created, "created"),
+            (updated, "updated"),
+            (completed, "completed 🎉"),
+            (deleted, "deleted"),
+        ]
+        if count
+    )
+    html_content = f"""
+    <html><body style="font-family: Arial, sans-serif;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
+            <div style="background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%); padding: 30px; border-radius: 10px 10px 0 0; text-align: center;">
+                <h1 style="color: white; margin: 0;">TaskFlow Pro</h1>
+                <p style="color: #DBEAFE;">Bulk Update Applied 📋</p>
+            </div>
+            <div style="background: white; padding: 30px; border-radius: 0 0 10px 10px;">
+                <h2 style="color: #1E293B;">Your tasks were updated</h2>
+                <ul style="padding-left: 20px;">{rows}</ul>
+                <div style="text-align: center; margin-top: 30px;">
+                    <a href="http://localhost:3000/tasks" style="background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%); color: white; padding: 15px 35px; text-decoration: none; border-radius: 8px; font-weight: bold;">
+                        View All Tasks →
+                    </a>
+                </div>
+            </div>
+        </div>
+    </body></html>
+    """
+    return "📋 Bulk task update summary", html_content
+
+
+def render_digest_email(sections: list):
+    """sections: [(heading, [item, ...]), ...] already grouped by the caller; items are plain text"""
+    blocks = ""
+    for heading, items in sections:
+        # Items carry user-entered task titles
+        rows = "".join(f'<li style="color: #64748B; margin: 4px 0;">{html.escape(str(item))}</li>' for item in items)
+        blocks += f'<h3 style="color: #1E293B; margin: 20px 0 8px;">{html.escape(heading)}</h3><ul style="padding-left: 20px; margin: 0;">{rows}</ul>'
+    total = sum(len(items) for _, items in sections)
+    html_content = f"""
+    <html><body style="font-family: Arial, sans-serif;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
+            <div style="background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%); padding: 30px; border-radius: 10px 10px 0 0; text-align: center;">
+                <h1 style="color: white; margin: 0;">TaskFlow Pro</h1>
+                <p style="color: #DBEAFE;">Your Activity Digest 📬</p>
+            </div>
+            <div style="background: white; padding: 30px; border-radius: 0 0 10px 10px;">
+                {blocks}
+                <div style="text-align: center; margin-top: 30px;">
+                    <a href="http://localhost:3000/tasks" style="background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%); color: white; padding: 15px 35px; text-decoration: none; border-radius: 8px; font-weight: bold;">
+                        View All Tasks →
+                    </a>
+                </div>
+            </div>
+        </div>
+    </body></html>
+    """
+    return f"📬 TaskFlow Pro digest: {total} updates", html_content
 
 
 # ==================== AUTH EMAILS ====================
 
 
-async def send_account_created_email(user_email: str, full_name: str):
+def render_account_created_email(full_name: str):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -166,10 +262,10 @@ async def send_account_created_email(user_email: str, full_name: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, "🎉 Your TaskFlow Pro account is ready", html_content)
+    return "🎉 Your TaskFlow Pro account is ready", html_content
 
 
-async def send_login_notification_email(user_email: str):
+def render_login_notification_email():
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -188,10 +284,10 @@ async def send_login_notification_email(user_email: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, "🔐 New login to your TaskFlow Pro account", html_content)
+    return "🔐 New login to your TaskFlow Pro account", html_content
 
 
-async def send_signup_otp_email(user_email: str, code: str):
+def render_signup_otp_email(code: str):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -211,10 +307,10 @@ async def send_signup_otp_email(user_email: str, code: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, "🔐 Your TaskFlow Pro signup code", html_content)
+    return "🔐 Your TaskFlow Pro signup code", html_content
 
 
-async def send_login_otp_email(user_email: str, code: str):
+def render_login_otp_email(code: str):
     html_content = f"""
     <html><body style="font-family: Arial, sans-serif;">
         <div style="max-width: 600px; margin: 0 auto; background-color: #f8fafc;">
@@ -234,7 +330,7 @@ async def send_login_otp_email(user_email: str, code: str):
         </div>
     </body></html>
     """
-    return await send_email(user_email, "🔑 Your TaskFlow Pro login code", html_content)
+    return "🔑 Your TaskFlow Pro login code", html_content
 
 
 # 🔧 Local utility: quick send test for templates (not used in production)
@@ -242,4 +338,4 @@ async def test_email():
     print("🧪 Testing all email functions...")
     test_email = "abhidynamite6.gmail.com"
     
-    await send_task_created_email(test_email, "Test Task", "This is a test task description.", "2024-12-31")
+    deliver_email(test_email, *render_task_created_email("Test Task", "This is a test task description.", "2024-12-31"))
@@ -0,0 +1,40 @@
+# Purpose: Per-process cache of user identity (email, full_name, profile_version)
+# Why: /api/auth/me and /api/auth/profile read the users row on every call even
+#      though it changes only when the user edits their profile
+# How: get_user_identity() answers from a TTL/LRU cache and only borrows a pooled
+#      connection on a miss. update_profile calls invalidate_user_identity() after
+#      committing; other worker processes pick the change up within USER_CACHE_TTL
+
+import os
+from psycopg2.extras import RealDictCursor
+from cache import TTLCache
+from database import db_connection
+
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))  # seconds; bounds cross-worker staleness
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+_identities = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+async def get_user_identity(user_id: int):
+    """Return {id, email, full_name, profile_version} for `user_id`, or None if the user is gone."""
+    identity = _identities.get(user_id)
+    if identity is not None:
+        return identity
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("SELECT id, email, full_name, profile_version FROM users WHERE id = %s", (user_id,))
+        identity = cur.fetchone()
+        cur.close()
+    if identity is not None:
+        _identities.set(user_id, dict(identity))
+    return identity
+
+
+def invalidate_user_identity(user_id: int):
+    _identities.pop(user_id)
+
+
+def identity_cache_stats():
+    return _identities.stats()
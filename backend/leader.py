@@ -0,0 +1,151 @@
+# Purpose: Elect exactly one API process to run the scheduled jobs
+# Why: Running several uvicorn/gunicorn workers started one APScheduler per worker,
+#      so every periodic job ran N times and each worker only knew its own jobs
+# How: Every worker runs a SchedulerLeader that keeps a dedicated (non-pooled)
+#      connection and tries pg_try_advisory_lock on it. The session-level lock is
+#      held for as long as that connection lives, so the winner registers the jobs
+#      and starts the scheduler; the others only serve HTTP and retry every
+#      LEADER_RETRY_INTERVAL. If the leader exits or its connection dies, Postgres
+#      releases the lock and the next worker to retry takes over. The leader drops
+#      its jobs as soon as its liveness check fails. Jobs stay safe to overlap
+#      briefly during failover (they claim rows with SKIP LOCKED). APScheduler is
+#      only imported once a worker actually becomes leader. Leadership, job
+#      count, overdue jobs (refreshed every check), submission lag and run
+#      outcomes are exported to /metrics
+#
+# Run:  uvicorn main:app --workers 4   (or gunicorn -k uvicorn.workers.UvicornWorker -w 4 main:app)
+
+import asyncio
+import os
+from datetime import datetime, timezone
+import psycopg2
+from fastapi.concurrency import run_in_threadpool
+from metrics import SCHEDULER_JOBS, SCHEDULER_JOBS_OVERDUE, SCHEDULER_LAG, SCHEDULER_LEADER, SCHEDULER_RUNS
+
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+LEADER_LOCK_NAME = os.getenv("LEADER_LOCK_NAME", "taskflow:scheduler")
+LEADER_RETRY_INTERVAL = float(os.getenv("LEADER_RETRY_INTERVAL", 5))  # seconds; also the liveness check period
+
+
+class SchedulerLeader:
+    """Runs a scheduler with the jobs added by `register_jobs(scheduler)` only while this process holds the lock."""
+
+    def __init__(self, register_jobs):
+        self._scheduler = None
+        self._register_jobs = register_jobs
+        self._conn = None
+        self._task = None
+        self._stopping = asyncio.Event()
+        self.is_leader = False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        self._step_down()
+        self._record_state()
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        # Closing the session releases the advisory lock for the next worker
+        await run_in_threadpool(self._close)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                leader = await run_in_threadpool(self._hold_lock)
+            except Exception as e:
+                leader = False
+                print(f"❌ Scheduler leader check failed: {e}")
+                await run_in_threadpool(self._close)
+            if leader and not self.is_leader:
+                self._take_over()
+            elif not leader and self.is_leader:
+                self._step_down()
+            self._record_state()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=LEADER_RETRY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def _hold_lock(self):
+        """Blocking: try to take the lock, or confirm the session holding it is alive."""
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(
+                os.getenv("DATABASE_URL"),
+                sslmode="prefer",
+                application_name="taskflow-scheduler-leader",
+                # Notice a dead link quickly instead of waiting for the TCP timeout
+                keepalives=1,
+                keepalives_idle=10,
+                keepalives_interval=5,
+                keepalives_count=3,
+            )
+            self._conn.autocommit = True
+        with self._conn.cursor() as cur:
+            if self.is_leader:
+                cur.execute("SELECT 1")
+                return True
+            cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (LEADER_LOCK_NAME,))
+            return cur.fetchone()[0]
+
+    def _take_over(self):
+        if self._scheduler is None:
+            from apscheduler.events import EVENT_ALL
+            from apscheduler.schedulers.asyncio import AsyncIOScheduler
+            self._scheduler = AsyncIOScheduler()
+            self._scheduler.add_listener(self._on_job_event, EVENT_ALL)
+        self._register_jobs(self._scheduler)
+        if not self._scheduler.running:
+            self._scheduler.start()
+        else:
+            self._scheduler.resume()
+        self.is_leader = True
+        print(f"👑 Worker {os.getpid()} is the scheduler leader")
+
+    def _step_down(self):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        if self._scheduler is not None and self._scheduler.running:
+            self._scheduler.pause()
+            self._scheduler.remove_all_jobs()
+        print(f"⚠️ Worker {os.getpid()} lost scheduler leadership")
+
+    def _record_state(self):
+        jobs = self._scheduler.get_jobs() if self.is_leader else []
+        now = datetime.now(timezone.utc)
+        SCHEDULER_LEADER.set(1 if self.is_leader else 0)
+        SCHEDULER_JOBS.set(len(jobs))
+        SCHEDULER_JOBS_OVERDUE.set(sum(1 for job in jobs if job.next_run_time and job.next_run_time < now))
+
+    def _on_job_event(self, event):
+        from apscheduler.events import (
+            EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED,
+        )
+        if event.code == EVENT_JOB_SUBMITTED:
+            now = datetime.now(timezone.utc)
+            for run_time in event.scheduled_run_times:
+                SCHEDULER_LAG.labels(event.job_id).observe(max(0.0, (now - run_time).total_seconds()))
+            return
+        result = {
+            EVENT_JOB_EXECUTED: "success",
+            EVENT_JOB_ERROR: "error",
+            EVENT_JOB_MISSED: "missed",
+            EVENT_JOB_MAX_INSTANCES: "skipped",
+        }.get(event.code)
+        if result is not None:
+            SCHEDULER_RUNS.labels(event.job_id, result).inc()
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+        self._conn = None
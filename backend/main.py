@@ -3,45 +3,108 @@ TaskFlow Pro API
 
 Purpose:
 - Exposes authentication, profile, and task CRUD endpoints for the React frontend
-- Issues and validates JWTs, sends transactional emails, and schedules reminders
+- Issues and validates JWTs, queues transactional emails, and sends due-date reminders
 
 Why:
 - Serves as the backend core integrating DB, auth, email notifications, and business logic
 
 How:
 - FastAPI app with CORS configured for local and Vercel domains
-- Uses psycopg2 for PostgreSQL access and jose/passlib for JWT + bcrypt
-- Schedules background task reminders with APScheduler
-- Organizes routes by sections: AUTH, PROFILE, TASKS, STARTUP (DB bootstrapping)
+- Uses a shared psycopg2 connection pool (database.py) for PostgreSQL access and jose/passlib for JWT + bcrypt
+  (bcrypt runs in a bounded worker pool, see auth.py)
+- Runs periodic background jobs (notification flush, reminder sweep) with APScheduler
+- Exports Prometheus metrics (requests, DB pool, email, scheduler) at /metrics (see metrics.py)
+  and per-statement SQL stats at /metrics/queries (see query_stats.py)
+- Organizes routes by sections: AUTH, PROFILE, TASKS, STARTUP (schema version check, background workers)
 """
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks
+import time
+
+# Cold-start report: time spent importing the app (see benchmarks/cold_start.py)
+_import_started = time.perf_counter()
+
+from dotenv import load_dotenv
+
+# Load .env once, before the modules below read their settings at import time
+load_dotenv()
+
+import asyncio
+import base64
+import csv
+import hashlib
+import hmac
+import html
+import io
+import json
+import os
+import random
+import zlib
+from datetime import datetime, timedelta, date
+from typing import Optional, List, Literal
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime, timedelta
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from dotenv import load_dotenv
-from models import *
-from auth import *
-from database import get_db
+import orjson
+from psycopg2.extras import RealDictCursor, execute_values
+from auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    STREAM_TICKET_SECONDS,
+    create_stream_ticket,
+    get_current_user,
+    get_password_hash_async,
+    get_stream_user,
+    issue_tokens,
+    refresh_tokens,
+    shutdown_hash_executor,
+    token_cache_stats,
+    verify_password_async,
+    warm_up_password_hashing,
+)
+from database import (
+    close_pool,
+    db_connection,
+    init_pool,
+    pool_is_exhausted,
+    warm_up_pool,
+    PoolTimeoutError,
+)
+from sessions import RevocationListener, is_session_revoked, purge_expired_sessions, revoke_sessions
+from identity import get_user_identity, identity_cache_stats, invalidate_user_identity
+from task_stats import fetch_task_stats, fetch_task_version
+from task_import import (
+    TaskImportError,
+    TaskImportParser,
+    copy_tasks,
+    import_format_for,
+    validate_task,
+    validate_task_update,
+)
+from task_sync import InvalidSyncCursor, fetch_changes, purge_task_tombstones
+from task_events import TASK_EVENTS_HEARTBEAT, TaskEventHub, TooManySubscribersError, notify_task_change
 from email_service import (
-    send_task_created_email,
-    send_task_completed_email, 
-    send_task_deleted_email,
-    send_task_reminder_email,
-    send_account_created_email,
-    send_login_notification_email,
-    send_signup_otp_email,
-    send_login_otp_email,
+    render_account_created_email,
+    render_signup_otp_email,
+    render_login_otp_email,
 )
-import os
-import asyncio
-import random
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from email_outbox import OutboxWorker, enqueue_email
+from notifications import (
+    NOTIFICATION_MODES,
+    NOTIFY_FLUSH_INTERVAL,
+    flush_due_notifications,
+    record_notification,
+)
+from leader import SCHEDULER_ENABLED, SchedulerLeader
+from metrics import METRICS_TOKEN, MetricsMiddleware, mark_worker_dead, render_metrics
+from query_stats import query_stats
+from reminders import REMINDER_SWEEP_INTERVAL, sweep_due_reminders
+from schema import DB_AUTO_MIGRATE, check_schema_version, upgrade_schema
 
 
-load_dotenv()
+# Pre-open pool connections and load bcrypt before serving (scale-to-zero hosts)
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() in ("1", "true", "yes")
+# Filled in by startup_event; reported by /api/health
+startup_timings = {"importMs": round((time.perf_counter() - _import_started) * 1000, 1)}
 
 
 # App factory: exposes OpenAPI and route table used by the React client
@@ -71,18 +134,60 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor for GET /api/tasks travels in a response header
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Added last so it wraps CORS too: preflights and rejected requests are counted
+app.add_middleware(MetricsMiddleware)
+
+
+# Periodic background jobs run only on the elected leader worker (see leader.py)
+scheduler_leader = None
+
+# Every worker keeps its own copy of the session revocation list (see sessions.py)
+revocation_listener = None
+
+# Email delivery: routes queue rows in email_outbox within their transaction;
+# this worker sends them (see email_outbox.py). Started/stopped with the app.
+outbox_worker = None
+
+# Per-worker fan-out of task change events to SSE clients (see task_events.py)
+task_event_hub = None
+
 
-# Scheduler for delayed emails
-# Purpose: schedule reminders or post-create notifications asynchronously
-scheduler = AsyncIOScheduler()
-scheduler.start()
+def wake_outbox():
+    """Deliver time-sensitive emails (OTP codes) without waiting for the next poll."""
+    if outbox_worker is not None:
+        outbox_worker.wake()
 
 
-def get_db_connection():
-    """Open a psycopg2 connection using DATABASE_URL (sslmode preferred)."""
-    return psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+# Pool exhaustion surfaces as 503 so clients/load balancers can back off and retry
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Database busy, please retry"})
+
+
+# Conditional GET helpers
+# Purpose: answer repeat fetches with 304 from a per-user version number
+# How: ETag = hash of (resource, user, version, query string); browsers revalidate
+#      automatically because responses are marked `Cache-Control: private, no-cache`
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in header.split(",")]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
 
 
 # ==================== MODELS ====================
@@ -163,44 +268,78 @@ class OTPResend(BaseModel):
     otp_id: int
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    all: bool = False  # revoke every session of the user, not just this one
+
+
+class NotificationPreferences(BaseModel):
+    mode: Literal["immediate", "digest", "off"]
+
+
+# Bulk operations: `task` for create, `id` (+ `changes` for update) otherwise.
+# `changes` uses the same keys/semantics as PUT /api/tasks/{task_id}
+class BulkTaskOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    task: Optional[TaskCreate] = None
+    changes: Optional[TaskUpdate] = None
+
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskOperation]
+
+
  # ==================== AUTH ENDPOINTS ====================
 
+# Statements shared with benchmarks/query_scaling.py, which measures them as-is
+# ON CONFLICT: another request may register the email while the password hashes
+INSERT_USER_SQL = """
+    INSERT INTO users (email, hashed_password, full_name) VALUES (%s, %s, %s)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id, email, full_name
+"""
+# Claims a signup OTP once; re-checked after hashing, so a concurrent use loses
+CLAIM_SIGNUP_OTP_SQL = "UPDATE otps SET used = TRUE WHERE id = %s AND NOT used AND expires_at >= %s RETURNING id"
+MARK_OTP_USED_SQL = "UPDATE otps SET used = TRUE WHERE id = %s"
+
 
 @app.post("/api/auth/register", response_model=dict)
-async def register(user: UserCreate, background_tasks: BackgroundTasks):
+async def register(user: UserCreate):
     """Register a new user (no OTP, classic flow)"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    # Check if user exists
-    cur.execute("SELECT id FROM users WHERE email = %s", (user.email,))
-    if cur.fetchone():
+    async with db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM users WHERE email = %s", (user.email,))
+        exists = cur.fetchone()
         cur.close()
-        conn.close()
+
+    if exists:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Create user
-    hashed_password = get_password_hash(user.password)
-    cur.execute(
-        "INSERT INTO users (email, hashed_password, full_name) VALUES (%s, %s, %s) RETURNING id, email, full_name",
-        (user.email, hashed_password, user.full_name)
-    )
-    new_user = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+    # Hash with no pooled connection checked out (bcrypt takes ~100-300 ms)
+    hashed_password = await get_password_hash_async(user.password)
 
-    # Create access token
-    access_token = create_access_token(data={"user_id": new_user["id"]})
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(INSERT_USER_SQL, (user.email, hashed_password, user.full_name))
+        new_user = cur.fetchone()
+        if not new_user:
+            cur.close()
+            raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Send account-created notification
-    background_tasks.add_task(
-        send_account_created_email, new_user["email"], new_user["full_name"]
-    )
+        # Queue account-created notification
+        enqueue_email(cur, new_user["email"], *render_account_created_email(new_user["full_name"]))
+
+        # Start a session: short-lived access token + refresh token
+        tokens = issue_tokens(cur, new_user["id"])
+        conn.commit()
+        cur.close()
 
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": {
             "id": new_user["id"],
             "email": new_user["email"],
@@ -210,29 +349,30 @@ async def register(user: UserCreate, background_tasks: BackgroundTasks):
 
 
 @app.post("/api/auth/login", response_model=dict)
-async def login(credentials: dict, background_tasks: BackgroundTasks):
+async def login(credentials: dict):
     """Login user (no OTP, classic flow)"""
     email = credentials.get("email")
     password = credentials.get("password")
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("SELECT * FROM users WHERE email = %s", (email,))
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+        user = cur.fetchone()
+        cur.close()
 
-    if not user or not verify_password(password, user['hashed_password']):
+    if not user or not await verify_password_async(password, user['hashed_password']):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    access_token = create_access_token(data={"user_id": user['id']})
-
-    # Send login notification
-    background_tasks.add_task(send_login_notification_email, user["email"])
+    # Start a session and record the login notification (coalesced, see notifications.py)
+    async with db_connection() as conn:
+        cur = conn.cursor()
+        tokens = issue_tokens(cur, user["id"])
+        record_notification(cur, user["id"], "login")
+        conn.commit()
+        cur.close()
 
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": {
             "id": user['id'],
             "email": user['email'],
@@ -242,35 +382,33 @@ async def login(credentials: dict, background_tasks: BackgroundTasks):
 
 
 @app.post("/api/auth/request-signup-otp", response_model=dict)
-async def request_signup_otp(payload: OTPRequestSignup, background_tasks: BackgroundTasks):
+async def request_signup_otp(payload: OTPRequestSignup):
     """Start signup flow: create OTP and email it (10 min validity)"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Check if user already exists
-    cur.execute("SELECT id FROM users WHERE email = %s", (payload.email,))
-    if cur.fetchone():
+        # Check if user already exists
+        cur.execute("SELECT id FROM users WHERE email = %s", (payload.email,))
+        if cur.fetchone():
+            cur.close()
+            raise HTTPException(status_code=400, detail="Email already registered")
+
+        code = f"{random.randint(100000, 999999)}"
+        expires_at = datetime.now() + timedelta(minutes=10)
+
+        cur.execute(
+            """
+            INSERT INTO otps (email, code, purpose, expires_at)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id, expires_at
+            """,
+            (payload.email, code, "signup", expires_at),
+        )
+        otp_row = cur.fetchone()
+        enqueue_email(cur, payload.email, *render_signup_otp_email(code))
+        conn.commit()
         cur.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    code = f"{random.randint(100000, 999999)}"
-    expires_at = datetime.now() + timedelta(minutes=10)
-
-    cur.execute(
-        """
-        INSERT INTO otps (email, code, purpose, expires_at)
-        VALUES (%s, %s, %s, %s)
-        RETURNING id, expires_at
-        """,
-        (payload.email, code, "signup", expires_at),
-    )
-    otp_row = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    background_tasks.add_task(send_signup_otp_email, payload.email, code)
+    wake_outbox()
 
     return {
         "otpId": otp_row["id"],
@@ -280,20 +418,20 @@ async def request_signup_otp(payload: OTPRequestSignup, background_tasks: Backgr
 
 
 @app.post("/api/auth/verify-signup-otp", response_model=dict)
-async def verify_signup_otp(payload: OTPVerifySignup, background_tasks: BackgroundTasks):
+async def verify_signup_otp(payload: OTPVerifySignup):
     """Verify signup OTP and create account if valid"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        """
-        SELECT id, email, code, purpose, expires_at, used
-        FROM otps
-        WHERE id = %s AND email = %s AND purpose = 'signup'
-        """,
-        (payload.otp_id, payload.email),
-    )
-    otp = cur.fetchone()
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            """
+            SELECT id, email, code, purpose, expires_at, used
+            FROM otps
+            WHERE id = %s AND email = %s AND purpose = 'signup'
+            """,
+            (payload.otp_id, payload.email),
+        )
+        otp = cur.fetchone()
+        cur.close()
 
     now = datetime.now()
     if (
@@ -302,46 +440,37 @@ async def verify_signup_otp(payload: OTPVerifySignup, background_tasks: Backgrou
         or otp["code"] != payload.code
         or otp["expires_at"] < now
     ):
-        cur.close()
-        conn.close()
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
-    # Mark OTP as used
-    cur.execute("UPDATE otps SET used = TRUE WHERE id = %s", (payload.otp_id,))
+    # Hash with no pooled connection checked out (bcrypt takes ~100-300 ms)
+    hashed_password = await get_password_hash_async(payload.password)
 
-    # Ensure user does not already exist
-    cur.execute("SELECT id FROM users WHERE email = %s", (payload.email,))
-    if cur.fetchone():
-        conn.commit()
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="Email already registered")
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Create user
-    hashed_password = get_password_hash(payload.password)
-    cur.execute(
-        """
-        INSERT INTO users (email, hashed_password, full_name)
-        VALUES (%s, %s, %s)
-        RETURNING id, email, full_name
-        """,
-        (payload.email, hashed_password, payload.full_name),
-    )
-    new_user = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
+        # Mark OTP as used; re-checked here since it may have been used while we hashed
+        cur.execute(CLAIM_SIGNUP_OTP_SQL, (payload.otp_id, now))
+        if not cur.fetchone():
+            cur.close()
+            raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
-    access_token = create_access_token(data={"user_id": new_user["id"]})
+        # Create user unless the email got registered meanwhile
+        cur.execute(INSERT_USER_SQL, (payload.email, hashed_password, payload.full_name))
+        new_user = cur.fetchone()
+        if not new_user:
+            conn.commit()
+            cur.close()
+            raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Send account-created notification
-    background_tasks.add_task(
-        send_account_created_email, new_user["email"], new_user["full_name"]
-    )
+        # Queue account-created notification
+        enqueue_email(cur, new_user["email"], *render_account_created_email(new_user["full_name"]))
+
+        tokens = issue_tokens(cur, new_user["id"])
+        conn.commit()
+        cur.close()
 
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": {
             "id": new_user["id"],
             "email": new_user["email"],
@@ -351,36 +480,36 @@ async def verify_signup_otp(payload: OTPVerifySignup, background_tasks: Backgrou
 
 
 @app.post("/api/auth/request-login-otp", response_model=dict)
-async def request_login_otp(payload: OTPRequestLogin, background_tasks: BackgroundTasks):
+async def request_login_otp(payload: OTPRequestLogin):
     """Start login flow: verify password, then email OTP (10 min validity)"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT * FROM users WHERE email = %s", (payload.email,))
-    user = cur.fetchone()
-
-    if not user or not verify_password(payload.password, user["hashed_password"]):
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("SELECT * FROM users WHERE email = %s", (payload.email,))
+        user = cur.fetchone()
         cur.close()
-        conn.close()
+
+    # Verify with no pooled connection checked out (bcrypt takes ~100-300 ms)
+    if not user or not await verify_password_async(payload.password, user["hashed_password"]):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
     code = f"{random.randint(100000, 999999)}"
     expires_at = datetime.now() + timedelta(minutes=10)
 
-    cur.execute(
-        """
-        INSERT INTO otps (email, code, purpose, expires_at)
-        VALUES (%s, %s, %s, %s)
-        RETURNING id, expires_at
-        """,
-        (payload.email, code, "login", expires_at),
-    )
-    otp_row = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    background_tasks.add_task(send_login_otp_email, payload.email, code)
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            """
+            INSERT INTO otps (email, code, purpose, expires_at)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id, expires_at
+            """,
+            (payload.email, code, "login", expires_at),
+        )
+        otp_row = cur.fetchone()
+        enqueue_email(cur, payload.email, *render_login_otp_email(code))
+        conn.commit()
+        cur.close()
+    wake_outbox()
 
     return {
         "otpId": otp_row["id"],
@@ -390,55 +519,51 @@ async def request_login_otp(payload: OTPRequestLogin, background_tasks: Backgrou
 
 
 @app.post("/api/auth/verify-login-otp", response_model=dict)
-async def verify_login_otp(payload: OTPVerifyLogin, background_tasks: BackgroundTasks):
+async def verify_login_otp(payload: OTPVerifyLogin):
     """Verify login OTP and issue JWT token if valid"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute(
+            """
+            SELECT id, email, code, purpose, expires_at, used
+            FROM otps
+            WHERE id = %s AND purpose = 'login'
+            """,
+            (payload.otp_id,),
+        )
+        otp = cur.fetchone()
+
+        now = datetime.now()
+        if (
+            not otp
+            or otp["used"]
+            or otp["code"] != payload.code
+            or otp["expires_at"] < now
+        ):
+            cur.close()
+            raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
-    cur.execute(
-        """
-        SELECT id, email, code, purpose, expires_at, used
-        FROM otps
-        WHERE id = %s AND purpose = 'login'
-        """,
-        (payload.otp_id,),
-    )
-    otp = cur.fetchone()
+        # Mark OTP as used
+        cur.execute(MARK_OTP_USED_SQL, (payload.otp_id,))
 
-    now = datetime.now()
-    if (
-        not otp
-        or otp["used"]
-        or otp["code"] != payload.code
-        or otp["expires_at"] < now
-    ):
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="Invalid or expired OTP")
+        # Fetch user
+        cur.execute("SELECT id, email, full_name FROM users WHERE email = %s", (otp["email"],))
+        user = cur.fetchone()
+        if not user:
+            conn.commit()
+            cur.close()
+            raise HTTPException(status_code=404, detail="User not found")
 
-    # Mark OTP as used
-    cur.execute("UPDATE otps SET used = TRUE WHERE id = %s", (payload.otp_id,))
+        tokens = issue_tokens(cur, user["id"])
 
-    # Fetch user
-    cur.execute("SELECT id, email, full_name FROM users WHERE email = %s", (otp["email"],))
-    user = cur.fetchone()
-    if not user:
+        # Record login notification (coalesced, see notifications.py)
+        record_notification(cur, user["id"], "login")
         conn.commit()
         cur.close()
-        conn.close()
-        raise HTTPException(status_code=404, detail="User not found")
-
-    access_token = create_access_token(data={"user_id": user["id"]})
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    # Send login notification email
-    background_tasks.add_task(send_login_notification_email, user["email"])
 
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": {
             "id": user["id"],
             "email": user["email"],
@@ -448,42 +573,40 @@ async def verify_login_otp(payload: OTPVerifyLogin, background_tasks: Background
 
 
 @app.post("/api/auth/resend-otp", response_model=dict)
-async def resend_otp(payload: OTPResend, background_tasks: BackgroundTasks):
+async def resend_otp(payload: OTPResend):
     """Resend an existing (still-valid) OTP and extend expiry by 10 minutes"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(
-        """
-        SELECT id, email, purpose, expires_at, used
-        FROM otps
-        WHERE id = %s
-        """,
-        (payload.otp_id,),
-    )
-    otp = cur.fetchone()
-
-    now = datetime.now()
-    if not otp or otp["used"] or otp["expires_at"] < now:
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="OTP expired. Please start again.")
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        cur.execute(
+            """
+            SELECT id, email, purpose, expires_at, used
+            FROM otps
+            WHERE id = %s
+            """,
+            (payload.otp_id,),
+        )
+        otp = cur.fetchone()
 
-    new_code = f"{random.randint(100000, 999999)}"
-    new_expires = datetime.now() + timedelta(minutes=10)
+        now = datetime.now()
+        if not otp or otp["used"] or otp["expires_at"] < now:
+            cur.close()
+            raise HTTPException(status_code=400, detail="OTP expired. Please start again.")
 
-    cur.execute(
-        "UPDATE otps SET code = %s, expires_at = %s WHERE id = %s",
-        (new_code, new_expires, payload.otp_id),
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+        new_code = f"{random.randint(100000, 999999)}"
+        new_expires = datetime.now() + timedelta(minutes=10)
 
-    if otp["purpose"] == "signup":
-        background_tasks.add_task(send_signup_otp_email, otp["email"], new_code)
-    else:
-        background_tasks.add_task(send_login_otp_email, otp["email"], new_code)
+        cur.execute(
+            "UPDATE otps SET code = %s, expires_at = %s WHERE id = %s",
+            (new_code, new_expires, payload.otp_id),
+        )
+        if otp["purpose"] == "signup":
+            enqueue_email(cur, otp["email"], *render_signup_otp_email(new_code))
+        else:
+            enqueue_email(cur, otp["email"], *render_login_otp_email(new_code))
+        conn.commit()
+        cur.close()
+    wake_outbox()
 
     return {
         "message": "OTP resent to your email",
@@ -491,18 +614,53 @@ async def resend_otp(payload: OTPResend, background_tasks: BackgroundTasks):
     }
 
 
+@app.post("/api/auth/refresh", response_model=dict)
+async def refresh_access_token(payload: RefreshRequest):
+    """Exchange a refresh token for a new access token; the refresh token rotates (single use)"""
+    async with db_connection() as conn:
+        cur = conn.cursor()
+        tokens = refresh_tokens(cur, payload.refresh_token)
+        conn.commit()
+        cur.close()
+
+    if tokens is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    return tokens
+
+
+@app.post("/api/auth/logout", response_model=dict)
+async def logout(
+    payload: Optional[LogoutRequest] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Revoke this session (or all of the user's); takes effect on every worker via NOTIFY"""
+    everywhere = bool(payload and payload.all)
+    async with db_connection() as conn:
+        cur = conn.cursor()
+        revoked = revoke_sessions(cur, current_user["id"], None if everywhere else current_user["sid"])
+        conn.commit()
+        cur.close()
+
+    return {"message": "Logged out", "revokedSessions": revoked}
+
+
 @app.get("/api/auth/me", response_model=dict)
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
-    """Get current user info"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("SELECT id, email, full_name FROM users WHERE id = %s", (current_user['id'],))
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+async def get_current_user_info(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get current user info (ETag from users.profile_version; identity is cached, see identity.py)"""
+    user = await get_user_identity(current_user['id'])
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+
+    etag = make_etag("me", user['id'], user['profile_version'])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     
     return {
         "id": user['id'],
@@ -519,54 +677,53 @@ async def update_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Update user profile (name/email) - Settings page"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Check if email already exists (if changing email)
-    if profile.email and profile.email != current_user.get('sub', ''):
-        cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (profile.email, current_user['id']))
-        if cur.fetchone():
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Check if email already exists (if changing email)
+        if profile.email:
+            cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (profile.email, current_user['id']))
+            if cur.fetchone():
+                cur.close()
+                raise HTTPException(status_code=400, detail="Email already taken")
+        
+        # Build update query
+        update_fields = []
+        values = []
+        
+        if profile.full_name:
+            update_fields.append("full_name = %s")
+            values.append(profile.full_name)
+        
+        if profile.email:
+            update_fields.append("email = %s")
+            values.append(profile.email)
+        
+        if not update_fields:
             cur.close()
-            conn.close()
-            raise HTTPException(status_code=400, detail="Email already taken")
-    
-    # Build update query
-    update_fields = []
-    values = []
-    
-    if profile.full_name:
-        update_fields.append("full_name = %s")
-        values.append(profile.full_name)
-    
-    if profile.email:
-        update_fields.append("email = %s")
-        values.append(profile.email)
-    
-    if not update_fields:
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=400, detail="No fields to update")
-    
-    values.extend([current_user['id']])
-    
-    query = f"""
-        UPDATE users 
-        SET {', '.join(update_fields)}
-        WHERE id = %s 
-        RETURNING id, email, full_name
-    """
-    
-    cur.execute(query, values)
-    updated_user = cur.fetchone()
-    
-    if not updated_user:
+            raise HTTPException(status_code=400, detail="No fields to update")
+        
+        # Invalidates /api/auth/me ETags
+        update_fields.append("profile_version = profile_version + 1")
+        values.extend([current_user['id']])
+        
+        query = f"""
+            UPDATE users 
+            SET {', '.join(update_fields)}
+            WHERE id = %s 
+            RETURNING id, email, full_name
+        """
+        
+        cur.execute(query, values)
+        updated_user = cur.fetchone()
+        
+        if not updated_user:
+            cur.close()
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        conn.commit()
         cur.close()
-        conn.close()
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    conn.commit()
-    cur.close()
-    conn.close()
+    invalidate_user_identity(current_user['id'])
     
     return {
         "user": {
@@ -581,159 +738,725 @@ async def update_profile(
 # ✅ New GET endpoint for fetching profile
 @app.get("/api/auth/profile", response_model=dict)
 async def get_profile(current_user: dict = Depends(get_current_user)):
+    user = await get_user_identity(current_user["id"])
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return {
         "user": {
-            "id": current_user["id"],
-            "email": current_user["sub"],
-            "full_name": current_user.get("full_name", "")
+            "id": user["id"],
+            "email": user["email"],
+            "full_name": user.get("full_name") or ""
         }
     }
+
+
+# Purpose: per-user email delivery mode (immediate | digest | off), Settings page
+@app.get("/api/auth/notifications", response_model=dict)
+async def get_notification_preferences(current_user: dict = Depends(get_current_user)):
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute("SELECT notification_mode FROM users WHERE id = %s", (current_user['id'],))
+        user = cur.fetchone()
+        cur.close()
+
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"mode": user['notification_mode'], "modes": list(NOTIFICATION_MODES)}
+
+
+@app.put("/api/auth/notifications", response_model=dict)
+async def update_notification_preferences(
+    preferences: NotificationPreferences,
+    current_user: dict = Depends(get_current_user)
+):
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            "UPDATE users SET notification_mode = %s WHERE id = %s RETURNING notification_mode",
+            (preferences.mode, current_user['id']),
+        )
+        user = cur.fetchone()
+        conn.commit()
+        cur.close()
+
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"mode": user['notification_mode'], "message": "Notification preferences updated"}
 # ==================== TASK ENDPOINTS ====================
 # CRUD endpoints bound to authenticated user_id with notification hooks
 
 
+# Keyset pagination over (created_at, id); the cursor is opaque to clients
+TASK_PAGE_SIZE = int(os.getenv("TASK_PAGE_SIZE", 50))
+MAX_TASK_PAGE_SIZE = int(os.getenv("MAX_TASK_PAGE_SIZE", 500))
+
+
+def encode_task_cursor(created_at: datetime, task_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), task_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/tasks", response_model=List[dict])
-async def get_tasks(current_user: dict = Depends(get_current_user)):
-    """Get all tasks for current user"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute(
-        """
+async def get_tasks(
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=MAX_TASK_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    all_tasks: bool = Query(False, alias="all"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get tasks for current user, newest first.
+
+    At most `limit` rows (TASK_PAGE_SIZE by default) come back and
+    `X-Next-Cursor` carries the cursor for the following page (absent on the
+    last page). `all=true` opts out of paging and returns every matching task
+    (legacy behaviour). Honours `If-None-Match` using the task version kept by
+    the task_stats trigger.
+
+    Rows are serialized straight to JSON with orjson (dates as ISO 8601),
+    skipping jsonable_encoder's per-field walk; see benchmarks/task_serialization.py.
+    """
+    conditions = ["user_id = %s"]
+    params = [current_user['id']]
+
+    if status_filter:
+        conditions.append("status = %s")
+        params.append(status_filter)
+    if priority:
+        conditions.append("priority = %s")
+        params.append(priority)
+    if due_from:
+        conditions.append("due_date >= %s")
+        params.append(due_from)
+    if due_to:
+        conditions.append("due_date <= %s")
+        params.append(due_to)
+    if cursor:
+        conditions.append("(created_at, id) < (%s, %s)")
+        params.extend(decode_task_cursor(cursor))
+
+    query = f"""
         SELECT id, title, description, priority, status, due_date, created_at, updated_at, user_id 
         FROM tasks 
-        WHERE user_id = %s 
-        ORDER BY created_at DESC
-        """,
-        (current_user['id'],)
+        WHERE {' AND '.join(conditions)} 
+        ORDER BY created_at DESC, id DESC
+    """
+    if not all_tasks:
+        # Fetch one extra row to learn whether another page exists
+        query += " LIMIT %s"
+        params.append(limit + 1)
+
+    async with db_connection() as conn:
+        # One-row version lookup first; unchanged lists skip the full query
+        etag = make_etag("tasks", current_user['id'], fetch_task_version(conn, current_user['id']), request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(query, params)
+        tasks = cur.fetchall()
+        cur.close()
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not all_tasks and len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers["X-Next-Cursor"] = encode_task_cursor(tasks[-1]['created_at'], tasks[-1]['id'])
+
+    # RealDictRow is a dict subclass, which orjson encodes directly
+    return ORJSONResponse(tasks, headers=headers)
+
+
+# Ranked search: full-text match on the maintained search_vector column plus
+# trigram word similarity on the title so typos still find the task.
+# ts_headline marks matches with private-use sentinels (stripped from the stored
+# text first); the fragment is HTML-escaped before they become <mark> tags, so
+# task text can never inject markup into the highlights
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\ue000", "\ue001"
+SEARCH_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MinWords=5, MaxWords=20"
+TITLE_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=TRUE"
+
+
+def render_highlight(fragment: str) -> str:
+    """HTML-escape a ts_headline fragment, then turn its sentinels into <mark> tags."""
+    return (
+        html.escape(fragment)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
     )
-    tasks = cur.fetchall()
-    cur.close()
-    conn.close()
-    
-    return [dict(task) for task in tasks]
 
 
-@app.post("/api/tasks", response_model=dict)
-async def create_task(task: TaskCreate, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
-    """Create a new task"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Get user email
-    cur.execute("SELECT email FROM users WHERE id = %s", (current_user['id'],))
-    user = cur.fetchone()
-    user_email = user['email']
-    
-    # Create task
-    cur.execute(
-        """
-        INSERT INTO tasks (title, description, priority, status, due_date, user_id) 
-        VALUES (%s, %s, %s, %s, %s, %s) 
-        RETURNING id, title, description, priority, status, due_date, created_at, updated_at, user_id
-        """,
-        (task.title, task.description, task.priority, task.status, task.due_date, current_user['id'])
+# Headlines are computed only for the page, not for every match
+SEARCH_SQL = """
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', %(q)s) AS tsq
+    ),
+    ranked AS (
+        SELECT t.id, t.title, t.description, t.priority, t.status, t.due_date,
+               t.created_at, t.updated_at, t.user_id,
+               ts_rank_cd(t.search_vector, query.tsq) + word_similarity(%(q)s, t.title) AS rank
+        FROM tasks t, query
+        WHERE t.user_id = %(user_id)s
+          AND (t.search_vector @@ query.tsq OR %(q)s <%% t.title)
+        ORDER BY rank DESC, t.id DESC
+        LIMIT %(limit)s OFFSET %(offset)s
     )
-    new_task = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
-    
-    # Send immediate notification
-    background_tasks.add_task(
-        send_task_created_email,
-        user_email,
-        new_task['title'],
-        new_task['description'] or '',
-        new_task['due_date']
+    SELECT ranked.*,
+           ts_headline('english', translate(ranked.title, %(sentinels)s, ''),
+                       query.tsq, %(title_headline)s) AS title_highlight,
+           ts_headline('english', translate(COALESCE(ranked.description, ''), %(sentinels)s, ''),
+                       query.tsq, %(headline)s) AS description_highlight
+    FROM ranked, query
+    ORDER BY ranked.rank DESC, ranked.id DESC
+"""
+
+
+def search_params(q: str, user_id: int, limit: int, offset: int) -> dict:
+    """Parameters for SEARCH_SQL; `limit` is the number of rows to fetch."""
+    return {
+        "q": q,
+        "user_id": user_id,
+        "limit": limit,
+        "offset": offset,
+        "headline": SEARCH_HEADLINE_OPTIONS,
+        "title_headline": TITLE_HEADLINE_OPTIONS,
+        "sentinels": HIGHLIGHT_START + HIGHLIGHT_STOP,
+    }
+
+
+@app.get("/api/tasks/search", response_model=dict)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: dict = Depends(get_current_user),
+):
+    """Search the current user's tasks by title/description, best match first.
+
+    `title_highlight`/`description_highlight` are HTML-escaped text with the
+    matches wrapped in <mark>, safe to insert as HTML.
+    """
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(SEARCH_SQL, search_params(q, current_user['id'], limit + 1, offset))
+        rows = cur.fetchall()
+        cur.close()
+
+    results = [dict(row) for row in rows[:limit]]
+    for row in results:
+        row["title_highlight"] = render_highlight(row["title_highlight"])
+        row["description_highlight"] = render_highlight(row["description_highlight"])
+    has_more = len(rows) > limit
+    return {
+        "results": results,
+        "nextOffset": offset + limit if has_more else None,
+    }
+
+
+# Export streams from a server-side cursor, EXPORT_BATCH_SIZE rows at a time,
+# so memory stays flat however many tasks a user has
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+EXPORT_COLUMNS = ("id", "title", "description", "priority", "status", "due_date", "created_at", "updated_at")
+
+
+def _export_batch(rows, export_format):
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+    return b"".join(orjson.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+
+
+async def _stream_export(user_id, export_format, compress):
+    """Yield encoded batches from a named cursor.
+
+    The connection is borrowed inside the generator, in the same scope that
+    returns it, so a response that never starts holds no pool slot.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+
+    def encode(chunk):
+        return compressor.compress(chunk) if compressor else chunk
+
+    async with db_connection() as conn:
+        cur = conn.cursor(name="task_export")
+        try:
+            await run_in_threadpool(
+                cur.execute,
+                f"""
+                SELECT {', '.join(EXPORT_COLUMNS)}
+                FROM tasks
+                WHERE user_id = %s
+                ORDER BY created_at DESC, id DESC
+                """,
+                (user_id,),
+            )
+            if export_format == "csv":
+                yield encode(_export_batch([EXPORT_COLUMNS], "csv"))
+            while True:
+                rows = await run_in_threadpool(cur.fetchmany, EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                chunk = encode(_export_batch(rows, export_format))
+                if chunk:
+                    yield chunk
+            if compressor:
+                yield compressor.flush()
+        finally:
+            await run_in_threadpool(cur.close)
+
+
+@app.get("/api/tasks/export")
+async def export_tasks(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user),
+):
+    """Stream all of the user's tasks as NDJSON or CSV, newest first.
+
+    With `gzip=true` (and a client that accepts gzip) the body is sent with
+    `Content-Encoding: gzip`, compressed batch by batch.
+    """
+    compress = gzip and "gzip" in request.headers.get("accept-encoding", "")
+    # Non-blocking check so pool exhaustion still surfaces as 503; the
+    # connection itself is borrowed by the generator
+    if pool_is_exhausted():
+        raise PoolTimeoutError("No database connection available for export")
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="tasks_export_{date.today().isoformat()}.{export_format}"',
+        "Cache-Control": "no-store",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(
+        _stream_export(current_user['id'], export_format, compress),
+        media_type=media_type,
+        headers=headers,
     )
-    
-    # Schedule reminder email after 1 minute
-    scheduler.add_job(
-        send_task_reminder_email,
-        'date',
-        run_date=datetime.now() + timedelta(minutes=1),
-        args=[user_email, new_task['title'], new_task['description'] or '']
+
+
+@app.post("/api/tasks/events/ticket", response_model=dict)
+async def task_events_ticket(current_user: dict = Depends(get_current_user)):
+    """One-time, short-lived ticket for opening GET /api/tasks/events?ticket=...
+
+    EventSource cannot send an Authorization header; the ticket keeps the
+    access token itself out of URLs and access logs.
+    """
+    return {
+        "ticket": create_stream_ticket(current_user['id'], current_user['sid']),
+        "expires_in": STREAM_TICKET_SECONDS,
+    }
+
+
+@app.get("/api/tasks/events")
+async def task_events(request: Request, current_user: dict = Depends(get_stream_user)):
+    """Server-Sent Events stream of the user's task changes (see task_events.py).
+
+    Each message is `{"op": "created"|"updated", "task": {...}}`,
+    `{"op": "deleted", "id": ...}` or `{"op": "resync"}` (refetch the list).
+    Clients should refetch once after (re)connecting, then apply deltas.
+    Authenticate with a Bearer header or a ticket from POST /api/tasks/events/ticket.
+    """
+    if task_event_hub is None:
+        raise HTTPException(status_code=503, detail="Event stream unavailable")
+    user_id, session_id = current_user['id'], current_user['sid']
+    if task_event_hub.is_full():
+        raise HTTPException(status_code=503, detail="Too many event streams on this worker")
+
+    async def stream():
+        queue = None
+        try:
+            # Subscribed only once the body runs, in the same try/finally as the
+            # unsubscribe: a response that never starts leaves no queue behind
+            queue = task_event_hub.subscribe(user_id)
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=TASK_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Idle: end streams of logged-out sessions, keep proxies from timing out
+                    if is_session_revoked(session_id) or await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                # Checked per event too (in-memory), so a busy stream of a
+                # logged-out session stops at its next event
+                if event is None or is_session_revoked(session_id):
+                    break
+                yield b"data: " + event + b"\n\n"
+        except TooManySubscribersError:
+            # Filled up since the check above; end the stream and let the client retry
+            return
+        finally:
+            if queue is not None:
+                task_event_hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
     )
+
+
+@app.get("/api/tasks/changes")
+async def get_task_changes(
+    since: Optional[str] = Query(None, max_length=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """Delta sync: tasks created/updated and ids deleted since `since` (see task_sync.py).
+
+    Store the returned `cursor` and pass it back as `since`. When `reset` is
+    true, `changed` is the complete list and replaces the client's copy.
+    """
+    async with db_connection() as conn:
+        try:
+            changes = fetch_changes(conn, current_user['id'], since)
+        except InvalidSyncCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(changes, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/api/tasks/stats", response_model=dict)
+async def get_task_stats(current_user: dict = Depends(get_current_user)):
+    """Aggregate counts for Dashboard/Analytics from per-user counters (see task_stats.py)"""
+    async with db_connection() as conn:
+        return fetch_task_stats(conn, current_user['id'])
+
+
+@app.post("/api/tasks", response_model=dict)
+async def create_task(task: TaskCreate, current_user: dict = Depends(get_current_user)):
+    """Create a new task"""
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Create task
+        cur.execute(
+            """
+            INSERT INTO tasks (title, description, priority, status, due_date, user_id) 
+            VALUES (%s, %s, %s, %s, %s, %s) 
+            RETURNING id, title, description, priority, status, due_date, created_at, updated_at, user_id
+            """,
+            (task.title, task.description, task.priority, task.status, task.due_date, current_user['id'])
+        )
+        new_task = cur.fetchone()
+        
+        # Record created notification (coalesced, see notifications.py)
+        record_notification(cur, current_user['id'], "task_created", {
+            "title": new_task['title'],
+            "description": new_task['description'] or '',
+            "due_date": new_task['due_date'].isoformat() if new_task['due_date'] else '',
+        })
+        notify_task_change(cur, current_user['id'], "created", new_task)
+        # Due-date reminders are picked up by the reminder sweep (reminders.py)
+        conn.commit()
+        cur.close()
     
     return dict(new_task)
 
 
+MAX_BULK_OPERATIONS = int(os.getenv("MAX_BULK_OPERATIONS", 500))
+TASK_COLUMNS = "id, title, description, priority, status, due_date, created_at, updated_at, user_id"
+
+
+@app.post("/api/tasks/bulk", response_model=dict)
+async def bulk_tasks(
+    payload: BulkTaskRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply many create/update/delete operations in one transaction.
+
+    Each kind is written with a single multi-row statement. `results` is
+    aligned with `operations`; one summary email replaces per-task emails.
+    """
+    operations = payload.operations
+    if len(operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations per request")
+
+    user_id = current_user['id']
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+
+    # Validate every operation up front (values included, so one bad field fails
+    # only its own item); an id may only be touched once per batch
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            if operation.task is None:
+                results[index] = {"index": index, "op": "create", "ok": False, "error": "task is required"}
+                continue
+            try:
+                creates.append((index, validate_task(operation.task.model_dump())))
+            except ValueError as e:
+                results[index] = {"index": index, "op": "create", "ok": False, "error": str(e)}
+            continue
+        if operation.id is None:
+            results[index] = {"index": index, "op": operation.op, "ok": False, "error": "id is required"}
+            continue
+        if operation.id in seen_ids:
+            results[index] = {"index": index, "op": operation.op, "id": operation.id, "ok": False, "error": "duplicate id in batch"}
+            continue
+        if operation.op == "delete":
+            seen_ids.add(operation.id)
+            deletes.append((index, operation))
+            continue
+        fields = operation.changes or TaskUpdate()
+        try:
+            changes = validate_task_update({name: getattr(fields, name) for name in fields.model_fields_set})
+        except ValueError as e:
+            results[index] = {"index": index, "op": "update", "id": operation.id, "ok": False, "error": str(e)}
+            continue
+        seen_ids.add(operation.id)
+        updates.append((index, operation.id, changes))
+
+    created_count = updated_count = completed_count = deleted_count = 0
+
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        # Lock every targeted row once; missing ids become per-item errors
+        existing = {}
+        if seen_ids:
+            cur.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s AND id = ANY(%s) FOR UPDATE",
+                (user_id, list(seen_ids)),
+            )
+            existing = {row['id']: row for row in cur.fetchall()}
+
+        if creates:
+            rows = execute_values(
+                cur,
+                f"""
+                INSERT INTO tasks (title, description, priority, status, due_date, user_id)
+                VALUES %s
+                RETURNING {TASK_COLUMNS}
+                """,
+                [(*values, user_id) for _, values in creates],
+                template="(%s, %s, %s, %s, %s::date, %s)",
+                page_size=len(creates),
+                fetch=True,
+            )
+            for (index, _), row in zip(creates, rows):
+                results[index] = {"index": index, "op": "create", "ok": True, "task": dict(row)}
+            created_count = len(rows)
+
+        update_rows = []
+        for index, task_id, changes in updates:
+            old_task = existing.get(task_id)
+            if not old_task:
+                results[index] = {"index": index, "op": "update", "id": task_id, "ok": False, "error": "Task not found"}
+                continue
+            if not changes:
+                results[index] = {"index": index, "op": "update", "id": task_id, "ok": True, "task": dict(old_task)}
+                continue
+            if old_task['status'] != 'completed' and changes.get('status') == 'completed':
+                completed_count += 1
+            update_rows.append((
+                task_id, user_id,
+                'title' in changes, changes.get('title'),
+                'description' in changes, changes.get('description'),
+                'priority' in changes, changes.get('priority'),
+                'status' in changes, changes.get('status'),
+                'due_date' in changes, changes.get('due_date'),
+            ))
+
+        if update_rows:
+            rows = execute_values(
+                cur,
+                f"""
+                UPDATE tasks AS t SET
+                    title = CASE WHEN v.set_title THEN v.title ELSE t.title END,
+                    description = CASE WHEN v.set_description THEN v.description ELSE t.description END,
+                    priority = CASE WHEN v.set_priority THEN v.priority ELSE t.priority END,
+                    status = CASE WHEN v.set_status THEN v.status ELSE t.status END,
+                    due_date = CASE WHEN v.set_due_date THEN v.due_date ELSE t.due_date END,
+                    -- Only a date that actually changes re-arms the reminder
+                    reminded_at = CASE WHEN v.set_due_date AND t.due_date IS DISTINCT FROM v.due_date
+                                       THEN NULL ELSE t.reminded_at END,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS v(id, user_id, set_title, title, set_description, description,
+                                      set_priority, priority, set_status, status, set_due_date, due_date)
+                WHERE t.id = v.id AND t.user_id = v.user_id
+                RETURNING {', '.join('t.' + column for column in TASK_COLUMNS.split(', '))}
+                """,
+                update_rows,
+                template="(%s::int, %s::int, %s, %s::varchar, %s, %s::text, %s, %s::varchar, %s, %s::varchar, %s, %s::date)",
+                page_size=len(update_rows),
+                fetch=True,
+            )
+            updated_by_id = {row['id']: row for row in rows}
+            for index, task_id, _ in updates:
+                if task_id in updated_by_id:
+                    results[index] = {"index": index, "op": "update", "id": task_id, "ok": True, "task": dict(updated_by_id[task_id])}
+            updated_count = len(rows)
+
+        delete_ids = [operation.id for _, operation in deletes if operation.id in existing]
+        if delete_ids:
+            cur.execute(
+                "DELETE FROM tasks WHERE user_id = %s AND id = ANY(%s)",
+                (user_id, delete_ids),
+            )
+            deleted_count = cur.rowcount
+        for index, operation in deletes:
+            if operation.id in existing:
+                results[index] = {"index": index, "op": "delete", "id": operation.id, "ok": True}
+            else:
+                results[index] = {"index": index, "op": "delete", "id": operation.id, "ok": False, "error": "Task not found"}
+
+        if created_count or updated_count or deleted_count:
+            record_notification(cur, user_id, "bulk", {
+                "created": created_count,
+                "updated": updated_count,
+                "completed": completed_count,
+                "deleted": deleted_count,
+            })
+            notify_task_change(cur, user_id, "resync")
+
+        conn.commit()
+        cur.close()
+
+    return {
+        "results": results,
+        "summary": {
+            "created": created_count,
+            "updated": updated_count,
+            "completed": completed_count,
+            "deleted": deleted_count,
+            "failed": sum(1 for result in results if not result["ok"]),
+        },
+    }
+
+
+@app.post("/api/tasks/import", response_model=dict)
+async def import_tasks(
+    request: Request,
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Import tasks from a raw CSV or NDJSON request body (see task_import.py).
+
+    The format comes from `format` or the Content-Type. Valid rows are loaded
+    with one COPY; invalid ones are skipped and reported by line number. One
+    summary notification replaces per-task emails.
+    """
+    import_format = import_format or import_format_for(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(status_code=400, detail="Pass format=csv|ndjson or a text/csv / application/x-ndjson body")
+
+    user_id = current_user['id']
+    try:
+        with TaskImportParser(import_format, user_id) as parser:
+            # Parse while the body streams in; no pool connection is held meanwhile
+            async for chunk in request.stream():
+                await run_in_threadpool(parser.feed, chunk)
+            await run_in_threadpool(parser.close)
+
+            imported = 0
+            if parser.imported:
+                async with db_connection() as conn:
+                    imported = await run_in_threadpool(copy_tasks, conn, parser)
+                    cur = conn.cursor()
+                    record_notification(cur, user_id, "bulk", {"created": imported})
+                    notify_task_change(cur, user_id, "resync")
+                    conn.commit()
+                    cur.close()
+    except TaskImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "imported": imported,
+        "failed": parser.failed,
+        "errors": parser.errors,
+        "errors_truncated": parser.failed > len(parser.errors),
+    }
+
+
 @app.put("/api/tasks/{task_id}", response_model=dict)
 async def update_task(
     task_id: int, 
     task_update: dict, 
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Update a task"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Get user email and old task status
-    cur.execute("SELECT email FROM users WHERE id = %s", (current_user['id'],))
-    user = cur.fetchone()
-    user_email = user['email']
-    
-    cur.execute("SELECT status, title FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
-    old_task = cur.fetchone()
-    
-    if not old_task:
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    old_status = old_task['status']
-    task_title = old_task['title']
-    
-    # Build update query dynamically
-    update_fields = []
-    values = []
-    
-    if 'title' in task_update and task_update['title']:
-        update_fields.append("title = %s")
-        values.append(task_update['title'])
-        task_title = task_update['title']
-    
-    if 'description' in task_update:
-        update_fields.append("description = %s")
-        values.append(task_update['description'])
-    
-    if 'priority' in task_update and task_update['priority']:
-        update_fields.append("priority = %s")
-        values.append(task_update['priority'])
-    
-    if 'status' in task_update and task_update['status']:
-        update_fields.append("status = %s")
-        values.append(task_update['status'])
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        # Send completion email if status changed to completed
-        if old_status != 'completed' and task_update['status'] == 'completed':
-            background_tasks.add_task(send_task_completed_email, user_email, task_title)
-    
-    if 'due_date' in task_update:
-        update_fields.append("due_date = %s")
-        values.append(task_update['due_date'])
-    
-    if not update_fields:
+        # Get old task status
+        cur.execute("SELECT status, title FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
+        old_task = cur.fetchone()
+        
+        if not old_task:
+            cur.close()
+            raise HTTPException(status_code=404, detail="Task not found")
+        
+        old_status = old_task['status']
+        task_title = old_task['title']
+        
+        # Build update query dynamically
+        update_fields = []
+        values = []
+        
+        if 'title' in task_update and task_update['title']:
+            update_fields.append("title = %s")
+            values.append(task_update['title'])
+            task_title = task_update['title']
+        
+        if 'description' in task_update:
+            update_fields.append("description = %s")
+            values.append(task_update['description'])
+        
+        if 'priority' in task_update and task_update['priority']:
+            update_fields.append("priority = %s")
+            values.append(task_update['priority'])
+        
+        if 'status' in task_update and task_update['status']:
+            update_fields.append("status = %s")
+            values.append(task_update['status'])
+            
+            # Record completion notification if status changed to completed
+            if old_status != 'completed' and task_update['status'] == 'completed':
+                record_notification(cur, current_user['id'], "task_completed", {"title": task_title})
+        
+        if 'due_date' in task_update:
+            update_fields.append("due_date = %s")
+            values.append(task_update['due_date'])
+            # A changed due date gets a fresh reminder; clients resend the same
+            # date on every edit/toggle, which must not re-send the reminder
+            update_fields.append("reminded_at = CASE WHEN due_date IS DISTINCT FROM %s::date THEN NULL ELSE reminded_at END")
+            values.append(task_update['due_date'])
+        
+        if not update_fields:
+            cur.close()
+            return dict(old_task)
+        
+        update_fields.append("updated_at = CURRENT_TIMESTAMP")
+        values.extend([task_id, current_user['id']])
+        
+        query = f"""
+            UPDATE tasks 
+            SET {', '.join(update_fields)}
+            WHERE id = %s AND user_id = %s 
+            RETURNING id, title, description, priority, status, due_date, created_at, updated_at, user_id
+        """
+        
+        cur.execute(query, values)
+        updated_task = cur.fetchone()
+        notify_task_change(cur, current_user['id'], "updated", updated_task)
+        conn.commit()
         cur.close()
-        conn.close()
-        return dict(old_task)
-    
-    update_fields.append("updated_at = CURRENT_TIMESTAMP")
-    values.extend([task_id, current_user['id']])
-    
-    query = f"""
-        UPDATE tasks 
-        SET {', '.join(update_fields)}
-        WHERE id = %s AND user_id = %s 
-        RETURNING id, title, description, priority, status, due_date, created_at, updated_at, user_id
-    """
-    
-    cur.execute(query, values)
-    updated_task = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
     
     return dict(updated_task)
 
@@ -741,41 +1464,36 @@ async def update_task(
 @app.delete("/api/tasks/{task_id}")
 async def delete_task(
     task_id: int, 
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Delete a task"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # Get user email and task title
-    cur.execute("SELECT email FROM users WHERE id = %s", (current_user['id'],))
-    user = cur.fetchone()
-    user_email = user['email']
-    
-    cur.execute("SELECT title FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
-    task = cur.fetchone()
-    
-    if not task:
+    async with db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        # Get task title
+        cur.execute("SELECT title FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
+        task = cur.fetchone()
+        
+        if not task:
+            cur.close()
+            raise HTTPException(status_code=404, detail="Task not found")
+        
+        task_title = task['title']
+        
+        # Delete task
+        cur.execute("DELETE FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
+        deleted = cur.rowcount > 0
+        
+        # Record deletion notification
+        if deleted:
+            record_notification(cur, current_user['id'], "task_deleted", {"title": task_title})
+            notify_task_change(cur, current_user['id'], "deleted", task_id=task_id)
+        conn.commit()
         cur.close()
-        conn.close()
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    task_title = task['title']
-    
-    # Delete task
-    cur.execute("DELETE FROM tasks WHERE id = %s AND user_id = %s", (task_id, current_user['id']))
-    deleted = cur.rowcount > 0
-    conn.commit()
-    cur.close()
-    conn.close()
     
     if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Send deletion notification
-    background_tasks.add_task(send_task_deleted_email, user_email, task_title)
-    
     return {"message": "Task deleted successfully", "deleted": True}
 
 
@@ -795,59 +1513,151 @@ async def root():
 @app.get("/api/health")
 async def health_check():
     """API health check"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "startup": startup_timings,
+        # Per-process hit rates of the hot-path caches
+        "caches": {"jwt": token_cache_stats(), "identity": identity_cache_stats()},
+        "events": task_event_hub.stats() if task_event_hub is not None else None,
+    }
+
+
+def check_metrics_token(request: Request):
+    """Require `Authorization: Bearer METRICS_TOKEN` when a token is configured"""
+    supplied = request.headers.get("Authorization", "").encode()
+    if METRICS_TOKEN and not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
+def require_metrics_token(request: Request):
+    """Like check_metrics_token, but the endpoint does not exist until a token is configured"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    check_metrics_token(request)
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(check_metrics_token)])
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = await run_in_threadpool(render_metrics)
+    return Response(content=body, media_type=content_type)
+
+
+# Exposes normalized SQL and EXPLAIN plans, so it is never served unauthenticated
+@app.get("/metrics/queries", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def query_metrics(
+    sort: Literal["total", "mean", "max", "calls"] = "total",
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Per-fingerprint SQL statement stats of the worker answering (slow-query plans included)"""
+    return {"pid": os.getpid(), "queries": query_stats.snapshot(sort, limit)}
 
 
 # ==================== STARTUP EVENT ====================
-# Purpose: Create tables idempotently to support local dev and ephemeral hosts
+def register_scheduled_jobs(scheduler):
+    """Add the periodic jobs; called by the scheduler leader when it takes over."""
+    # Turn due notification events into (digest) emails
+    scheduler.add_job(
+        flush_due_notifications,
+        'interval',
+        seconds=NOTIFY_FLUSH_INTERVAL,
+        id='flush_notifications',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    # Queue reminders for tasks whose due date is approaching
+    scheduler.add_job(
+        sweep_due_reminders,
+        'interval',
+        seconds=REMINDER_SWEEP_INTERVAL,
+        id='sweep_reminders',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    # Drop auth sessions whose refresh token has expired
+    scheduler.add_job(
+        purge_expired_sessions,
+        'interval',
+        hours=1,
+        id='purge_sessions',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    # Compact the delta-sync tombstone log
+    scheduler.add_job(
+        purge_task_tombstones,
+        'interval',
+        hours=1,
+        id='purge_task_tombstones',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+
+# Purpose: Open the shared connection pool and verify the schema version;
+# migrations live in alembic/versions (see schema.py)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # Create users table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            hashed_password VARCHAR(255) NOT NULL,
-            full_name VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create tasks table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id SERIAL PRIMARY KEY,
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            priority VARCHAR(50) DEFAULT 'medium',
-            status VARCHAR(50) DEFAULT 'in_progress',
-            due_date DATE,
-            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    """Open the DB pool and check the database is at the migration head"""
+    started = time.perf_counter()
+    await run_in_threadpool(init_pool)
+
+    if DB_AUTO_MIGRATE:
+        await run_in_threadpool(upgrade_schema)
+    async with db_connection() as conn:
+        revision = await run_in_threadpool(check_schema_version, conn)
+    print(f"✅ Database schema at revision {revision}")
+
+    if STARTUP_WARMUP:
+        warm_started = time.perf_counter()
+        await asyncio.gather(
+            run_in_threadpool(warm_up_pool),
+            run_in_threadpool(warm_up_password_hashing),
         )
-    """)
-
-    # Create OTP table for auth flows
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS otps (
-            id SERIAL PRIMARY KEY,
-            email VARCHAR(255) NOT NULL,
-            code VARCHAR(10) NOT NULL,
-            purpose VARCHAR(20) NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            used BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("✅ Database tables initialized")
+        startup_timings["warmupMs"] = round((time.perf_counter() - warm_started) * 1000, 1)
+
+    global outbox_worker
+    outbox_worker = OutboxWorker()
+    outbox_worker.start()
+
+    global revocation_listener
+    revocation_listener = RevocationListener(ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    revocation_listener.start()
+
+    global task_event_hub
+    task_event_hub = TaskEventHub()
+    task_event_hub.start()
+
+    global scheduler_leader
+    if SCHEDULER_ENABLED:
+        scheduler_leader = SchedulerLeader(register_scheduled_jobs)
+        scheduler_leader.start()
+
+    startup_timings["startupMs"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"⏱️ Cold start: imports {startup_timings['importMs']} ms, startup {startup_timings['startupMs']} ms")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close every pooled DB connection on shutdown"""
+    if scheduler_leader is not None:
+        await scheduler_leader.stop()
+    if task_event_hub is not None:
+        await task_event_hub.stop()
+    if revocation_listener is not None:
+        await revocation_listener.stop()
+    if outbox_worker is not None:
+        await outbox_worker.stop()
+    close_pool()
+    shutdown_hash_executor()
+    mark_worker_dead()
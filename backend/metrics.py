@@ -0,0 +1,171 @@
+# Purpose: Prometheus metrics served at GET /metrics
+# Why: The only production signals were print() calls; autoscaling and alerting
+#      need request latency/status, DB pool pressure, email delivery and
+#      scheduler health as numbers
+# How: Collectors are module-level prometheus_client objects updated in place:
+#      MetricsMiddleware (HTTP), database.py (pool acquire/hold time),
+#      email_service.py (SendGrid calls), query_stats.py (SQL statements) and
+#      leader.py (scheduler). Request latency is measured to the first response
+#      byte, so long streams (export, SSE) count their setup time only; routes
+#      are labelled with their path template to keep cardinality bounded. With
+#      several workers, point PROMETHEUS_MULTIPROC_DIR at an empty directory
+#      (wiped on every deploy, set before the process starts) and each worker
+#      writes its samples there; /metrics then aggregates all workers,
+#      whichever one answers the scrape.
+#      METRICS_TOKEN, when set, must be sent as a Bearer token (/metrics/queries
+#      is disabled until it is set)
+
+import os
+import time
+from contextvars import ContextVar
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client import generate_latest, multiprocess
+
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# ==================== HTTP ====================
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to the first response byte",
+    ["method", "route"], buckets=FAST_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests (including open streams) being served",
+    multiprocess_mode="livesum",
+)
+
+# ==================== DATABASE ====================
+
+DB_ACQUIRE = Histogram(
+    "db_pool_acquire_seconds", "Wait for a pooled connection", buckets=FAST_BUCKETS,
+)
+DB_ACQUIRE_TIMEOUTS = Counter(
+    "db_pool_acquire_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT",
+)
+DB_HOLD = Histogram(
+    "db_connection_hold_seconds", "Time a connection stays checked out (its queries plus any work in between)",
+    buckets=FAST_BUCKETS,
+)
+DB_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Pooled connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_QUERY = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time by route",
+    ["route"], buckets=FAST_BUCKETS,
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS by route",
+    ["route"],
+)
+
+# ==================== EMAIL ====================
+
+EMAIL_SENDS = Counter(
+    "email_sends_total", "SendGrid deliveries by result (sent, retryable_error, error)",
+    ["result"],
+)
+EMAIL_LATENCY = Histogram(
+    "email_send_duration_seconds", "SendGrid API call latency", buckets=SLOW_BUCKETS,
+)
+
+# ==================== SCHEDULER ====================
+
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader", "1 on the worker running the scheduled jobs (sum should be 1)",
+    multiprocess_mode="livesum",
+)
+SCHEDULER_JOBS = Gauge(
+    "scheduler_jobs", "Jobs registered on the leader's scheduler",
+    multiprocess_mode="livesum",
+)
+SCHEDULER_JOBS_OVERDUE = Gauge(
+    "scheduler_jobs_overdue", "Jobs whose next run time has already passed",
+    multiprocess_mode="livesum",
+)
+SCHEDULER_LAG = Histogram(
+    "scheduler_job_lag_seconds", "Delay between a job's scheduled time and its submission",
+    ["job"], buckets=SLOW_BUCKETS,
+)
+SCHEDULER_RUNS = Counter(
+    "scheduler_job_runs_total", "Job runs by outcome (success, error, missed, skipped)",
+    ["job", "result"],
+)
+
+
+# ASGI scope of the request being served (copied into threadpool calls), so code
+# below the handlers can tell which route it is working for
+_request_scope = ContextVar("request_scope", default=None)
+
+
+def route_label(scope) -> str:
+    # FastAPI stores the matched route in the scope; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def current_route() -> str:
+    """Route template of the current request, or "background" outside requests."""
+    scope = _request_scope.get()
+    return route_label(scope) if scope is not None else "background"
+
+
+def render_metrics():
+    """Exposition text for GET /metrics (all workers in multiprocess mode)."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead():
+    """Drop this worker's live gauges from the shared directory (shutdown hook)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording status counts and time to first byte per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status_code):
+            nonlocal recorded
+            recorded = True
+            path = route_label(scope)
+            HTTP_LATENCY.labels(scope["method"], path).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(scope["method"], path, str(status_code)).inc()
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start" and not recorded:
+                record(message["status"])
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_scope.reset(token)
+            HTTP_IN_PROGRESS.dec()
+            if not recorded:
+                # Unhandled error before any response: the server replies 500
+                record(500)
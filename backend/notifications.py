@@ -0,0 +1,236 @@
+# Purpose: Coalesce per-event notification emails into one email per user window
+# Why: Bulk-active users triggered hundreds of created/completed/deleted/login
+#      emails per hour, burning SendGrid quota and worker time
+# How: Routes call record_notification(cur, ...) inside their transaction instead
+#      of queueing an email. Events for a user share one flush time, set by the
+#      first event in the window: NOTIFY_COALESCE_WINDOW for "immediate" users,
+#      NOTIFY_DIGEST_WINDOW for "digest" users. flush_due_notifications() runs on
+#      the scheduler, claims whole users (a digest is never split across
+#      passes), turns each user's due events into ONE outbox email (the normal
+#      template for a single event, a digest otherwise) and drops task events
+#      for users in "off" mode. Daily counts land in notification_stats so
+#      `python notifications.py stats` can report how many sends were saved.
+
+import argparse
+import os
+from collections import defaultdict
+import psycopg2
+from psycopg2.extras import Json, RealDictCursor
+from dotenv import load_dotenv
+from database import pooled_connection
+from email_outbox import enqueue_email
+from email_service import (
+    render_task_created_email,
+    render_task_completed_email,
+    render_task_deleted_email,
+    render_task_reminder_email,
+    render_bulk_summary_email,
+    render_login_notification_email,
+    render_digest_email,
+)
+
+
+NOTIFY_COALESCE_WINDOW = int(os.getenv("NOTIFY_COALESCE_WINDOW", 30))  # seconds, "immediate" mode
+NOTIFY_DIGEST_WINDOW = int(os.getenv("NOTIFY_DIGEST_WINDOW", 3600))  # seconds, "digest" mode
+NOTIFY_FLUSH_INTERVAL = int(os.getenv("NOTIFY_FLUSH_INTERVAL", 10))  # scheduler period
+NOTIFY_FLUSH_BATCH = int(os.getenv("NOTIFY_FLUSH_BATCH", 5000))  # users per flush pass
+
+NOTIFICATION_MODES = ("immediate", "digest", "off")
+# Security alerts are still coalesced but never switched off
+ALWAYS_SENT_KINDS = {"login"}
+
+
+# Flush time for a new event of user `u`: join the user's pending window, or
+# open one sized by their mode. Needs the %(digest)s/%(window)s parameters of
+# window_params(); shared with the reminder sweep (reminders.py)
+DELIVER_AFTER_SQL = """
+    COALESCE(
+        (SELECT MIN(e.deliver_after) FROM notification_events e WHERE e.user_id = u.id),
+        CURRENT_TIMESTAMP + make_interval(secs => CASE
+            WHEN u.notification_mode = 'digest' THEN %(digest)s
+            ELSE %(window)s END)
+    )
+"""
+
+
+def window_params() -> dict:
+    return {"digest": NOTIFY_DIGEST_WINDOW, "window": NOTIFY_COALESCE_WINDOW}
+
+
+RECORD_NOTIFICATION_SQL = f"""
+    INSERT INTO notification_events (user_id, kind, payload, deliver_after)
+    SELECT u.id, %(kind)s, %(payload)s, {DELIVER_AFTER_SQL}
+    FROM users u
+    WHERE u.id = %(user_id)s
+"""
+
+
+def record_notification(cur, user_id: int, kind: str, payload: dict = None):
+    """Buffer a notification event in the caller's transaction."""
+    cur.execute(
+        RECORD_NOTIFICATION_SQL,
+        {
+            "user_id": user_id,
+            "kind": kind,
+            "payload": Json(payload or {}),
+            **window_params(),
+        },
+    )
+
+
+def _render_single(kind, payload):
+    if kind == "task_created":
+        return render_task_created_email(payload["title"], payload.get("description") or "", payload.get("due_date") or "")
+    if kind == "task_completed":
+        return render_task_completed_email(payload["title"])
+    if kind == "task_deleted":
+        return render_task_deleted_email(payload["title"])
+    if kind == "task_reminder":
+        return render_task_reminder_email(payload["title"], payload.get("description") or "")
+    if kind == "bulk":
+        return render_bulk_summary_email(**payload)
+    return render_login_notification_email()
+
+
+DIGEST_HEADINGS = {
+    "task_created": "🚀 Created",
+    "task_completed": "🎉 Completed",
+    "task_deleted": "🗑️ Deleted",
+    "task_reminder": "⏰ Due soon",
+    "bulk": "📋 Bulk updates",
+    "login": "🔐 New sign-ins",
+}
+
+
+def _render_digest(events):
+    grouped = defaultdict(list)
+    for event in events:
+        payload = event["payload"]
+        if event["kind"] == "bulk":
+            item = ", ".join(f"{count} {label}" for label, count in payload.items() if count)
+        elif event["kind"] == "login":
+            item = event["created_at"].strftime("%Y-%m-%d %H:%M")
+        elif event["kind"] == "task_reminder":
+            item = f'{payload["title"]} (due {payload["due_date"]})'
+        else:
+            item = payload["title"]
+        grouped[event["kind"]].append(item)
+    sections = [(DIGEST_HEADINGS[kind], grouped[kind]) for kind in DIGEST_HEADINGS if grouped[kind]]
+    return render_digest_email(sections)
+
+
+def flush_due_notifications():
+    """Scheduler job: turn due events into at most one outbox email per user."""
+    with pooled_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        # Claim whole users first: the batch limit never cuts through one user's
+        # events, and a concurrent flush skips the users locked here
+        cur.execute(
+            """
+            SELECT u.id, u.email, u.notification_mode
+            FROM users u
+            WHERE u.id IN (
+                SELECT user_id FROM notification_events
+                WHERE deliver_after <= CURRENT_TIMESTAMP
+            )
+            ORDER BY u.id
+            LIMIT %s
+            FOR NO KEY UPDATE OF u SKIP LOCKED
+            """,
+            (NOTIFY_FLUSH_BATCH,),
+        )
+        users = {row["id"]: row for row in cur.fetchall()}
+        if not users:
+            conn.rollback()
+            cur.close()
+            return 0
+
+        # Then drain every due event of the claimed users
+        cur.execute(
+            """
+            DELETE FROM notification_events
+            WHERE user_id = ANY(%s) AND deliver_after <= CURRENT_TIMESTAMP
+            RETURNING user_id, kind, payload, created_at
+            """,
+            (list(users),),
+        )
+        events_by_user = defaultdict(list)
+        for event in cur.fetchall():
+            events_by_user[event["user_id"]].append(event)
+
+        event_count = emails = suppressed = 0
+        for user_id, events in events_by_user.items():
+            event_count += len(events)
+            user = users[user_id]
+            if user["notification_mode"] == "off":
+                kept = [event for event in events if event["kind"] in ALWAYS_SENT_KINDS]
+                suppressed += len(events) - len(kept)
+                events = kept
+            if not events:
+                continue
+            events.sort(key=lambda event: event["created_at"])
+            if len(events) == 1:
+                subject, html_content = _render_single(events[0]["kind"], events[0]["payload"])
+            else:
+                subject, html_content = _render_digest(events)
+            enqueue_email(cur, user["email"], subject, html_content)
+            emails += 1
+
+        cur.execute(
+            """
+            INSERT INTO notification_stats (day, events, emails, suppressed)
+            VALUES (CURRENT_DATE, %s, %s, %s)
+            ON CONFLICT (day) DO UPDATE SET
+                events = notification_stats.events + EXCLUDED.events,
+                emails = notification_stats.emails + EXCLUDED.emails,
+                suppressed = notification_stats.suppressed + EXCLUDED.suppressed
+            """,
+            (event_count, emails, suppressed),
+        )
+        conn.commit()
+        cur.close()
+    return emails
+
+
+def notification_savings(conn, days: int = 30):
+    """Events recorded vs emails actually queued over the last `days` days."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(
+        """
+        SELECT COALESCE(SUM(events), 0) AS events,
+               COALESCE(SUM(emails), 0) AS emails,
+               COALESCE(SUM(suppressed), 0) AS suppressed
+        FROM notification_stats
+        WHERE day > CURRENT_DATE - %s
+        """,
+        (days,),
+    )
+    row = cur.fetchone()
+    cur.close()
+    saved = row["events"] - row["emails"]
+    return {
+        "days": days,
+        "events": row["events"],
+        "emails": row["emails"],
+        "suppressed": row["suppressed"],
+        "saved": saved,
+        "savedPercent": round(saved / row["events"] * 100, 1) if row["events"] else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification coalescing utilities")
+    parser.add_argument("command", choices=["stats"])
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+    try:
+        savings = notification_savings(conn, args.days)
+        print(
+            f"📬 Last {savings['days']} days: {savings['events']} events -> {savings['emails']} emails "
+            f"({savings['saved']} saved, {savings['savedPercent']}%; {savings['suppressed']} suppressed by 'off')"
+        )
+    finally:
+        conn.close()
@@ -0,0 +1,120 @@
+# Purpose: Shared LISTEN/NOTIFY loop for in-process fan-out (revocations, task events)
+# Why: sessions.RevocationListener and task_events.TaskEventHub each carried the
+#      same connect/LISTEN/poll/reconnect code
+# How: PgListener holds one dedicated autocommit connection (outside the pool,
+#      with TCP keepalives) LISTENing on `channel`, watched with loop.add_reader
+#      so no thread is parked on it. Each notification payload goes to
+#      dispatch(). A dead connection (poll error) or any failure closes it and
+#      reconnects after 5 s; on_connect(reconnected=True) lets subclasses cover
+#      what may have been missed meanwhile. idle() runs between wake-ups and
+#      can be overridden for periodic work
+
+import asyncio
+import os
+import psycopg2
+from fastapi.concurrency import run_in_threadpool
+
+
+class PgListener:
+    """Base class: subclasses set channel/application_name/label and implement dispatch()."""
+
+    channel = None
+    application_name = "taskflow-listener"
+    label = "Listener"
+    reconnect_delay = 5  # seconds
+
+    def __init__(self):
+        self._conn = None
+        self._fd = None
+        self._broken = False
+        self._task = None
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    @property
+    def listening(self) -> bool:
+        return self._fd is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def dispatch(self, payload: str):
+        raise NotImplementedError
+
+    def on_connect(self, reconnected: bool):
+        """Called once LISTEN is active; `reconnected` after any earlier connection."""
+
+    async def idle(self):
+        """Wait until woken (shutdown or a broken connection)."""
+        await self._wake.wait()
+        self._wake.clear()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        connected_before = False
+        while not self._stopping.is_set():
+            try:
+                await run_in_threadpool(self._connect)
+                self._fd = self._conn.fileno()
+                loop.add_reader(self._fd, self._on_readable)
+                self.on_connect(connected_before)
+                connected_before = True
+                while not self._stopping.is_set() and not self._broken:
+                    await self.idle()
+            except Exception as e:
+                print(f"❌ {self.label} error: {e}")
+                connected_before = True
+            finally:
+                if self._fd is not None:
+                    loop.remove_reader(self._fd)
+                    self._fd = None
+                await run_in_threadpool(self._close)
+            if not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.reconnect_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _connect(self):
+        self._conn = psycopg2.connect(
+            os.getenv("DATABASE_URL"),
+            sslmode="prefer",
+            application_name=self.application_name,
+            keepalives=1,
+            keepalives_idle=10,
+            keepalives_interval=5,
+            keepalives_count=3,
+        )
+        self._conn.autocommit = True
+        with self._conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        self._broken = False
+
+    def _on_readable(self):
+        if self._broken:
+            return
+        try:
+            self._conn.poll()
+        except psycopg2.Error:
+            # Dead connection: _run reconnects and on_connect covers the gap
+            self._broken = True
+            self._wake.set()
+            return
+        while self._conn.notifies:
+            self.dispatch(self._conn.notifies.pop(0).payload)
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+        self._conn = None
@@ -0,0 +1,272 @@
+# Purpose: Per-statement timing, fingerprint stats and a slow-query log for all pooled SQL
+# Why: Handlers run several raw cur.execute calls each and nothing said which
+#      statements were slow, for which route, or why
+# How: database.py opens pooled connections with InstrumentedConnection, whose
+#      cursor() returns a timed subclass of whatever cursor class was asked for
+#      (plain, RealDictCursor, named), so handlers keep calling cur.execute as
+#      before. Each execute/executemany/copy_expert is timed and tagged with the
+#      request's route template (metrics.current_route) and a fingerprint: the
+#      SQL with literals (strings, numbers, TRUE/FALSE/NULL) and parameters
+#      replaced by ? and value lists collapsed, so execute_values batches of any
+#      size and any mix of values share one entry. Per-fingerprint
+#      totals are kept per worker (GET /metrics/queries) and timings feed
+#      /metrics. Statements over SLOW_QUERY_MS are logged; a sampled share of
+#      slow read-only statements is re-run once under EXPLAIN (ANALYZE, BUFFERS)
+#      inside a savepoint and the plan is logged and kept with the fingerprint
+
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+import psycopg2
+from psycopg2 import extensions as pg_extensions
+from metrics import DB_QUERY, DB_SLOW_QUERIES, current_route
+
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Fraction of slow read-only statements to EXPLAIN ANALYZE (0 disables; it re-runs the query)
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", 0))
+# At most one plan per fingerprint per this many seconds
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv("QUERY_STATS_MAX_FINGERPRINTS", 1000))
+# Longer statements are fingerprinted without the cache: execute_values/mogrify
+# render every value inline, so each one is unique and would only pin memory
+FINGERPRINT_CACHE_MAX_CHARS = int(os.getenv("FINGERPRINT_CACHE_MAX_CHARS", 2048))
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"(?:\b[Ee])?'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_KEYWORD_LITERAL_RE = re.compile(r"\b(?:TRUE|FALSE|NULL)\b", re.I)
+_SPACE_RE = re.compile(r"\s+")
+# One (?, ?::type, ...) tuple, then any number of further ones
+_ITEM = r"(?:-\s*)?\?(?:::\w+(?:\[\])?)?"
+_TUPLE = rf"\(\s*{_ITEM}(?:\s*,\s*{_ITEM})*\s*\)"
+_LIST_RE = re.compile(rf"{_TUPLE}(?:\s*,\s*{_TUPLE})*")
+_READ_ONLY_RE = re.compile(r"^(SELECT|WITH)\b", re.I)
+_SIDE_EFFECT_RE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE|pg_notify|nextval|setval)\b", re.I,
+)
+OVERFLOW_FINGERPRINT = "<other statements>"
+
+
+def fingerprint(sql) -> str:
+    """Normalized statement text: same shape, different values -> same fingerprint."""
+    if len(sql) <= FINGERPRINT_CACHE_MAX_CHARS:
+        return _cached_fingerprint(sql)
+    return _fingerprint(sql)
+
+
+@lru_cache(maxsize=2048)
+def _cached_fingerprint(sql) -> str:
+    # Parameterized templates repeat on every call, so short statements are cached
+    return _fingerprint(sql)
+
+
+def _fingerprint(sql) -> str:
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _KEYWORD_LITERAL_RE.sub("?", text)
+    text = _SPACE_RE.sub(" ", text).strip()
+    return _LIST_RE.sub("(...)", text)
+
+
+def fingerprint_id(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+class QueryStats:
+    """Thread-safe per-fingerprint counters for this worker."""
+
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, text: str, route: str, seconds: float, failed: bool, slow: bool):
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    text = OVERFLOW_FINGERPRINT
+                    entry = self._entries.get(text)
+                if entry is None:
+                    entry = self._entries[text] = {
+                        "calls": 0, "errors": 0, "slow": 0, "total": 0.0, "max": 0.0,
+                        "routes": {}, "plan": None, "explained_at": None,
+                    }
+            entry["calls"] += 1
+            entry["errors"] += failed
+            entry["slow"] += slow
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+
+    def claim_explain(self, text: str) -> bool:
+        """True if `text` may be explained now (rate limited per fingerprint)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is None:
+                return False
+            if entry["explained_at"] is not None and now - entry["explained_at"] < SLOW_QUERY_EXPLAIN_INTERVAL:
+                return False
+            entry["explained_at"] = now
+            return True
+
+    def store_plan(self, text: str, plan: str):
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is not None:
+                entry["plan"] = plan
+
+    def snapshot(self, sort: str = "total", limit: int = 50):
+        """Top `limit` fingerprints by total, mean or max time, or by calls."""
+        with self._lock:
+            rows = [
+                {
+                    "id": fingerprint_id(text),
+                    "fingerprint": text,
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "slow": entry["slow"],
+                    "totalMs": round(entry["total"] * 1000, 3),
+                    "meanMs": round(entry["total"] * 1000 / entry["calls"], 3),
+                    "maxMs": round(entry["max"] * 1000, 3),
+                    "routes": dict(entry["routes"]),
+                    "plan": entry["plan"],
+                }
+                for text, entry in self._entries.items()
+            ]
+        key = {"total": "totalMs", "mean": "meanMs", "max": "maxMs", "calls": "calls"}[sort]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+query_stats = QueryStats(QUERY_STATS_MAX_FINGERPRINTS)
+
+
+def _explain(conn, sql, params):
+    """EXPLAIN (ANALYZE, BUFFERS) on the caller's connection without touching its transaction."""
+    # A raw cursor, so the EXPLAIN itself is not timed or recorded
+    cur = pg_extensions.cursor(conn)
+    savepoint = not conn.autocommit
+    try:
+        if savepoint:
+            cur.execute("SAVEPOINT query_stats_explain")
+        try:
+            cur.execute(b"EXPLAIN (ANALYZE, BUFFERS) " + (sql if isinstance(sql, bytes) else sql.encode()), params)
+            plan = "\n".join(row[0] for row in cur.fetchall())
+        finally:
+            if savepoint:
+                cur.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                cur.execute("RELEASE SAVEPOINT query_stats_explain")
+        return plan
+    except psycopg2.Error as e:
+        print(f"⚠️ EXPLAIN of slow query failed: {e}")
+        return None
+    finally:
+        cur.close()
+
+
+def _record(cursor, sql, params, seconds, failed=False, explainable=True):
+    text = fingerprint(sql)
+    route = current_route()
+    slow = seconds * 1000 >= SLOW_QUERY_MS
+    query_stats.record(text, route, seconds, failed, slow)
+    DB_QUERY.labels(route).observe(seconds)
+    if not slow:
+        return
+    DB_SLOW_QUERIES.labels(route).inc()
+    print(f"🐢 Slow query {seconds * 1000:.1f} ms [{route}] {fingerprint_id(text)}: {text[:500]}")
+    if (
+        failed
+        or not explainable
+        or cursor.name is not None  # named cursors only DECLARE here; rows come later
+        or SLOW_QUERY_EXPLAIN_RATE <= 0
+        or random.random() >= SLOW_QUERY_EXPLAIN_RATE
+        or not _READ_ONLY_RE.match(text)
+        or _SIDE_EFFECT_RE.search(text)
+        or cursor.connection.get_transaction_status() not in (
+            pg_extensions.TRANSACTION_STATUS_IDLE, pg_extensions.TRANSACTION_STATUS_INTRANS,
+        )
+        or not query_stats.claim_explain(text)
+    ):
+        return
+    plan = _explain(cursor.connection, sql, params)
+    if plan is not None:
+        query_stats.store_plan(text, plan)
+        print(f"🔎 Plan for {fingerprint_id(text)}:\n{plan}")
+
+
+class TimedCursorMixin:
+    """Times execute/executemany/copy_expert of the cursor class it is mixed into."""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception:
+            _record(self, query, vars, time.perf_counter() - started, failed=True)
+            raise
+        _record(self, query, vars, time.perf_counter() - started)
+        return result
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        except Exception:
+            _record(self, query, None, time.perf_counter() - started, failed=True)
+            raise
+        # Not explainable: there is no single parameter set to replay
+        _record(self, query, None, time.perf_counter() - started, explainable=False)
+        return result
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            result = super().copy_expert(sql, file, size)
+        except Exception:
+            _record(self, sql, None, time.perf_counter() - started, failed=True)
+            raise
+        _record(self, sql, None, time.perf_counter() - started, explainable=False)
+        return result
+
+
+_timed_classes = {}
+_timed_classes_lock = threading.Lock()
+
+
+def timed_cursor_class(cursor_class):
+    """Subclass of `cursor_class` with TimedCursorMixin in front (cached)."""
+    timed = _timed_classes.get(cursor_class)
+    if timed is None:
+        with _timed_classes_lock:
+            timed = _timed_classes.get(cursor_class)
+            if timed is None:
+                timed = type(f"Timed{cursor_class.__name__}", (TimedCursorMixin, cursor_class), {})
+                _timed_classes[cursor_class] = timed
+    return timed
+
+
+class InstrumentedConnection(pg_extensions.connection):
+    """psycopg2 connection whose cursors time every statement (pass as connection_factory)."""
+
+    def cursor(self, *args, **kwargs):
+        cursor_class = kwargs.get("cursor_factory") or self.cursor_factory or pg_extensions.cursor
+        if not issubclass(cursor_class, TimedCursorMixin):
+            kwargs["cursor_factory"] = timed_cursor_class(cursor_class)
+        return super().cursor(*args, **kwargs)
@@ -0,0 +1,77 @@
+# Purpose: Due-date reminder engine
+# Why: One in-memory APScheduler job per task was lost on restart, grew without
+#      bound and fired a fixed minute after creation instead of near the due date
+# How: tasks.reminded_at marks reminders already sent. A periodic sweep walks a
+#      partial index of open, unreminded tasks whose due_date entered the reminder
+#      window (REMINDER_LEAD_HOURS), marks a batch as reminded and records
+#      notification events in the SAME statement, so memory stays constant no
+#      matter how many reminders are pending and a crash never double-sends.
+#      Delivery goes through notifications.py: events get the same per-user flush
+#      window as record_notification, so digest/off preferences apply.
+
+import os
+from database import pooled_connection
+from notifications import DELIVER_AFTER_SQL, window_params
+
+
+REMINDER_LEAD_HOURS = int(os.getenv("REMINDER_LEAD_HOURS", 24))
+REMINDER_SWEEP_INTERVAL = int(os.getenv("REMINDER_SWEEP_INTERVAL", 60))  # seconds
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", 1000))
+# Upper bound on work per sweep so one run never monopolises the scheduler
+REMINDER_MAX_BATCHES = int(os.getenv("REMINDER_MAX_BATCHES", 50))
+
+
+def sweep_due_reminders():
+    """Scheduler job: queue reminders for tasks entering their window. Returns count."""
+    total = 0
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        for _ in range(REMINDER_MAX_BATCHES):
+            cur.execute(
+                f"""
+                WITH due AS (
+                    SELECT id FROM tasks
+                    WHERE reminded_at IS NULL
+                      AND status <> 'completed'
+                      AND due_date IS NOT NULL
+                      AND due_date >= CURRENT_DATE
+                      AND due_date <= (CURRENT_TIMESTAMP + make_interval(hours => %(lead)s))::date
+                    ORDER BY due_date
+                    LIMIT %(batch)s
+                    FOR UPDATE SKIP LOCKED
+                ),
+                reminded AS (
+                    UPDATE tasks t SET reminded_at = CURRENT_TIMESTAMP
+                    FROM due
+                    WHERE t.id = due.id
+                    RETURNING t.user_id, t.title, t.description, t.due_date
+                ),
+                queued AS (
+                    -- Same flush window as record_notification: digest/off users are not
+                    -- pulled forward to immediate delivery by a reminder
+                    INSERT INTO notification_events (user_id, kind, payload, deliver_after)
+                    SELECT u.id, 'task_reminder',
+                           jsonb_build_object(
+                               'title', reminded.title,
+                               'description', COALESCE(reminded.description, ''),
+                               'due_date', reminded.due_date::text
+                           ),
+                           {DELIVER_AFTER_SQL}
+                    FROM reminded
+                    JOIN users u ON u.id = reminded.user_id
+                    RETURNING 1
+                )
+                SELECT (SELECT COUNT(*) FROM reminded) AS claimed,
+                       (SELECT COUNT(*) FROM queued) AS queued
+                """,
+                {"lead": REMINDER_LEAD_HOURS, "batch": REMINDER_BATCH_SIZE, **window_params()},
+            )
+            # Claimed rows decide whether another batch is due; rows without a
+            # user are claimed but queue nothing
+            claimed, queued = cur.fetchone()
+            conn.commit()
+            total += queued
+            if claimed < REMINDER_BATCH_SIZE:
+                break
+        cur.close()
+    return total
@@ -0,0 +1,107 @@
+# Purpose: Versioned schema management (Alembic) for the API database
+# Why: startup_event used to re-run every CREATE ... IF NOT EXISTS on each boot and
+#      never created the indexes from database.sql, so app-bootstrapped databases
+#      had none of them; cold starts paid for the DDL every time
+# How: The schema lives in alembic/versions (raw SQL, one revision per change).
+#      On startup main.py only compares alembic_version with the script head and
+#      refuses to serve an out-of-date schema; DB_AUTO_MIGRATE=true upgrades
+#      instead (handy for local dev and ephemeral hosts). The head is read from
+#      the revision files directly so a normal boot never imports Alembic or
+#      SQLAlchemy; both load only when migrating
+#
+# CLI:  python schema.py upgrade [REVISION]   # default: head
+#       python schema.py current | check | history
+
+import argparse
+import glob
+import os
+import re
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+VERSIONS_DIR = os.path.join(os.path.dirname(ALEMBIC_INI), "alembic", "versions")
+
+_REVISION_RE = re.compile(r'^revision = "(\w+)"', re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r'^down_revision = "(\w+)"', re.MULTILINE)
+
+
+class SchemaVersionError(Exception):
+    """Raised at startup when the database is not at the migration head."""
+
+
+def _alembic_config():
+    from alembic.config import Config
+    return Config(ALEMBIC_INI)
+
+
+def head_revision():
+    """Latest revision shipped with this code (the one no other revision builds on)."""
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(VERSIONS_DIR, "*.py")):
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        revisions.update(_REVISION_RE.findall(source))
+        parents.update(_DOWN_REVISION_RE.findall(source))
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise SchemaVersionError(f"Expected one migration head, found {sorted(heads) or 'none'}")
+    return heads.pop()
+
+
+def current_revision(conn):
+    """Revision recorded in the database, or None if it was never migrated."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version_num FROM alembic_version")
+        row = cur.fetchone()
+    except psycopg2.errors.UndefinedTable:
+        row = None
+    finally:
+        conn.rollback()
+        cur.close()
+    return row[0] if row else None
+
+
+def check_schema_version(conn):
+    """Startup check: one SELECT instead of re-running the DDL."""
+    current, head = current_revision(conn), head_revision()
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at {current or 'no revision'}, code expects {head}; "
+            "run `python schema.py upgrade` (or set DB_AUTO_MIGRATE=true)"
+        )
+    return current
+
+
+def upgrade_schema(revision="head"):
+    """Apply pending migrations (serialized across processes by alembic/env.py)."""
+    from alembic import command
+    command.upgrade(_alembic_config(), revision)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "check", "history"])
+    parser.add_argument("revision", nargs="?", default="head", help="target revision for upgrade")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if args.command == "upgrade":
+        upgrade_schema(args.revision)
+        print(f"✅ Schema upgraded to {args.revision}")
+    elif args.command == "history":
+        from alembic import command
+        command.history(_alembic_config())
+    else:
+        conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+        try:
+            current, head = current_revision(conn), head_revision()
+        finally:
+            conn.close()
+        print(f"Database: {current or 'no revision'} | Code head: {head}")
+        if args.command == "check" and current != head:
+            sys.exit(1)
@@ -0,0 +1,157 @@
+# Purpose: Refresh-token sessions and an in-memory revocation list
+# Why: 30-day access tokens could not be revoked, and checking a revocation table
+#      on every request would add a DB round trip to each authenticated call
+# How: Login creates an auth_sessions row holding the SHA-256 of an opaque refresh
+#      token; access tokens are short-lived and carry the session id (`sid`).
+#      Refreshing rotates the refresh token (single use). Logout sets revoked_at
+#      and NOTIFYs auth_session_revoked in the same transaction. Every worker runs
+#      a RevocationListener (pg_listener.PgListener) that LISTENs and re-reads
+#      the recent revocation window every REVOCATION_SYNC_INTERVAL as a safety net,
+#      so get_current_user only does a dict lookup. Only sessions revoked within
+#      one access-token lifetime are kept in memory; older tokens expire anyway
+
+import asyncio
+import hashlib
+import os
+import secrets
+import time
+from datetime import timedelta
+from fastapi.concurrency import run_in_threadpool
+from database import pooled_connection
+from pg_listener import PgListener
+
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", 30))  # seconds
+REVOCATION_CHANNEL = "auth_session_revoked"
+
+# session id -> time.time() when this process learned it was revoked
+_revoked = {}
+
+
+def _digest(refresh_token: str) -> bytes:
+    return hashlib.sha256(refresh_token.encode()).digest()
+
+
+CREATE_SESSION_SQL = """
+    INSERT INTO auth_sessions (user_id, refresh_token_hash, expires_at)
+    VALUES (%s, %s, CURRENT_TIMESTAMP + %s)
+    RETURNING id
+"""
+
+
+def create_session(cur, user_id: int):
+    """Start a session in the caller's transaction; returns (session_id, refresh_token)."""
+    refresh_token = secrets.token_urlsafe(32)
+    cur.execute(
+        CREATE_SESSION_SQL,
+        (user_id, _digest(refresh_token), timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)),
+    )
+    return cur.fetchone()[0], refresh_token
+
+
+def rotate_session(cur, refresh_token: str):
+    """Swap a live refresh token for a new one; returns (user_id, session_id, refresh_token) or None."""
+    new_token = secrets.token_urlsafe(32)
+    cur.execute(
+        """
+        UPDATE auth_sessions
+        SET refresh_token_hash = %s, last_used_at = CURRENT_TIMESTAMP
+        WHERE refresh_token_hash = %s
+          AND revoked_at IS NULL
+          AND expires_at > CURRENT_TIMESTAMP
+        RETURNING user_id, id
+        """,
+        (_digest(new_token), _digest(refresh_token)),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return row[0], row[1], new_token
+
+
+def revoke_sessions(cur, user_id: int, session_id: int = None):
+    """Revoke one session (or all of the user's) and notify every worker on commit."""
+    cur.execute(
+        f"""
+        WITH revoked AS (
+            UPDATE auth_sessions SET revoked_at = CURRENT_TIMESTAMP
+            WHERE user_id = %s AND revoked_at IS NULL {'' if session_id is None else 'AND id = %s'}
+            RETURNING id
+        )
+        SELECT id, pg_notify(%s, id::text) FROM revoked
+        """,
+        (user_id,) + (() if session_id is None else (session_id,)) + (REVOCATION_CHANNEL,),
+    )
+    session_ids = [row[0] for row in cur.fetchall()]
+    # This process stops accepting them right away, even before the NOTIFY arrives
+    now = time.time()
+    for revoked_id in session_ids:
+        _revoked[revoked_id] = now
+    return len(session_ids)
+
+
+def is_session_revoked(session_id) -> bool:
+    return session_id in _revoked
+
+
+def purge_expired_sessions():
+    """Scheduler job: drop sessions past their refresh-token expiry."""
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM auth_sessions WHERE expires_at < CURRENT_TIMESTAMP")
+        purged = cur.rowcount
+        conn.commit()
+        cur.close()
+    return purged
+
+
+class RevocationListener(PgListener):
+    """Keeps this process's revocation list current via LISTEN/NOTIFY plus periodic window reloads."""
+
+    channel = REVOCATION_CHANNEL
+    application_name = "taskflow-revocations"
+    label = "Revocation listener"
+
+    def __init__(self, retention_seconds: float):
+        super().__init__()
+        self._retention = retention_seconds
+
+    async def idle(self):
+        # Runs only once LISTEN is active, so nothing falls between the two;
+        # after a reconnect this reload also covers the gap
+        self._remember(await run_in_threadpool(self._load_window))
+        self._prune()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=REVOCATION_SYNC_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def dispatch(self, payload: str):
+        _revoked.setdefault(int(payload), time.time())
+
+    def _load_window(self):
+        with pooled_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT id FROM auth_sessions
+                WHERE revoked_at > CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """,
+                (self._retention,),
+            )
+            session_ids = [row[0] for row in cur.fetchall()]
+            conn.rollback()
+            cur.close()
+        return session_ids
+
+    def _remember(self, session_ids):
+        now = time.time()
+        for session_id in session_ids:
+            _revoked.setdefault(session_id, now)
+
+    def _prune(self):
+        cutoff = time.time() - self._retention
+        for session_id in [sid for sid, seen in _revoked.items() if seen < cutoff]:
+            del _revoked[session_id]
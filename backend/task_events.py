@@ -0,0 +1,119 @@
+# Purpose: Real-time per-user task change feed (Server-Sent Events)
+# Why: Dashboard refetched the whole task list after every mutation, and other
+#      tabs/devices never saw changes unless they polled
+# How: Task mutation endpoints call notify_task_change() inside their transaction;
+#      it issues pg_notify on TASK_EVENTS_CHANNEL, so events go out on commit and
+#      reach every API worker. Each worker runs one TaskEventHub (a
+#      pg_listener.PgListener, like sessions.RevocationListener) and fans
+#      events out to in-process subscribers keyed by user id. An idle SSE client
+#      costs one small bounded asyncio.Queue and no DB connection, so thousands
+#      fit in a worker. Payloads are "<user_id>:<json>" so the hub routes them
+#      without parsing JSON. Events too large for NOTIFY, multi-row writes and
+#      listener reconnects (possible gaps) become {"op": "resync"}: refetch once.
+
+import asyncio
+import os
+from collections import defaultdict
+import orjson
+from pg_listener import PgListener
+
+
+TASK_EVENTS_CHANNEL = "task_events"
+TASK_EVENTS_QUEUE_SIZE = int(os.getenv("TASK_EVENTS_QUEUE_SIZE", 100))
+TASK_EVENTS_HEARTBEAT = float(os.getenv("TASK_EVENTS_HEARTBEAT", 25))  # seconds
+TASK_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("TASK_EVENTS_MAX_SUBSCRIBERS", 10000))  # per worker
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_PAYLOAD = 7900
+
+RESYNC_EVENT = orjson.dumps({"op": "resync"})
+NOTIFY_SQL = "SELECT pg_notify(%s, %s)"
+
+
+class TooManySubscribersError(Exception):
+    """This worker already serves TASK_EVENTS_MAX_SUBSCRIBERS streams."""
+
+
+def notify_task_change(cur, user_id: int, op: str, task=None, task_id: int = None):
+    """Publish a change for the user's streams; delivered when the caller commits.
+
+    op: "created" / "updated" (with `task`), "deleted" (with `task_id`) or
+    "resync" for writes that touched many tasks at once.
+    """
+    if op == "deleted":
+        event = {"op": op, "id": task_id}
+    elif op == "resync":
+        event = {"op": op}
+    else:
+        event = {"op": op, "task": task}
+    payload = f"{user_id}:".encode() + orjson.dumps(event)
+    if len(payload) > MAX_NOTIFY_PAYLOAD:
+        payload = f"{user_id}:".encode() + RESYNC_EVENT
+    cur.execute(NOTIFY_SQL, (TASK_EVENTS_CHANNEL, payload.decode()))
+
+
+class TaskEventHub(PgListener):
+    """LISTENs for task changes and fans them out to this worker's subscribers."""
+
+    channel = TASK_EVENTS_CHANNEL
+    application_name = "taskflow-task-events"
+    label = "Task event listener"
+
+    def __init__(self):
+        super().__init__()
+        self._subscribers = defaultdict(set)  # user id -> {asyncio.Queue}
+        self._count = 0
+
+    async def stop(self):
+        await super().stop()
+        # End every open stream
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, None)
+
+    def is_full(self) -> bool:
+        return self._count >= TASK_EVENTS_MAX_SUBSCRIBERS
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        if self.is_full():
+            raise TooManySubscribersError(f"At most {TASK_EVENTS_MAX_SUBSCRIBERS} event streams per worker")
+        queue = asyncio.Queue(maxsize=TASK_EVENTS_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        self._count += 1
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._count -= 1
+        if not queues:
+            del self._subscribers[user_id]
+
+    def stats(self):
+        return {"subscribers": self._count, "users": len(self._subscribers), "listening": self.listening}
+
+    @staticmethod
+    def _put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog, it refetches instead
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT if event is not None else None)
+
+    def on_connect(self, reconnected: bool):
+        if reconnected:
+            # Events may have been missed while disconnected
+            for queues in self._subscribers.values():
+                for queue in queues:
+                    self._put(queue, RESYNC_EVENT)
+
+    def dispatch(self, payload: str):
+        user_id, _, event = payload.partition(":")
+        queues = self._subscribers.get(int(user_id))
+        if queues:
+            event = event.encode()
+            for queue in queues:
+                self._put(queue, event)
@@ -0,0 +1,278 @@
+# Purpose: Bulk task import (CSV / NDJSON) behind POST /api/tasks/import
+# Why: Migrating thousands of tasks through POST /api/tasks cost one request,
+#      one transaction and one notification per task
+# How: The request body is parsed incrementally as it arrives. Each valid row is
+#      written straight to a spooled buffer in COPY text format; invalid rows
+#      become {line, error} entries (the first IMPORT_MAX_ERRORS are kept). Only
+#      once the upload has been read is a pooled connection checked out, and the
+#      buffer is loaded with a single COPY tasks ... FROM STDIN. The task_stats
+#      INSERT trigger is statement-level (migration 0008), so counters move once
+#      per import, and main.py records one "bulk" notification instead of per-task
+#      emails. Reminders for imported tasks come from the regular reminder sweep.
+#
+# CSV needs a header row; names are case-insensitive and spaces count as
+# underscores, so both /api/tasks/export output and the old "Due Date" style
+# headers load. Unknown columns (id, created_at, ...) are ignored.
+#
+# validate_task / validate_task_update also check POST /api/tasks/bulk items, so
+# a bad value fails that item instead of the whole batch.
+
+import codecs
+import csv
+import os
+import tempfile
+from datetime import date, datetime
+import orjson
+
+
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", 100000))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+# COPY buffer kept in memory up to this size, then spilled to a temp file
+IMPORT_SPOOL_BYTES = int(os.getenv("IMPORT_SPOOL_BYTES", 8 * 1024 * 1024))
+# A single record (line, or quoted CSV record spanning lines) may not exceed this
+MAX_RECORD_CHARS = 1024 * 1024
+
+IMPORT_FORMATS = ("csv", "ndjson")
+TASK_PRIORITIES = ("low", "medium", "high")
+TASK_STATUSES = ("in_progress", "completed")
+MAX_TITLE_LENGTH = 255  # tasks.title VARCHAR(255)
+
+COPY_SQL = "COPY tasks (title, description, priority, status, due_date, user_id) FROM STDIN"
+
+
+class TaskImportError(Exception):
+    """The upload as a whole cannot be imported (bad format, header or size)."""
+
+
+def import_format_for(content_type):
+    """Guess the upload format from its Content-Type; None if it says nothing useful."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq"):
+        return "ndjson"
+    return None
+
+
+def _text(value, field):
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    value = value.strip()
+    if "\x00" in value:
+        raise ValueError(f"{field} contains a NUL character")
+    return value or None
+
+
+def _choice(value, field, choices, default):
+    value = _text(value, field)
+    if value is None:
+        return default
+    value = value.lower().replace(" ", "_")
+    if value not in choices:
+        raise ValueError(f"{field} must be one of {', '.join(choices)}")
+    return value
+
+
+def _due_date(value):
+    value = _text(value, "due_date")
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise ValueError("due_date must be an ISO date (YYYY-MM-DD)") from None
+
+
+def validate_task(fields):
+    """Normalize one imported record; returns the COPY column values or raises ValueError."""
+    title = _text(fields.get("title"), "title")
+    if title is None:
+        raise ValueError("title is required")
+    if len(title) > MAX_TITLE_LENGTH:
+        raise ValueError(f"title is longer than {MAX_TITLE_LENGTH} characters")
+    return (
+        title,
+        _text(fields.get("description"), "description"),
+        _choice(fields.get("priority"), "priority", TASK_PRIORITIES, "medium"),
+        _choice(fields.get("status"), "status", TASK_STATUSES, "in_progress"),
+        _due_date(fields.get("due_date")),
+    )
+
+
+def validate_task_update(fields):
+    """Normalize a partial update with PUT /api/tasks/{id} semantics; raises ValueError.
+
+    Returns only the keys to change: empty title/priority/status mean "keep",
+    description and due_date are changed whenever present (None clears them).
+    """
+    changes = {}
+    title = _text(fields.get("title"), "title")
+    if title is not None:
+        if len(title) > MAX_TITLE_LENGTH:
+            raise ValueError(f"title is longer than {MAX_TITLE_LENGTH} characters")
+        changes["title"] = title
+    for field, choices in (("priority", TASK_PRIORITIES), ("status", TASK_STATUSES)):
+        value = _choice(fields.get(field), field, choices, None)
+        if value is not None:
+            changes[field] = value
+    if "description" in fields:
+        changes["description"] = _text(fields["description"], "description")
+    if "due_date" in fields:
+        changes["due_date"] = _due_date(fields["due_date"])
+    return changes
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _header_name(name):
+    return name.strip().lower().replace(" ", "_")
+
+
+class TaskImportParser:
+    """Incremental CSV/NDJSON parser that validates rows into a COPY buffer.
+
+    feed() takes raw body chunks in any size, close() ends the upload. Both are
+    synchronous (main.py runs them in the threadpool); use as a context manager
+    so the spooled buffer is always released.
+    """
+
+    def __init__(self, import_format: str, user_id: int):
+        if import_format not in IMPORT_FORMATS:
+            raise TaskImportError(f"Unsupported import format: {import_format}")
+        self.format = import_format
+        self.imported = 0  # rows written to the COPY buffer
+        self.failed = 0
+        self.errors = []
+        self._user_id = user_id
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._line_no = 0
+        self._record = []
+        self._record_start = 0
+        self._record_chars = 0
+        self._quotes = 0
+        self._header = None
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES, mode="w+", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.buffer.close()
+
+    def feed(self, chunk: bytes):
+        try:
+            text = self._pending + self._decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise TaskImportError("Upload is not valid UTF-8") from None
+        lines = text.split("\n")
+        self._pending = lines.pop()
+        if len(self._pending) > MAX_RECORD_CHARS:
+            raise TaskImportError(f"Line {self._line_no + 1} is longer than {MAX_RECORD_CHARS} characters")
+        for line in lines:
+            self._line(line + "\n")
+
+    def close(self):
+        """Flush the last line; afterwards `buffer` is rewound and ready for COPY."""
+        try:
+            tail = self._pending + self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise TaskImportError("Upload is not valid UTF-8") from None
+        self._pending = ""
+        if tail:
+            self._line(tail)
+        if self._record:
+            self._error(self._record_start, "unterminated quoted field")
+            self._record = []
+        if self.format == "csv" and self._header is None:
+            raise TaskImportError("CSV upload is empty; a header row is required")
+        self.buffer.seek(0)
+
+    def _line(self, line):
+        self._line_no += 1
+        if self.format == "ndjson":
+            if not line.strip():
+                return
+            try:
+                data = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                self._error(self._line_no, "invalid JSON")
+                return
+            if not isinstance(data, dict):
+                self._error(self._line_no, "expected a JSON object")
+                return
+            self._row(self._line_no, data)
+            return
+
+        # CSV: a record ends at a newline outside quotes (even quote count so far)
+        if not self._record:
+            self._record_start = self._line_no
+            self._record_chars = 0
+        self._record.append(line)
+        self._record_chars += len(line)
+        self._quotes += line.count('"')
+        if self._quotes % 2:
+            if self._record_chars > MAX_RECORD_CHARS:
+                raise TaskImportError(f"Record at line {self._record_start} is longer than {MAX_RECORD_CHARS} characters")
+            return
+        record, self._record, self._quotes = "".join(self._record), [], 0
+        if not record.strip():
+            return
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            self._error(self._record_start, f"malformed CSV: {e}")
+            return
+        if self._header is None:
+            self._header = [_header_name(name) for name in values]
+            if "title" not in self._header:
+                raise TaskImportError("CSV header must include a title column")
+            return
+        if len(values) != len(self._header):
+            self._error(self._record_start, f"expected {len(self._header)} columns, got {len(values)}")
+            return
+        self._row(self._record_start, dict(zip(self._header, values)))
+
+    def _row(self, line_no, fields):
+        if self.imported + self.failed >= IMPORT_MAX_ROWS:
+            raise TaskImportError(f"At most {IMPORT_MAX_ROWS} rows per import")
+        try:
+            values = validate_task(fields)
+        except ValueError as e:
+            self._error(line_no, str(e))
+            return
+        self.buffer.write("\t".join(_copy_value(value) for value in values + (self._user_id,)) + "\n")
+        self.imported += 1
+
+    def _error(self, line_no, message):
+        if self.imported + self.failed >= IMPORT_MAX_ROWS:
+            raise TaskImportError(f"At most {IMPORT_MAX_ROWS} rows per import")
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+
+def copy_tasks(conn, parser: TaskImportParser):
+    """Load the parser's buffer into tasks in the caller's transaction; returns rows copied."""
+    cur = conn.cursor()
+    try:
+        cur.copy_expert(COPY_SQL, parser.buffer, size=64 * 1024)
+        return cur.rowcount
+    finally:
+        cur.close()
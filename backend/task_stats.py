@@ -0,0 +1,128 @@
+# Purpose: Per-user task counters backing GET /api/tasks/stats
+# Why: Dashboard/Analytics used to download every task just to count them;
+#      reading one counter row is O(1) regardless of how many tasks a user has
+# How: A row trigger on tasks applies +1/-1 deltas for every UPDATE/DELETE and a
+#      statement-level trigger adds one aggregated delta per INSERT/COPY (0008),
+#      so create/update/delete (and any future write path) keep counters exact;
+#      rebuild_task_stats() recomputes them from the tasks table when needed.
+#      The same trigger bumps `version`, which main.py turns into task-list ETags.
+#      Table + trigger are created by migration alembic/versions/0003_task_stats.py
+#
+# CLI:  python task_stats.py rebuild [--user-id ID]
+
+import argparse
+import os
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+
+def rebuild_task_stats(conn, user_id=None):
+    """Recompute counters from tasks (all users, or one). Commits; returns rows written."""
+    cur = conn.cursor()
+    # Block concurrent task writes so trigger deltas cannot interleave with the recount
+    cur.execute("LOCK TABLE tasks IN SHARE MODE")
+    # Upsert rather than delete so `version` keeps increasing across rebuilds
+    cur.execute(
+        f"""
+        INSERT INTO task_stats (user_id, total, completed, in_progress, high_priority,
+                                medium_priority, low_priority, completion_seconds_sum)
+        SELECT user_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'completed'),
+               COUNT(*) FILTER (WHERE status = 'in_progress'),
+               COUNT(*) FILTER (WHERE priority = 'high'),
+               COUNT(*) FILTER (WHERE priority = 'medium'),
+               COUNT(*) FILTER (WHERE priority = 'low'),
+               COALESCE(SUM(EXTRACT(EPOCH FROM (updated_at - created_at)))
+                        FILTER (WHERE status = 'completed'), 0)
+        FROM tasks
+        WHERE user_id IS NOT NULL {'' if user_id is None else 'AND user_id = %s'}
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total = EXCLUDED.total,
+            completed = EXCLUDED.completed,
+            in_progress = EXCLUDED.in_progress,
+            high_priority = EXCLUDED.high_priority,
+            medium_priority = EXCLUDED.medium_priority,
+            low_priority = EXCLUDED.low_priority,
+            completion_seconds_sum = EXCLUDED.completion_seconds_sum,
+            version = task_stats.version + 1
+        """,
+        () if user_id is None else (user_id,),
+    )
+    written = cur.rowcount
+    # Users whose tasks are all gone
+    cur.execute(
+        f"""
+        UPDATE task_stats SET
+            total = 0, completed = 0, in_progress = 0, high_priority = 0,
+            medium_priority = 0, low_priority = 0, completion_seconds_sum = 0,
+            version = version + 1
+        WHERE total <> 0 {'' if user_id is None else 'AND user_id = %s'}
+          AND NOT EXISTS (SELECT 1 FROM tasks WHERE tasks.user_id = task_stats.user_id)
+        """,
+        () if user_id is None else (user_id,),
+    )
+    written += cur.rowcount
+    conn.commit()
+    cur.close()
+    return written
+
+
+def fetch_task_version(conn, user_id):
+    """Cheap per-user task-list version (0 before the first task write)."""
+    cur = conn.cursor()
+    cur.execute("SELECT version FROM task_stats WHERE user_id = %s", (user_id,))
+    row = cur.fetchone()
+    cur.close()
+    return row[0] if row else 0
+
+
+def fetch_task_stats(conn, user_id):
+    """Return the aggregate payload for GET /api/tasks/stats."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT * FROM task_stats WHERE user_id = %s", (user_id,))
+    row = cur.fetchone() or {}
+    cur.execute(
+        """
+        SELECT COUNT(*) AS overdue
+        FROM tasks
+        WHERE user_id = %s AND status <> 'completed' AND due_date < CURRENT_DATE
+        """,
+        (user_id,),
+    )
+    overdue = cur.fetchone()["overdue"]
+    cur.close()
+
+    total = row.get("total", 0)
+    completed = row.get("completed", 0)
+    avg_seconds = row.get("completion_seconds_sum", 0) / completed if completed else 0
+    return {
+        "total": total,
+        "completed": completed,
+        "inProgress": row.get("in_progress", 0),
+        "overdue": overdue,
+        "byPriority": {
+            "high": row.get("high_priority", 0),
+            "medium": row.get("medium_priority", 0),
+            "low": row.get("low_priority", 0),
+        },
+        "avgCompletionDays": round(avg_seconds / 86400, 2),
+        "completionRate": round(completed / total * 100) if total else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain per-user task counters")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"), sslmode="prefer")
+    try:
+        written = rebuild_task_stats(conn, args.user_id)
+        print(f"✅ Rebuilt task stats for {written} user(s)")
+    finally:
+        conn.close()
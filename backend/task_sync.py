@@ -0,0 +1,136 @@
+# Purpose: Delta sync for GET /api/tasks/changes (mobile/offline clients)
+# Why: delete_task hard-deletes rows, so a client could not ask "what changed
+#      since my last sync" and had to refetch every task through GET /api/tasks
+# How: Every client-visible task write stamps tasks.change_xid with its
+#      transaction id and every delete leaves a tombstone (migration 0009). The
+#      cursor handed to clients is the xmin of the reading snapshot: every
+#      transaction below it has finished, so a sync from that cursor can never
+#      miss a write that committed late (a plain sequence could, since numbers
+#      are taken before commit). Rows from transactions at or above the cursor
+#      may be sent twice; clients apply changes as idempotent upserts/deletes.
+#      Both lookups are range scans on (user_id, change_xid), i.e. O(changes).
+#      Without `since`, with more than TASK_SYNC_MAX_CHANGES changes, or with a
+#      cursor older than the tombstone retention window, the response has
+#      `reset: true` and `changed` is the full list, replacing the client's copy.
+#
+# CLI:  python task_sync.py purge   # compact tombstones now (normally a scheduler job)
+
+import argparse
+import os
+import re
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+from database import pooled_connection
+
+
+TASK_SYNC_MAX_CHANGES = int(os.getenv("TASK_SYNC_MAX_CHANGES", 1000))
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", 30))
+
+SYNC_COLUMNS = "id, title, description, priority, status, due_date, created_at, updated_at, user_id"
+_CURSOR_RE = re.compile(r"\d{1,20}")
+MAX_XID8 = 2 ** 64 - 1
+
+
+class InvalidSyncCursor(ValueError):
+    """The `since` value is not a cursor issued by GET /api/tasks/changes."""
+
+
+def is_valid_sync_cursor(since: str) -> bool:
+    """True for a decimal xid8 (what pg_snapshot_xmin returns as text)."""
+    return _CURSOR_RE.fullmatch(since) is not None and int(since) <= MAX_XID8
+
+
+def _full_sync(cur, user_id, cursor):
+    cur.execute(
+        f"SELECT {SYNC_COLUMNS} FROM tasks WHERE user_id = %s ORDER BY created_at DESC, id DESC",
+        (user_id,),
+    )
+    return {"cursor": cursor, "reset": True, "changed": cur.fetchall(), "deleted": []}
+
+
+def fetch_changes(conn, user_id: int, since: str = None):
+    """Tasks changed and task ids deleted since `since` (all tasks when None).
+
+    Returns {"cursor", "reset", "changed", "deleted"}; reads in one snapshot.
+    With `reset`, `changed` holds every task and replaces the client's copy.
+    """
+    if since is not None and not is_valid_sync_cursor(since):
+        raise InvalidSyncCursor("since must be a cursor returned by /api/tasks/changes")
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # One snapshot for the watermark and both reads
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text AS cursor")
+        cursor = cur.fetchone()['cursor']
+
+        if since is not None:
+            cur.execute("SELECT %s::xid8 <= purged_xid AS expired FROM task_sync_horizon", (since,))
+            horizon = cur.fetchone()
+            if horizon and horizon['expired']:
+                since = None
+        if since is None:
+            return _full_sync(cur, user_id, cursor)
+
+        cur.execute(
+            f"""
+            SELECT {SYNC_COLUMNS} FROM tasks
+            WHERE user_id = %s AND change_xid >= %s::xid8
+            ORDER BY change_xid, id
+            LIMIT %s
+            """,
+            (user_id, since, TASK_SYNC_MAX_CHANGES + 1),
+        )
+        changed = cur.fetchall()
+        cur.execute(
+            """
+            SELECT task_id FROM task_tombstones
+            WHERE user_id = %s AND change_xid >= %s::xid8
+            LIMIT %s
+            """,
+            (user_id, since, TASK_SYNC_MAX_CHANGES + 1),
+        )
+        deleted = [row['task_id'] for row in cur.fetchall()]
+        if len(changed) + len(deleted) > TASK_SYNC_MAX_CHANGES:
+            # A delta this large costs as much as the full list
+            return _full_sync(cur, user_id, cursor)
+        return {"cursor": cursor, "reset": False, "changed": changed, "deleted": deleted}
+    finally:
+        conn.rollback()
+        cur.close()
+
+
+def purge_task_tombstones():
+    """Scheduler job: drop tombstones past retention and advance the sync horizon."""
+    with pooled_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            WITH purged AS (
+                DELETE FROM task_tombstones
+                WHERE deleted_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+                RETURNING change_xid
+            ),
+            newest AS (
+                SELECT change_xid FROM purged ORDER BY change_xid DESC LIMIT 1
+            )
+            UPDATE task_sync_horizon h
+            SET purged_xid = GREATEST(h.purged_xid, newest.change_xid)
+            FROM newest
+            RETURNING (SELECT COUNT(*) FROM purged)
+            """,
+            (TASK_TOMBSTONE_RETENTION_DAYS,),
+        )
+        row = cur.fetchone()
+        conn.commit()
+        cur.close()
+    return row[0] if row else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Task delta-sync maintenance")
+    parser.add_argument("command", choices=["purge"])
+    args = parser.parse_args()
+
+    load_dotenv()
+    purged = purge_task_tombstones()
+    print(f"✅ Purged {purged} tombstones older than {TASK_TOMBSTONE_RETENTION_DAYS} days")
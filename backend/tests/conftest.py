@@ -0,0 +1,7 @@
+# Unit tests for the pure helpers (no database needed). Run from backend/:
+#     pip install -r requirements.txt -r tests/requirements.txt
+#     python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
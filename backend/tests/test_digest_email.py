@@ -0,0 +1,9 @@
+from email_service import render_digest_email
+
+
+def test_digest_items_are_html_escaped():
+    subject, body = render_digest_email([("🚀 Created", ['<img src=x onerror="alert(1)">', "Fish & chips"])])
+    assert "<img" not in body
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in body
+    assert "Fish &amp; chips" in body
+    assert subject == "📬 TaskFlow Pro digest: 2 updates"
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import main
+
+
+def _request(authorization=None):
+    headers = [] if authorization is None else [(b"authorization", authorization.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+def test_query_metrics_hidden_without_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    with pytest.raises(HTTPException) as excinfo:
+        main.require_metrics_token(_request())
+    assert excinfo.value.status_code == 404
+
+
+def test_query_metrics_require_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as excinfo:
+        main.require_metrics_token(_request("Bearer wrong"))
+    assert excinfo.value.status_code == 401
+    main.require_metrics_token(_request("Bearer s3cret"))
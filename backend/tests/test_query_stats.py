@@ -0,0 +1,43 @@
+from query_stats import FINGERPRINT_CACHE_MAX_CHARS, _cached_fingerprint, fingerprint
+
+
+def test_parameters_and_literals_are_normalized():
+    assert fingerprint("SELECT * FROM tasks WHERE user_id = %s AND id = 42 -- trailing") == \
+        "SELECT * FROM tasks WHERE user_id = ? AND id = ?"
+    assert fingerprint("SELECT 1 FROM users WHERE email = 'a''b@example.com' AND name = E'x\\\\y'") == \
+        "SELECT ? FROM users WHERE email = ? AND name = ?"
+    assert fingerprint("SELECT * FROM t WHERE a = %(a)s AND flag IS NULL AND done = false") == \
+        "SELECT * FROM t WHERE a = ? AND flag IS ? AND done = ?"
+
+
+def test_whitespace_and_bytes_do_not_matter():
+    assert fingerprint(b"SELECT  id\n  FROM tasks\tWHERE id = %s") == fingerprint("SELECT id FROM tasks WHERE id = %s")
+
+
+def test_execute_values_batches_share_one_fingerprint():
+    # As psycopg2's execute_values renders them: different sizes and TRUE/FALSE/NULL mixes
+    template = "UPDATE tasks AS t SET status = v.status FROM (VALUES {}) AS v(id, done, title) WHERE t.id = v.id"
+    small = template.format("(1::int, true, 'a'::varchar)")
+    large = template.format(
+        "(2::int, false, NULL::varchar), (3::int, TRUE, 'it''s'::varchar),(-4::int, null, E'x\\\\n'::varchar)"
+    )
+    assert fingerprint(small) == fingerprint(large)
+    assert "(...)" in fingerprint(small)
+
+
+def test_value_lists_and_cursor_tuples_collapse():
+    assert fingerprint("SELECT 1 FROM t WHERE (created_at, id) < (%s, %s) AND id IN (1, 2, 3)") == \
+        "SELECT ? FROM t WHERE (created_at, id) < (...) AND id IN (...)"
+
+
+def test_different_statements_stay_distinct():
+    assert fingerprint("SELECT id FROM tasks WHERE user_id = %s") != fingerprint("SELECT id FROM users WHERE id = %s")
+
+
+def test_long_rendered_statements_bypass_the_cache():
+    _cached_fingerprint.cache_clear()
+    fingerprint("SELECT * FROM tasks WHERE id = %s")
+    long_batch = "INSERT INTO tasks (title) VALUES " + ", ".join(f"('task {i}')" for i in range(500))
+    assert len(long_batch) > FINGERPRINT_CACHE_MAX_CHARS
+    assert fingerprint(long_batch) == "INSERT INTO tasks (title) VALUES (...)"
+    assert _cached_fingerprint.cache_info().currsize == 1
@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from auth import _redeem_stream_ticket, create_access_token, create_stream_ticket, get_current_user
+
+
+def test_stream_ticket_is_accepted_once():
+    ticket = create_stream_ticket(7, "session-a")
+    assert _redeem_stream_ticket(ticket) == {"id": 7, "sid": "session-a"}
+    assert _redeem_stream_ticket(ticket) is None
+
+
+def test_stream_ticket_is_not_an_access_token():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_current_user(create_stream_ticket(7, "session-b")))
+    assert excinfo.value.status_code == 401
+
+
+def test_access_token_is_not_a_stream_ticket():
+    assert _redeem_stream_ticket(create_access_token({"user_id": 7, "sid": "session-c"})) is None
+    assert _redeem_stream_ticket("garbage") is None
@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from main import decode_task_cursor, encode_task_cursor
+
+
+def test_keyset_cursor_round_trips():
+    created_at = datetime(2024, 3, 1, 12, 30, 45, 123456)
+    cursor = encode_task_cursor(created_at, 987654321)
+    assert decode_task_cursor(cursor) == (created_at, 987654321)
+
+
+def test_keyset_cursor_is_url_safe_without_padding():
+    cursor = encode_task_cursor(datetime(2024, 1, 1), 1)
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+def _raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "!!!",
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    _raw_cursor(5),
+    _raw_cursor(["2024-01-01T00:00:00", 1, 2]),
+    _raw_cursor(["yesterday", 1]),
+    _raw_cursor([None, 1]),
+    _raw_cursor(["2024-01-01T00:00:00", [1]]),
+])
+def test_keyset_cursor_rejects_garbage_with_400(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_task_cursor(cursor)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,35 @@
+import csv
+import io
+from datetime import date, datetime
+
+import orjson
+
+from main import EXPORT_COLUMNS, _export_batch
+
+
+ROW = (1, 'Say "hi", then\nleave', None, "high", "completed", date(2024, 5, 1), datetime(2024, 4, 1, 9, 30), None)
+
+
+def test_csv_batch_quotes_fields_and_keeps_row_order():
+    body = _export_batch([EXPORT_COLUMNS, ROW], "csv").decode()
+    header, row = csv.reader(io.StringIO(body))
+    assert tuple(header) == EXPORT_COLUMNS
+    assert row == ["1", 'Say "hi", then\nleave', "", "high", "completed", "2024-05-01", "2024-04-01 09:30:00", ""]
+
+
+def test_ndjson_batch_is_one_object_per_line():
+    body = _export_batch([ROW, ROW], "ndjson")
+    lines = body.split(b"\n")
+    assert lines[-1] == b""
+    record = orjson.loads(lines[0])
+    assert list(record) == list(EXPORT_COLUMNS)
+    assert record["title"] == 'Say "hi", then\nleave'
+    assert record["due_date"] == "2024-05-01"
+    assert record["created_at"] == "2024-04-01T09:30:00"
+    assert record["updated_at"] is None
+    assert lines[1] == lines[0]
+
+
+def test_empty_batch_encodes_to_nothing():
+    assert _export_batch([], "csv") == b""
+    assert _export_batch([], "ndjson") == b""
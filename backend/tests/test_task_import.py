@@ -0,0 +1,40 @@
+from datetime import date
+
+import pytest
+
+from task_import import validate_task, validate_task_update
+
+
+def test_validate_task_normalizes_and_defaults():
+    assert validate_task({"title": "  Pay rent ", "priority": "High", "due_date": "2024-05-01T09:00:00"}) == \
+        ("Pay rent", None, "high", "in_progress", date(2024, 5, 1))
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"title": ""}, "title is required"),
+    ({"title": "x", "due_date": "2024-13-45"}, "due_date"),
+    ({"title": "x", "status": "done"}, "status must be one of"),
+    ({"title": "x" * 256}, "longer than"),
+])
+def test_validate_task_rejects_bad_values(fields, error):
+    with pytest.raises(ValueError, match=error):
+        validate_task(fields)
+
+
+def test_validate_task_update_keeps_only_changed_keys():
+    assert validate_task_update({}) == {}
+    # Empty title/priority/status mean "keep"; description/due_date None clears
+    assert validate_task_update({"title": "", "status": None, "description": None, "due_date": None}) == \
+        {"description": None, "due_date": None}
+    assert validate_task_update({"status": "Completed", "due_date": "2024-02-29"}) == \
+        {"status": "completed", "due_date": date(2024, 2, 29)}
+
+
+@pytest.mark.parametrize("fields", [
+    {"due_date": "2024-13-45"},
+    {"priority": "urgent"},
+    {"title": "x" * 256},
+])
+def test_validate_task_update_rejects_bad_values(fields):
+    with pytest.raises(ValueError):
+        validate_task_update(fields)
@@ -0,0 +1,92 @@
+import pytest
+
+from task_import import TaskImportError, TaskImportParser
+
+
+def parse(import_format, body, chunk_size=None):
+    """Feed `body` in `chunk_size`-byte pieces; returns (parser counters, COPY lines)."""
+    data = body.encode() if isinstance(body, str) else body
+    with TaskImportParser(import_format, user_id=7) as parser:
+        step = chunk_size or len(data) or 1
+        for start in range(0, len(data), step):
+            parser.feed(data[start:start + step])
+        parser.close()
+        rows = parser.buffer.read().splitlines()
+    return parser, rows
+
+
+CSV_BODY = (
+    "\ufeffTitle,Description,Priority,Status,Due Date\n"
+    'Pay rent,"line one\nline two, with comma",high,,2024-05-01\n'
+    "Tab\there,,,completed,\n"
+    "Bad date,,low,,2024-13-45\n"
+    ",,,,\n"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7])
+def test_csv_rows_are_validated_and_escaped_for_copy(chunk_size):
+    parser, rows = parse("csv", CSV_BODY, chunk_size)
+    assert rows == [
+        "Pay rent\tline one\\nline two, with comma\thigh\tin_progress\t2024-05-01\t7",
+        "Tab\\there\t\\N\tmedium\tcompleted\t\\N\t7",
+    ]
+    assert (parser.imported, parser.failed) == (2, 2)
+    # Errors point at the first line of each record (the quoted field spans lines 2-3)
+    assert [error["line"] for error in parser.errors] == [5, 6]
+    assert "due_date" in parser.errors[0]["error"]
+    assert "title is required" in parser.errors[1]["error"]
+
+
+def test_csv_structural_errors_are_reported_per_record():
+    body = 'title,priority\nok,low\ntoo,many,columns\n"never closed,low\n'
+    parser, rows = parse("csv", body)
+    assert rows == ["ok\t\\N\tlow\tin_progress\t\\N\t7"]
+    assert parser.errors == [
+        {"line": 3, "error": "expected 2 columns, got 3"},
+        {"line": 4, "error": "unterminated quoted field"},
+    ]
+
+
+@pytest.mark.parametrize("body, message", [
+    ("", "header row is required"),
+    ("name,priority\nx,low\n", "must include a title column"),
+])
+def test_csv_without_usable_header_fails_the_upload(body, message):
+    with pytest.raises(TaskImportError, match=message):
+        parse("csv", body)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 3])
+def test_ndjson_rows_and_errors(chunk_size):
+    body = (
+        '{"title": "Write report", "priority": "HIGH", "due_date": "2024-02-29"}\n'
+        "\n"
+        "{not json}\n"
+        '["a list"]\n'
+        '{"title": "No newline at end", "status": "completed"}'
+    )
+    parser, rows = parse("ndjson", body, chunk_size)
+    assert rows == [
+        "Write report\t\\N\thigh\tin_progress\t2024-02-29\t7",
+        "No newline at end\t\\N\tmedium\tcompleted\t\\N\t7",
+    ]
+    assert parser.errors == [
+        {"line": 3, "error": "invalid JSON"},
+        {"line": 4, "error": "expected a JSON object"},
+    ]
+
+
+def test_multibyte_characters_split_across_chunks():
+    parser, rows = parse("ndjson", '{"title": "Café ☕"}\n', chunk_size=1)
+    assert rows == ["Café ☕\t\\N\tmedium\tin_progress\t\\N\t7"]
+
+
+def test_invalid_utf8_fails_the_upload():
+    with pytest.raises(TaskImportError, match="not valid UTF-8"):
+        parse("ndjson", b'{"title": "\xff"}\n')
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(TaskImportError, match="Unsupported import format"):
+        TaskImportParser("xml", user_id=7)
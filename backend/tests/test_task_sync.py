@@ -0,0 +1,29 @@
+import pytest
+
+from task_sync import MAX_XID8, InvalidSyncCursor, fetch_changes, is_valid_sync_cursor
+
+
+@pytest.mark.parametrize("since", ["0", "1", "748213", str(MAX_XID8)])
+def test_sync_cursor_accepts_xid8_values(since):
+    assert is_valid_sync_cursor(since)
+
+
+@pytest.mark.parametrize("since", [
+    "",
+    "-1",
+    "12a",
+    "1.5",
+    " 12",
+    "12\n",
+    "1 OR 1=1",
+    str(MAX_XID8 + 1),
+    "9" * 21,
+])
+def test_sync_cursor_rejects_anything_else(since):
+    assert not is_valid_sync_cursor(since)
+
+
+def test_fetch_changes_rejects_bad_cursor_before_touching_the_database():
+    # conn=None: validation must fail before any query is attempted
+    with pytest.raises(InvalidSyncCursor):
+        fetch_changes(None, 1, "12\n")
@@ -7,7 +7,9 @@
 -- Step 2: Connect to the database
 -- \c taskflow
 
--- Step 3: Create tables (or let the backend auto-create them on startup)
+-- Step 3: Create tables. The versioned migrations in backend/alembic/versions are the
+-- source of truth: prefer `cd backend && python schema.py upgrade`. This file mirrors
+-- the core tables for manual setup; run the migration CLI afterwards either way.
 
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
@@ -18,6 +20,9 @@ CREATE TABLE IF NOT EXISTS users (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Bumped on profile changes; drives /api/auth/me ETags
+ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_version INTEGER NOT NULL DEFAULT 0;
+
 -- Tasks table
 CREATE TABLE IF NOT EXISTS tasks (
     id SERIAL PRIMARY KEY,
@@ -37,6 +42,25 @@ CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
 CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
 
+-- Composite indexes for keyset pagination + filters on GET /api/tasks
+CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_status_created ON tasks(user_id, status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_created ON tasks(user_id, priority, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due_date ON tasks(user_id, due_date);
+
+-- Full-text + typo-tolerant search (GET /api/tasks/search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_tasks_search_vector ON tasks USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_tasks_title_trgm ON tasks USING GIN (title gin_trgm_ops);
+
+-- Per-user counters (task_stats + trigger), email_outbox, notification tables and
+-- tasks.reminded_at are created by migrations 0003-0006 in backend/alembic/versions.
+
 -- Sample demo user (optional)
 -- Password: demo123
 INSERT INTO users (email, hashed_password, full_name) 
@@ -87,6 +111,6 @@ SELECT
 FROM users WHERE email = 'demo@taskflow.com'
 ON CONFLICT DO NOTHING;
 
--- Note: The backend will automatically create these tables on startup
--- if they don't exist, so you don't need to run this SQL manually
--- unless you want to pre-create the schema or add sample data.
+-- Note: The backend no longer creates tables on startup; it checks the schema
+-- revision and asks you to run `python schema.py upgrade`. You only need this
+-- file for the optional sample data.
@@ -11,6 +11,7 @@ import Settings from './components/Settings';
 import Login from './components/Login';
 import Signup from './components/Signup';
 import Navbar from './components/Navbar';
+import api from './services/api';
 
 function App() {
   // Tracks whether the user has a JWT token present
@@ -71,9 +72,13 @@ function App() {
     setIsAuthenticated(true);
   };
 
-  // Clear auth artifacts and return user to login flow
+  // Revoke the server session (best effort), clear auth artifacts and return user to login flow
   const handleLogout = () => {
+    // Header captured now: the request interceptor runs after storage is cleared below
+    const token = localStorage.getItem('token');
+    api.post('/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } }).catch(() => {});
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     setIsAuthenticated(false);
   };
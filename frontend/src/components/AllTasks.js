@@ -1,6 +1,8 @@
 // Purpose: Task management page with search, filter, CRUD, and status toggling
 // Why: Enables users to create, view, update, and delete tasks beyond dashboard
-// How: Fetches via API client; local search/filter; modal form for create/edit
+// How: Fetches keyset pages via API client (status/priority filtered on the server,
+//      "Load more" follows X-Next-Cursor); the search box queries /tasks/search
+//      (debounced, server-escaped <mark> highlights); modal form for create/edit
 import { useState, useEffect, useCallback } from 'react';
 import { useTranslation } from 'react-i18next';
 import {
@@ -15,6 +17,12 @@ import {
 } from 'lucide-react';
 import api from '../services/api';
 
+// Tasks per GET /tasks page and per /tasks/search page
+const PAGE_SIZE = 50;
+const SEARCH_PAGE_SIZE = 20;
+// Wait for typing to pause before querying the server
+const SEARCH_DEBOUNCE_MS = 300;
+
 const AllTasks = () => {
   const { t } = useTranslation();
   // Raw tasks from API and derived filtered list
@@ -22,7 +30,13 @@ const AllTasks = () => {
   const [filteredTasks, setFilteredTasks] = useState([]);
   // UI state: loading indicator, search/filter controls, modal/selection
   const [loading, setLoading] = useState(true);
+  // Cursor for the next page (null on the last page)
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
+  // Ranked matches for the search box (null when not searching)
+  const [searchResults, setSearchResults] = useState(null);
+  const [searchNextOffset, setSearchNextOffset] = useState(null);
   const [statusFilter, setStatusFilter] = useState('all');
   const [priorityFilter] = useState('all');
   const [showAddModal, setShowAddModal] = useState(false);
@@ -36,41 +50,90 @@ const AllTasks = () => {
     status: 'in_progress'
   });
 
-  // Load tasks for current user from backend
+  // One page of tasks for the current filters, newest first
+  const fetchPage = useCallback(async (cursor) => {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    if (statusFilter !== 'all') params.status = statusFilter;
+    if (priorityFilter !== 'all') params.priority = priorityFilter;
+    const response = await api.get('/tasks', { params });
+    setNextCursor(response.headers['x-next-cursor'] || null);
+    return response.data;
+  }, [statusFilter, priorityFilter]);
+
+  // Load the first page for current user from backend
   const fetchTasks = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await api.get('/tasks');
-      setTasks(response.data);
+      setTasks(await fetchPage(null));
     } catch (error) {
       console.error('Error fetching tasks:', error);
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [fetchPage]);
+
+  // Append the following page
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage(nextCursor);
+      setTasks(prev => [...prev, ...page]);
+    } catch (error) {
+      console.error('Error fetching tasks:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-  // Fetch on mount
+  // Fetch on mount and whenever the server-side filters change
   useEffect(() => {
     fetchTasks();
   }, [fetchTasks]);
 
-  // Compute visible tasks based on search/filters
-  const filterTasks = useCallback(() => {
-    let filtered = [...tasks];
-    if (searchTerm) {
-      filtered = filtered.filter(task =>
-        task.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        (task.description && task.description.toLowerCase().includes(searchTerm.toLowerCase()))
-      );
+  // One page of ranked search results; offset 0 replaces, later pages append
+  const searchTasks = useCallback(async (query, offset) => {
+    try {
+      const response = await api.get('/tasks/search', {
+        params: { q: query, limit: SEARCH_PAGE_SIZE, offset }
+      });
+      setSearchResults(prev => (offset && prev ? [...prev, ...response.data.results] : response.data.results));
+      setSearchNextOffset(response.data.nextOffset);
+    } catch (error) {
+      console.error('Error searching tasks:', error);
     }
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter(task => task.status === statusFilter);
+  }, []);
+
+  // Search on the server once typing pauses; clearing the box shows the task pages again
+  useEffect(() => {
+    const query = searchTerm.trim();
+    if (!query) {
+      setSearchResults(null);
+      setSearchNextOffset(null);
+      return undefined;
     }
-    if (priorityFilter !== 'all') {
-      filtered = filtered.filter(task => task.priority === priorityFilter);
+    const timer = setTimeout(() => searchTasks(query, 0), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm, searchTasks]);
+
+  // Refetch the list (and the current search) after a mutation
+  const refreshTasks = () => {
+    fetchTasks();
+    const query = searchTerm.trim();
+    if (query) searchTasks(query, 0);
+  };
+
+  // Compute visible tasks: search results (status filtered locally) or the loaded pages
+  const filterTasks = useCallback(() => {
+    if (searchResults === null) {
+      setFilteredTasks(tasks);
+      return;
     }
-    setFilteredTasks(filtered);
-  }, [tasks, searchTerm, statusFilter, priorityFilter]);
+    setFilteredTasks(statusFilter === 'all'
+      ? searchResults
+      : searchResults.filter(task => task.status === statusFilter));
+  }, [tasks, searchResults, statusFilter]);
 
   // Re-run filtering when dependencies change
   useEffect(() => {
@@ -87,7 +150,7 @@ const AllTasks = () => {
         await api.post('/tasks', taskForm);
       }
       closeModal();
-      fetchTasks();
+      refreshTasks();
     } catch (error) {
       console.error('Error saving task:', error);
     }
@@ -111,7 +174,7 @@ const AllTasks = () => {
     if (window.confirm('Are you sure?')) {
       try {
         await api.delete(`/tasks/${taskId}`);
-        fetchTasks();
+        refreshTasks();
       } catch (error) {
         console.error('Error deleting task:', error);
       }
@@ -123,7 +186,7 @@ const AllTasks = () => {
     try {
       const newStatus = task.status === 'completed' ? 'in_progress' : 'completed';
       await api.put(`/tasks/${task.id}`, { ...task, status: newStatus });
-      fetchTasks();
+      refreshTasks();
     } catch (error) {
       console.error('Error updating task:', error);
     }
@@ -223,9 +286,17 @@ const AllTasks = () => {
 
               <div className="flex-1 min-w-0">
                 <div className="flex items-center gap-2 mb-1">
-                  <h4 className={`text-lg font-bold truncate ${task.status === 'completed' ? 'line-through text-[var(--text-muted)]' : ''}`}>
-                    {task.title}
-                  </h4>
+                  {/* Highlights are HTML-escaped by the server; only <mark> is markup */}
+                  {task.title_highlight ? (
+                    <h4
+                      className={`text-lg font-bold truncate ${task.status === 'completed' ? 'line-through text-[var(--text-muted)]' : ''}`}
+                      dangerouslySetInnerHTML={{ __html: task.title_highlight }}
+                    />
+                  ) : (
+                    <h4 className={`text-lg font-bold truncate ${task.status === 'completed' ? 'line-through text-[var(--text-muted)]' : ''}`}>
+                      {task.title}
+                    </h4>
+                  )}
                   <span className={`px-2 py-0.5 rounded-md text-[10px] font-black uppercase tracking-tighter ${task.priority === 'high' ? 'bg-red-500/10 text-red-500' :
                     task.priority === 'medium' ? 'bg-amber-500/10 text-amber-500' :
                       'bg-emerald-500/10 text-emerald-500'
@@ -233,7 +304,12 @@ const AllTasks = () => {
                     {task.priority}
                   </span>
                 </div>
-                {task.description && (
+                {task.description_highlight ? (
+                  <p
+                    className="text-sm text-[var(--text-muted)] line-clamp-1 mb-2"
+                    dangerouslySetInnerHTML={{ __html: task.description_highlight }}
+                  />
+                ) : task.description && (
                   <p className="text-sm text-[var(--text-muted)] line-clamp-1 mb-2">
                     {task.description}
                   </p>
@@ -271,6 +347,23 @@ const AllTasks = () => {
             </div>
           ))
         )}
+        {!loading && searchResults !== null && searchNextOffset !== null && (
+          <button
+            onClick={() => searchTasks(searchTerm.trim(), searchNextOffset)}
+            className="w-full p-4 border border-dashed border-[var(--border-color)] rounded-2xl font-bold text-cyan-500 hover:bg-cyan-500/10 transition-colors"
+          >
+            More results
+          </button>
+        )}
+        {!loading && searchResults === null && nextCursor && (
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="w-full p-4 border border-dashed border-[var(--border-color)] rounded-2xl font-bold text-cyan-500 hover:bg-cyan-500/10 transition-colors disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
 
       {showAddModal && (
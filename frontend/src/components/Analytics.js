@@ -1,6 +1,6 @@
 // Purpose: Visualize productivity metrics with charts based on user's tasks
 // Why: Gives users insight into activity trends and distribution by priority
-// How: Fetches tasks, computes aggregates, renders charts via chart.js wrapper
+// How: Fetches server-side aggregates, renders charts via chart.js wrapper
 import React, { useState, useEffect, useCallback } from 'react';
 import { useTranslation } from 'react-i18next';
 import {
@@ -38,8 +38,8 @@ ChartJS.register(
 
 const Analytics = () => {
   const { t, i18n } = useTranslation();
-  // Raw tasks and computed statistics for summary cards
-  const [tasks, setTasks] = useState([]);
+  // Server-side aggregates (GET /tasks/stats) for summary cards and priority chart
+  const [priorityCounts, setPriorityCounts] = useState({ high: 0, medium: 0, low: 0 });
   const [stats, setStats] = useState({
     totalCreated: 0,
     totalCompleted: 0,
@@ -47,31 +47,22 @@ const Analytics = () => {
     avgCompletionTime: 0
   });
 
-  // Summarize totals and completion rate based on current tasks
-  const calculateStats = useCallback((taskData) => {
-    const totalCreated = taskData.length;
-    const totalCompleted = taskData.filter(t => t.status === 'completed').length;
-    const completionRate = totalCreated > 0 ? Math.round((totalCompleted / totalCreated) * 100) : 0;
-
-    setStats({
-      totalCreated,
-      totalCompleted,
-      completionRate,
-      avgCompletionTime: 0
-    });
-  }, []);
-
-  // Load tasks for analytics on mount
+  // Load aggregates on mount; no need to download every task to count them
   const fetchAnalytics = useCallback(async () => {
     try {
-      const response = await api.get('/tasks');
-      const taskData = response.data;
-      setTasks(taskData);
-      calculateStats(taskData);
+      const response = await api.get('/tasks/stats');
+      const data = response.data;
+      setPriorityCounts(data.byPriority);
+      setStats({
+        totalCreated: data.total,
+        totalCompleted: data.completed,
+        completionRate: data.completionRate,
+        avgCompletionTime: data.avgCompletionDays
+      });
     } catch (error) {
       console.error('Error fetching analytics:', error);
     }
-  }, [calculateStats]);
+  }, []);
 
   useEffect(() => {
     fetchAnalytics();
@@ -94,7 +85,7 @@ const Analytics = () => {
   useEffect(() => {
     const observer = new MutationObserver(() => {
       // Force re-render when theme changes
-      setTasks(prev => [...prev]);
+      setPriorityCounts(prev => ({ ...prev }));
     });
     observer.observe(document.documentElement, { attributes: true, attributeFilter: ['class'] });
     return () => observer.disconnect();
@@ -145,9 +136,9 @@ const Analytics = () => {
     datasets: [
       {
         data: [
-          tasks.filter(t => t.priority === 'high').length,
-          tasks.filter(t => t.priority === 'medium').length,
-          tasks.filter(t => t.priority === 'low').length,
+          priorityCounts.high,
+          priorityCounts.medium,
+          priorityCounts.low,
         ],
         backgroundColor: ['rgba(239, 68, 68, 0.8)', 'rgba(234, 179, 8, 0.8)', 'rgba(34, 197, 94, 0.8)'],
         borderColor: ['rgb(239, 68, 68)', 'rgb(234, 179, 8)', 'rgb(34, 197, 94)'],
@@ -1,10 +1,14 @@
 // Purpose: Overview page showing stats, recent tasks, and quick task creation
 // Why: Gives users a fast snapshot of progress and shortcuts to common actions
-// How: Fetches tasks via API, computes metrics, updates with optimistic refresh
+// How: Fetches the newest page of tasks plus server-side counters (GET /tasks/stats),
+//      then applies live change events (SSE)
 import React, { useState, useEffect, useCallback } from 'react';
 import { CheckCircle2, Clock, AlertCircle, ListTodo, Plus, TrendingUp, Activity, Trash2 } from 'lucide-react';
 import { useTranslation } from 'react-i18next';
-import api from '../services/api';
+import api, { subscribeTaskEvents } from '../services/api';
+
+// Recent tasks loaded for the list; KPIs come from /tasks/stats, not from this page
+const RECENT_TASKS_LIMIT = 50;
 
 const Dashboard = () => {
   const { t } = useTranslation();
@@ -19,7 +23,7 @@ const Dashboard = () => {
     return () => observer.disconnect();
   }, []);
   const [tasks, setTasks] = useState([]);
-  // Aggregate dashboard KPIs derived from the current task list
+  // Aggregate dashboard KPIs from the server-side counters
   const [stats, setStats] = useState({
     total: 0,
     inProgress: 0,
@@ -33,72 +37,83 @@ const Dashboard = () => {
   const [newTask, setNewTask] = useState({ title: '', description: '', priority: 'medium', due_date: '' });
   const [filter, setFilter] = useState('all');
 
-  // Compute totals, overdue count, average completion days, and completion rate
-  const calculateStats = useCallback((taskList) => {
-    const total = taskList.length;
-    const inProgress = taskList.filter(task => task.status === 'in_progress').length;
-    const completed = taskList.filter(task => task.status === 'completed').length;
-    const overdue = taskList.filter(task =>
-      task.status !== 'completed' &&
-      new Date(task.due_date) < new Date()
-    ).length;
-
-    const avgCompletionDays = completed > 0 ?
-      taskList
-        .filter(task => task.status === 'completed')
-        .reduce((sum, task) => sum + (new Date(task.updated_at || task.created_at) - new Date(task.created_at)) / (1000 * 60 * 60 * 24), 0) / completed
-      : 0;
-
-    const completionRate = total > 0 ? Math.round((completed / total) * 100) : 0;
-
-    setStats({
-      total,
-      inProgress,
-      completed,
-      overdue,
-      avgCompletionDays: Math.round(avgCompletionDays),
-      completionRate
-    });
+  // Totals, overdue count, average completion days and completion rate over all tasks
+  const fetchStats = useCallback(async () => {
+    try {
+      const response = await api.get('/tasks/stats');
+      const data = response.data;
+      setStats({
+        total: data.total,
+        inProgress: data.inProgress,
+        completed: data.completed,
+        overdue: data.overdue,
+        avgCompletionDays: Math.round(data.avgCompletionDays),
+        completionRate: data.completionRate
+      });
+    } catch (error) {
+      console.error('Error fetching task stats:', error);
+    }
   }, []);
 
-  // Centralized fetch to populate tasks and refresh KPIs after mutations
+  // Full fetch: first load and whenever the event stream asks for a resync
   const fetchTasks = useCallback(async () => {
     try {
-      setLoading(true);
-      const response = await api.get('/tasks');
+      const [response] = await Promise.all([
+        api.get('/tasks', { params: { limit: RECENT_TASKS_LIMIT } }),
+        fetchStats()
+      ]);
       setTasks(response.data);
-      calculateStats(response.data);
     } catch (error) {
       console.error('Error fetching tasks:', error);
     } finally {
       setLoading(false);
     }
-  }, [calculateStats]);
+  }, [fetchStats]);
+
+  // Upsert/remove one task locally (mutation responses and events from other tabs);
+  // the counters cover tasks outside the loaded page, so they are refetched
+  const applyTaskChange = useCallback((event) => {
+    if (event.op === 'resync') {
+      fetchTasks();
+      return;
+    }
+    if (event.op === 'deleted') {
+      setTasks(prev => prev.filter(task => task.id !== event.id));
+    } else if (event.task) {
+      setTasks(prev => (prev.some(task => task.id === event.task.id)
+        ? prev.map(task => (task.id === event.task.id ? event.task : task))
+        : [event.task, ...prev]));
+    }
+    fetchStats();
+  }, [fetchTasks, fetchStats]);
+
+  // Changes made in other tabs/devices arrive as events; refetch after a reconnect gap
+  useEffect(() => subscribeTaskEvents({ onEvent: applyTaskChange, onReconnect: fetchTasks }), [applyTaskChange, fetchTasks]);
 
   useEffect(() => {
     fetchTasks();
   }, [fetchTasks]);
 
-  // Create a new task from modal and refresh dashboard data
+  // Create a new task from modal and add it to the list
   const handleAddTask = async (e) => {
     e.preventDefault();
     try {
-      await api.post('/tasks', { ...newTask, status: 'in_progress' });
+      const response = await api.post('/tasks', { ...newTask, status: 'in_progress' });
       setShowAddModal(false);
       setNewTask({ title: '', description: '', priority: 'medium', due_date: '' });
-      fetchTasks();
+      applyTaskChange({ op: 'created', task: response.data });
     } catch (error) {
       console.error('Error adding task:', error);
       alert('Failed to create task');
     }
   };
 
-  // Delete task with user confirmation and refresh
+  // Delete task with user confirmation and drop it from the list
   const handleDeleteTask = async (taskId) => {
     if (window.confirm('Are you sure you want to delete this task?')) {
       try {
         await api.delete(`/tasks/${taskId}`);
-        fetchTasks();
+        applyTaskChange({ op: 'deleted', id: taskId });
       } catch (error) {
         console.error('Error deleting task:', error);
         alert('Failed to delete task');
@@ -106,12 +121,12 @@ const Dashboard = () => {
     }
   };
 
-  // Toggle between in_progress and completed and refresh KPIs
+  // Toggle between in_progress and completed; KPIs follow the updated list
   const handleToggleStatus = async (task) => {
     try {
       const newStatus = task.status === 'completed' ? 'in_progress' : 'completed';
-      await api.put(`/tasks/${task.id}`, { ...task, status: newStatus });
-      fetchTasks();
+      const response = await api.put(`/tasks/${task.id}`, { ...task, status: newStatus });
+      applyTaskChange({ op: 'updated', task: response.data });
     } catch (error) {
       console.error('Error updating task:', error);
       alert('Failed to update task');
@@ -343,13 +358,13 @@ const Dashboard = () => {
                 </div>
               ))}
 
-              {tasks.length > 8 && (
+              {stats.total > 8 && (
                 <div className="text-center py-6 sm:py-8">
                   <button
                     onClick={() => window.location.href = '/tasks'}
                     className="text-[var(--accent-primary)] hover:underline font-bold text-sm sm:text-base"
                   >
-                    View All {tasks.length} Tasks →
+                    View All {stats.total} Tasks →
                   </button>
                 </div>
               )}
@@ -24,6 +24,7 @@ const Login = ({ onLogin }) => {
   // ✅ Clear stale auth and reset form fields on page load
   useEffect(() => {
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
 
     setFormData({
@@ -64,6 +65,7 @@ const Login = ({ onLogin }) => {
       const response = await api.post('/auth/login', formData);
 
       localStorage.setItem('token', response.data.access_token);
+      localStorage.setItem('refreshToken', response.data.refresh_token);
       localStorage.setItem('user', JSON.stringify(response.data.user));
 
       onLogin();
@@ -1,6 +1,6 @@
 // Purpose: User settings page for profile updates, theme toggle, and data export
 // Why: Lets users personalize name and theme and take their data with them
-// How: Persists profile to backend, theme to localStorage, and exports CSV via Blob
+// How: Persists profile to backend, theme to localStorage, and downloads the server's CSV export as a Blob
 import React, { useState, useEffect } from 'react';
 import {
   User, Mail, Sun, Moon, Download, Save, Check, Loader2, Sparkles, BarChart3
@@ -51,25 +51,15 @@ const Settings = ({ isDarkMode, toggleTheme }) => {
     }
   };
 
-  // Download current tasks as CSV for offline analysis or backup
+  // Download all tasks as CSV; the server streams it (gzip on the wire) and builds the rows
   const handleExportCSV = async () => {
     try {
       setExporting(true);
-      const response = await api.get('/tasks');
-      const tasks = response.data;
-      const headers = ['Title', 'Description', 'Priority', 'Status', 'Due Date', 'Created At'];
-      const csvContent = [
-        headers.join(','),
-        ...tasks.map(task => [
-          `"${task.title}"`,
-          `"${task.description || ''}"`,
-          task.priority,
-          task.status,
-          task.due_date || '',
-          task.created_at || ''
-        ].join(','))
-      ].join('\n');
-      const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+      const response = await api.get('/tasks/export', {
+        params: { format: 'csv', gzip: true },
+        responseType: 'blob'
+      });
+      const blob = new Blob([response.data], { type: 'text/csv;charset=utf-8;' });
       const link = document.createElement('a');
       const url = URL.createObjectURL(blob);
       link.setAttribute('href', url);
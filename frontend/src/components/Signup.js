@@ -104,6 +104,7 @@ const Signup = () => {
       });
 
       localStorage.setItem('token', response.data.access_token);
+      localStorage.setItem('refreshToken', response.data.refresh_token);
       localStorage.setItem('user', JSON.stringify(response.data.user));
 
       navigate('/dashboard');
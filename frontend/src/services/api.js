@@ -1,6 +1,9 @@
 // Purpose: Axios instance configured for TaskFlow Pro API
 // Why: Centralizes base URL, headers, and auth handling for all network calls
-// How: Adds JWT from localStorage and redirects to /login on 401 responses/logouts
+// How: Adds JWT from localStorage; on 401 renews the short-lived access token with the
+//      refresh token once and retries, otherwise redirects to /login.
+//      subscribeTaskEvents() opens the /tasks/events SSE stream with a one-time
+//      ticket and reconnects it
 import axios from 'axios';
 
 // Resolve API base (prefer env override). Must include `/api` to match FastAPI routes.
@@ -28,12 +31,47 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
-// Normalize errors; if 401, clear auth and route user to login screen
+// One refresh in flight at a time; concurrent 401s wait for the same promise
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshPromise = (refreshToken
+      ? axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'))
+    )
+      .then((response) => {
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refreshToken', response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
+// Normalize errors; on 401 try one token refresh, else clear auth and route to login
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
+  async (error) => {
+    const original = error.config;
+    const isAuthCall = original?.url?.startsWith('/auth/logout');
+    if (error.response?.status === 401 && original && !original._retried && !isAuthCall) {
+      original._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        // fall through to logout
+      }
+    }
+    if (error.response?.status === 401 && !isAuthCall) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -41,4 +79,63 @@ api.interceptors.response.use(
   }
 );
 
+// Live task changes (Server-Sent Events). EventSource cannot send headers, so each
+// connection first trades the access token for a short-lived one-time ticket
+// (POST /tasks/events/ticket, refreshed through the interceptor on 401) and puts
+// only that in the URL. When the stream drops, a new ticket is fetched and the
+// stream reopened. onReconnect fires after every reconnect so callers can
+// refetch whatever they missed. Returns unsubscribe.
+export const subscribeTaskEvents = ({ onEvent, onReconnect }) => {
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+  let opened = false;
+  let failures = 0;
+
+  const scheduleReconnect = () => {
+    failures += 1;
+    retryTimer = setTimeout(connect, Math.min(30000, 1000 * 2 ** failures));
+  };
+
+  const connect = async () => {
+    if (closed || !localStorage.getItem('token')) return;
+    let ticket;
+    try {
+      ticket = (await api.post('/tasks/events/ticket')).data.ticket;
+    } catch {
+      // the interceptor already handled logout on a failed refresh
+      if (!closed) scheduleReconnect();
+      return;
+    }
+    if (closed) return;
+    source = new EventSource(`${API_URL}/tasks/events?ticket=${encodeURIComponent(ticket)}`);
+    source.onopen = () => {
+      failures = 0;
+      if (opened && onReconnect) onReconnect();
+      opened = true;
+    };
+    source.onmessage = (message) => {
+      try {
+        onEvent(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Bad task event:', error);
+      }
+    };
+    source.onerror = () => {
+      // Tickets are single-use, so EventSource's own retry is refused (401) and
+      // the stream closes; reopen it here with a fresh ticket
+      if (source.readyState !== EventSource.CLOSED) source.close();
+      source = null;
+      scheduleReconnect();
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) source.close();
+  };
+};
+
 export default api;